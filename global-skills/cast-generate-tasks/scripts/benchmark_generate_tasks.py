@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the task generation pipeline
+"""
+import argparse
+import gc
+import random
+import re
+import string
+import time
+import tracemalloc
+from typing import Dict, Any, List
+
+from generate_tasks import KeywordMatcher, PRDParser, TaskGenerator, iter_lines
+from plan_sprints import STRATEGIES as PACKING_STRATEGIES, SprintPacker, sprint_statistics, sweep_capacities
+from story_dedup import StoryDeduplicator, jaccard, shingles
+
+STORY_BLOCK = """#### Story {n}: Feature {n}
+As a {persona}
+I want to {action} record {n}
+So that I can track progress on item {n}
+
+Acceptance Criteria:
+- ✅ Given a record, when I {action} it, then the change is visible
+- ✅ Error handling: When the request fails, then an error is shown
+
+"""
+
+# Prose that starts like a story but never completes one
+MALFORMED_BLOCK = """As a result of the previous release, several flows changed.
+Teams should review the notes below before planning.
+
+"""
+
+PERSONAS = ['user', 'admin', 'developer', 'project manager']
+ACTIONS = ['create', 'update', 'save', 'view', 'delete', 'export']
+
+def build_synthetic_prd(target_bytes: int, malformed: bool = True) -> str:
+    """Build a PRD of roughly target_bytes made of repeated story blocks
+
+    With malformed, every tenth block is prose that starts like a story.
+    """
+    parts = ["# Synthetic PRD\n\n## User Stories\n\n"]
+    size = len(parts[0])
+    n = 0
+    while size < target_bytes:
+        if malformed and n % 10 == 9:
+            block = MALFORMED_BLOCK
+        else:
+            block = STORY_BLOCK.format(
+                n=n,
+                persona=PERSONAS[n % len(PERSONAS)],
+                action=ACTIONS[n % len(ACTIONS)]
+            )
+        parts.append(block)
+        size += len(block.encode('utf-8'))
+        n += 1
+    parts.append("## Technical Requirements\n- Python 3.9+\n- PostgreSQL\n\n## Appendix\nEnd.\n")
+    return ''.join(parts)
+
+def legacy_parse_prd_content(prd_text: str) -> Dict[str, Any]:
+    """The original multi-pass regex parser, kept for comparison"""
+    sections = {}
+
+    user_stories = re.findall(r'As a (.+?)\nI want (.+?)\nSo that (.+?)(?:\n\n|\nAcceptance)', prd_text, re.MULTILINE | re.DOTALL)
+    sections['user_stories'] = [
+        {'persona': story[0].strip(), 'want': story[1].strip(), 'value': story[2].strip()}
+        for story in user_stories
+    ]
+
+    criteria_blocks = re.findall(r'Acceptance Criteria:(.*?)(?=\n\n|\n#|\Z)', prd_text, re.MULTILINE | re.DOTALL)
+    sections['acceptance_criteria'] = []
+    for block in criteria_blocks:
+        criteria = re.findall(r'✅ (.+)', block)
+        sections['acceptance_criteria'].extend(criteria)
+
+    tech_section = re.search(r'Technical Requirements(.*?)(?=\n## |\Z)', prd_text, re.MULTILINE | re.DOTALL)
+    if tech_section:
+        sections['technical_requirements'] = tech_section.group(1).strip()
+
+    return sections
+
+def line_parse_prd_content(prd_text: str) -> Dict[str, Any]:
+    """Feed the document to PRDParser line by line, as streaming does"""
+    parser = PRDParser()
+    for line in iter_lines(prd_text):
+        parser.feed(line)
+    return parser.close()
+
+def benchmark_parse(sizes_mb: List[int], legacy: bool) -> None:
+    """Time parse_prd_content on synthetic PRDs of increasing size
+
+    Every document is also fed through the line parser, which must give the
+    same result. Well-formed documents must also match the original regex
+    parser; documents with malformed stories legitimately differ from it,
+    since it joins a broken story to the next complete one.
+    """
+    generator = TaskGenerator()
+
+    print(f"{'Size':>8} {'Malformed':>9} {'Stories':>10} {'s/MB':>8} {'Lines s/MB':>11}" +
+          (f" {'Legacy s/MB':>12}" if legacy else ''))
+    for size_mb in sizes_mb:
+        for malformed in (False, True):
+            prd_text = build_synthetic_prd(size_mb * 1024 * 1024, malformed)
+
+            start = time.perf_counter()
+            sections = generator.parse_prd_content(prd_text)
+            elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            line_sections = line_parse_prd_content(prd_text)
+            line_elapsed = time.perf_counter() - start
+            assert line_sections == sections, "Line parser and parse_prd_content disagree"
+
+            row = (f"{size_mb:>6}MB {'yes' if malformed else 'no':>9} {len(sections['user_stories']):>10} "
+                   f"{elapsed / size_mb:>8.4f} {line_elapsed / size_mb:>11.4f}")
+            if legacy:
+                start = time.perf_counter()
+                legacy_sections = legacy_parse_prd_content(prd_text)
+                legacy_elapsed = time.perf_counter() - start
+                if not malformed:
+                    assert legacy_sections == sections, "Legacy parser disagrees on a well-formed document"
+                row += f" {legacy_elapsed / size_mb:>12.4f}"
+            print(row)
+
+            del prd_text, sections, line_sections
+
+def benchmark_keywords(keyword_counts: List[int], descriptions: int) -> None:
+    """Compare the keyword matcher against per-keyword substring checks"""
+    rng = random.Random(42)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+             for _ in range(max(keyword_counts) + 500)]
+    texts = [' '.join(rng.choice(words) for _ in range(12)) for _ in range(descriptions)]
+
+    print(f"{'Keywords':>9} {'Matcher s':>10} {'Naive s':>9}")
+    for count in keyword_counts:
+        complexity = {word: rng.choice([1, 2, 3, 5, 8]) for word in words[:count]}
+        matcher = KeywordMatcher(complexity, [])
+
+        # Bypass memoization so every description is actually scanned
+        start = time.perf_counter()
+        for text in texts:
+            matcher._scan(text)
+        matcher_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            lowered = text.lower()
+            max((points for keyword, points in complexity.items() if keyword in lowered), default=0)
+        naive_elapsed = time.perf_counter() - start
+
+        print(f"{count:>9} {matcher_elapsed:>10.3f} {naive_elapsed:>9.3f}")
+
+def build_task_backlog(task_count: int) -> List[Dict[str, Any]]:
+    """Generate at least task_count prioritized tasks from synthetic stories"""
+    generator = TaskGenerator()
+    tasks = []
+    i = 0
+    while len(tasks) < task_count:
+        story = {
+            'persona': PERSONAS[i % len(PERSONAS)],
+            'want': f"to {ACTIONS[i % len(ACTIONS)]} {['simple', 'complex', 'real-time', 'basic'][i % 4]} record {i}",
+            'value': f"I can track item {i}"
+        }
+        tasks.extend(generator.generate_tasks_from_story(story, i))
+        i += 1
+    return generator.assign_priorities(tasks[:task_count])
+
+def benchmark_pack(task_count: int, sprint_capacity: int) -> None:
+    """Compare sprint packing strategies on a large backlog"""
+    tasks = build_task_backlog(task_count)
+
+    print(f"{task_count} tasks, sprint capacity {sprint_capacity}")
+    print(f"{'Strategy':>22} {'Sprints':>8} {'Fill':>7} {'Seconds':>8}")
+    for strategy in PACKING_STRATEGIES:
+        packer = SprintPacker(sprint_capacity, strategy)
+        start = time.perf_counter()
+        sprints = packer.pack(tasks, TaskGenerator.sprint_sort_key)
+        elapsed = time.perf_counter() - start
+        stats = sprint_statistics(sprints, sprint_capacity)
+        print(f"{strategy:>22} {stats['sprint_count']:>8} {stats['fill_ratio'] * 100:>6.1f}% {elapsed:>8.3f}")
+
+def benchmark_sweep(task_count: int, capacities: List[int]) -> None:
+    """Compare the vectorized capacity sweep against one packing run per capacity"""
+    tasks = build_task_backlog(task_count)
+
+    start = time.perf_counter()
+    rows = sweep_capacities(tasks, TaskGenerator.sprint_sort_key, capacities)
+    sweep_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_counts = [len(SprintPacker(capacity).pack(tasks, TaskGenerator.sprint_sort_key)) for capacity in capacities]
+    loop_elapsed = time.perf_counter() - start
+
+    print(f"{task_count} tasks, {len(capacities)} capacities")
+    print(f"Sweep: {sweep_elapsed:.3f}s  Per-capacity packing: {loop_elapsed:.3f}s")
+    if [row['sprint_count'] for row in rows] != loop_counts:
+        print("(sprint counts differ)")
+
+def benchmark_dedup(story_counts: List[int], pairwise_limit: int) -> None:
+    """Time LSH story deduplication as the story count grows, against all-pairs comparison"""
+    rng = random.Random(7)
+    vocabulary = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                  for _ in range(5000)]
+
+    print(f"{'Stories':>8} {'LSH s':>8} {'us/story':>9} {'Duplicates':>11} {'Pairwise s':>11}")
+    for count in story_counts:
+        stories = [{'want': 'to ' + ' '.join(rng.sample(vocabulary, 6))} for _ in range(count)]
+        # Reword every tenth story by adding a word (Jaccard 6/7)
+        stories += [{'want': story['want'] + ' quickly'} for story in stories[::10]]
+        rng.shuffle(stories)
+
+        start = time.perf_counter()
+        deduplicator = StoryDeduplicator()
+        duplicates = sum(deduplicator.add(story) is not None for story in stories)
+        elapsed = time.perf_counter() - start
+
+        pairwise = ''
+        if len(stories) <= pairwise_limit:
+            story_shingles = [shingles(story['want']) for story in stories]
+            start = time.perf_counter()
+            for i in range(len(story_shingles)):
+                for j in range(i):
+                    jaccard(story_shingles[i], story_shingles[j])
+            pairwise = f"{time.perf_counter() - start:.3f}"
+
+        print(f"{len(stories):>8} {elapsed:>8.3f} {elapsed / len(stories) * 1e6:>9.1f} "
+              f"{duplicates:>11} {pairwise:>11}")
+
+def measure_allocations(build) -> int:
+    """Bytes still allocated after build() returns, per tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+def benchmark_memory(task_count: int) -> None:
+    """Compare memory held by Task records against plain task dicts"""
+    def build_records():
+        return build_task_backlog(task_count)
+
+    def build_dicts():
+        # Rebuild the original shape: one dict and fresh lists per task
+        return [
+            {key: list(value) if isinstance(value, (list, tuple)) else value for key, value in task.items()}
+            for task in build_task_backlog(task_count)
+        ]
+
+    record_bytes = measure_allocations(build_records)
+    dict_bytes = measure_allocations(build_dicts)
+
+    print(f"{task_count} tasks")
+    print(f"{'Model':>8} {'Total MB':>9} {'Bytes/task':>11}")
+    print(f"{'dict':>8} {dict_bytes / 1e6:>9.1f} {dict_bytes / task_count:>11.0f}")
+    print(f"{'Task':>8} {record_bytes / 1e6:>9.1f} {record_bytes / task_count:>11.0f}")
+    print(f"Reduction: {(1 - record_bytes / dict_bytes) * 100:.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark task generation')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    parse_parser = subparsers.add_parser('parse', help='PRD parsing cost per megabyte')
+    parse_parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100],
+                              help='PRD sizes to generate, in megabytes')
+    parse_parser.add_argument('--legacy', action='store_true',
+                              help='Also time the original regex parser and check it agrees on well-formed documents')
+
+    keywords_parser = subparsers.add_parser('keywords', help='Keyword matching cost versus table size')
+    keywords_parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000],
+                                 help='Keyword table sizes to test')
+    keywords_parser.add_argument('--descriptions', type=int, default=20000,
+                                 help='Number of descriptions to scan')
+
+    pack_parser = subparsers.add_parser('pack', help='Sprint count and fill ratio per packing strategy')
+    pack_parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks to pack')
+    pack_parser.add_argument('--sprint-capacity', '-c', type=int, default=20, help='Sprint capacity in story points')
+
+    sweep_parser = subparsers.add_parser('sweep', help='Capacity sweep versus repeated packing')
+    sweep_parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks to pack')
+    sweep_parser.add_argument('--capacities', type=int, nargs='+', default=list(range(10, 61)),
+                              help='Sprint capacities to sweep')
+
+    dedup_parser = subparsers.add_parser('dedup', help='Near-duplicate story detection scaling')
+    dedup_parser.add_argument('--stories', type=int, nargs='+', default=[1000, 10000, 100000],
+                              help='Story counts to test')
+    dedup_parser.add_argument('--pairwise-limit', type=int, default=5000,
+                              help='Also time all-pairs comparison up to this many stories')
+
+    memory_parser = subparsers.add_parser('memory', help='Per-task memory of Task records versus dicts')
+    memory_parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks to build')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'parse':
+        benchmark_parse(args.sizes, args.legacy)
+    elif args.benchmark == 'keywords':
+        benchmark_keywords(args.counts, args.descriptions)
+    elif args.benchmark == 'pack':
+        benchmark_pack(args.tasks, args.sprint_capacity)
+    elif args.benchmark == 'sweep':
+        benchmark_sweep(args.tasks, args.capacities)
+    elif args.benchmark == 'dedup':
+        benchmark_dedup(args.stories, args.pairwise_limit)
+    elif args.benchmark == 'memory':
+        benchmark_memory(args.tasks)
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for GitHub issue creation against the local fake GitHub API
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmark_generate_tasks import ACTIONS, PERSONAS, STORY_BLOCK
+from create_github_issues import GitHubIssueCreator
+from fake_github import FakeGitHub, start_server
+from generate_tasks import TaskGenerator
+from github_backends import BACKENDS, GhCliBackend, GitHubError, GraphQLBackend, RestBackend
+from issue_journal import IssueJournal
+from issue_mirror import IssueMirror
+from request_scheduler import RequestScheduler
+
+FAKE_GITHUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_github.py')
+
+def create_issues(backend: Any, count: int, concurrency: int) -> float:
+    """Create count issues through backend and return calls per second"""
+    def create(i: int) -> str:
+        return backend.create_issue(f"Benchmark issue {i}", "Body", ['benchmark'])
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(count):
+            create(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(create, range(count)))
+    return count / (time.perf_counter() - start)
+
+def benchmark_backends(issue_count: int, gh_issue_count: int, concurrency_levels: List[int],
+                       latency_ms: float) -> None:
+    """Compare calls per second of the gh subprocess path and the pooled REST backend"""
+    server = start_server(FakeGitHub(latency=latency_ms / 1000))
+    try:
+        # Stands in for gh: one process and one fresh connection per call, minus gh's own config and TLS cost
+        gh = GhCliBackend([sys.executable, FAKE_GITHUB, 'gh', '--api-url', server.url,
+                           '--repo', server.github.repo])
+        rest = RestBackend(server.github.repo, token='', base_url=server.url)
+        # gh refuses labels the repository lacks
+        rest.create_label('benchmark')
+
+        print(f"Fake GitHub at {server.url}, {latency_ms:g}ms added latency")
+        print(f"{'Backend':>8} {'Workers':>8} {'Calls':>6} {'Calls/s':>9}")
+        for concurrency in concurrency_levels:
+            rate = create_issues(gh, gh_issue_count, concurrency)
+            print(f"{'gh':>8} {concurrency:>8} {gh_issue_count:>6} {rate:>9.1f}")
+            rate = create_issues(rest, issue_count, concurrency)
+            print(f"{'rest':>8} {concurrency:>8} {issue_count:>6} {rate:>9.1f}")
+    finally:
+        server.shutdown()
+
+def benchmark_batching(issue_count: int, batch_sizes: List[int], concurrency: int, latency_ms: float) -> None:
+    """Compare one REST call per issue with GraphQL batches of several sizes"""
+    issues = [{'title': f"Benchmark issue {i}", 'body': "Body", 'labels': ['benchmark', f'size/{i % 5}']}
+              for i in range(issue_count)]
+
+    print(f"{latency_ms:g}ms added latency, {concurrency} worker(s), {issue_count} issues")
+    print(f"{'Backend':>8} {'Batch':>6} {'Requests':>9} {'Issues/s':>9}")
+    for batch_size in [1] + batch_sizes:
+        server = start_server(FakeGitHub(latency=latency_ms / 1000))
+        try:
+            if batch_size == 1:
+                backend = RestBackend(server.github.repo, token='', base_url=server.url)
+                create = lambda batch: [backend.create_issue(**issue) for issue in batch]
+            else:
+                backend = GraphQLBackend(server.github.repo, token='', base_url=server.url, batch_size=batch_size)
+                backend.resolve_label_ids(sorted({label for issue in issues for label in issue['labels']}))
+                create = backend.create_issues
+            batches = [issues[i:i + batch_size] for i in range(0, issue_count, batch_size)]
+
+            requests_before = server.github.request_count
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(create, batches))
+            rate = issue_count / (time.perf_counter() - start)
+            requests = server.github.request_count - requests_before
+            print(f"{backend.name:>8} {batch_size:>6} {requests:>9} {rate:>9.1f}")
+        finally:
+            server.shutdown()
+
+def benchmark_throttling(issue_count: int, concurrency: int, throttle_every: int, retry_after: float,
+                         rate_limit: int, rate_limit_window: float, base_delay: float) -> None:
+    """Create issues against a server that injects 403/429 rate limit responses
+
+    Runs once with retries off, as the creator behaved before the scheduler,
+    and once with them on; every issue should arrive in the second run.
+    """
+    print(f"Every {throttle_every}th request refused (Retry-After {retry_after:g}s or none), "
+          f"{rate_limit or 'no'} requests per {rate_limit_window:g}s window, {concurrency} worker(s)")
+    print(f"{'Retries':>8} {'Created':>8} {'Dropped':>8} {'Throttled':>10} {'Waited s':>9} {'Calls/s':>8}")
+    for max_retries in (0, 8):
+        github = FakeGitHub(throttle_every=throttle_every, retry_after=retry_after,
+                            rate_limit=rate_limit, rate_limit_window=rate_limit_window)
+        server = start_server(github)
+        try:
+            scheduler = RequestScheduler(max_concurrency=concurrency, max_retries=max_retries, base_delay=base_delay)
+            backend = RestBackend(github.repo, token='', base_url=server.url, scheduler=scheduler)
+
+            def create(i: int) -> bool:
+                try:
+                    backend.create_issue(f"Benchmark issue {i}", "Body", ['benchmark'])
+                    return True
+                except GitHubError:
+                    return False
+
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                created = sum(pool.map(create, range(issue_count)))
+            report = scheduler.report()
+            print(f"{max_retries:>8} {created:>8} {issue_count - created:>8} {report['throttled']:>10} "
+                  f"{report['throttle_seconds']:>9.1f} {report['requests_per_second']:>8.1f}")
+            assert created == len(github.issues)
+        finally:
+            server.shutdown()
+
+def legacy_format_issue_body(task: Dict[str, Any]) -> str:
+    """The original += issue body renderer, kept for comparison"""
+    body = f"""## Description
+{task['description']}
+
+## Acceptance Criteria
+"""
+    for criterion in task.get('acceptance_criteria', []):
+        body += f"- [ ] {criterion}\n"
+
+    body += f"""
+## Technical Details
+- **Story Points:** {task['story_points']}
+- **Type:** {task['type']}
+- **Priority:** {task.get('priority', 'medium')}
+"""
+
+    if task.get('story_id'):
+        body += f"- **User Story:** {task['story_id']}\n"
+
+    if task.get('dependencies'):
+        body += f"- **Dependencies:** {', '.join(task['dependencies'])}\n"
+
+    body += """
+## Definition of Done
+- [ ] Code implemented and tested
+- [ ] Code review completed
+- [ ] Documentation updated
+- [ ] Acceptance criteria verified
+"""
+
+    return body
+
+def legacy_format_epic_body(sprint_name: str, tasks: List[Dict[str, Any]],
+                            issue_numbers: Optional[List[Optional[str]]] = None) -> str:
+    """The original += epic body renderer, kept for comparison"""
+    total_points = sum(task['story_points'] for task in tasks)
+    task_count = len(tasks)
+
+    epic_body = f"""# {sprint_name}
+            
+## Overview
+Sprint containing {task_count} tasks with {total_points} story points total.
+
+## Sprint Goals
+- Complete core feature development
+- Maintain high code quality
+- Ensure proper testing coverage
+
+## Tasks in This Sprint
+"""
+
+    for i, task in enumerate(tasks):
+        issue_number = issue_numbers[i] if issue_numbers else None
+        link = f"#{str(issue_number).lstrip('#')} " if issue_number else ''
+        epic_body += f"- [ ] {link}{task['title']} ({task['story_points']} pts)\n"
+
+    epic_body += f"""
+## Sprint Metrics
+- **Total Tasks:** {task_count}
+- **Total Story Points:** {total_points}
+- **Sprint Capacity:** {total_points} points
+
+## Definition of Done
+- [ ] All tasks completed
+- [ ] Code reviews completed
+- [ ] Integration testing passed
+- [ ] Sprint demo conducted
+"""
+
+    return epic_body
+
+def build_render_tasks(count: int) -> List[Dict[str, Any]]:
+    """Tasks shaped like generate_tasks.py output, with a mix of optional fields"""
+    tasks = []
+    for i in range(count):
+        task = {
+            'id': f"backend-{i:010x}",
+            'title': f"Implement API for to update record {i}",
+            'description': f"Create backend endpoints and business logic for: to update record {i}",
+            'type': ['frontend', 'backend', 'testing', 'documentation'][i % 4],
+            'story_points': [1, 2, 3, 5, 8][i % 5],
+            'labels': ['backend', 'api'],
+            'acceptance_criteria': [f"Criterion {j} for record {i}" for j in range(i % 6)],
+            'priority': ['high', 'medium', 'low'][i % 3]
+        }
+        if i % 2:
+            task['story_id'] = f"story-{i // 4}"
+        if i % 7 == 0:
+            task['dependencies'] = [f"backend-{i - 1:010x}", f"backend-{i - 2:010x}"]
+        tasks.append(task)
+    return tasks
+
+def benchmark_rendering(body_count: int, sprint_sizes: List[int]) -> None:
+    """Render issue and epic bodies with the creator and with the original += renderers"""
+    creator = GitHubIssueCreator(dry_run=True)
+    tasks = build_render_tasks(body_count)
+    numbers = [str(i + 1) for i in range(body_count)]
+
+    def timed(render, legacy_render, repeat: int = 3) -> Tuple[float, float]:
+        """Best of repeat runs of each, alternating so neither pays for warming up the allocator"""
+        elapsed, legacy = float('inf'), float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render()
+            elapsed = min(elapsed, time.perf_counter() - start)
+            start = time.perf_counter()
+            legacy_render()
+            legacy = min(legacy, time.perf_counter() - start)
+        return elapsed, legacy
+
+    print(f"{'Bodies':>14} {'Count':>8} {'Seconds':>9} {'Legacy s':>9} {'Speedup':>8}")
+    elapsed, legacy = timed(lambda: [creator.format_issue_body(task) for task in tasks],
+                            lambda: [legacy_format_issue_body(task) for task in tasks])
+    print(f"{'issue':>14} {body_count:>8} {elapsed:>9.3f} {legacy:>9.3f} {legacy / elapsed:>7.2f}x")
+    assert all(creator.format_issue_body(task) == legacy_format_issue_body(task) for task in tasks[:1000])
+
+    for sprint_size in sprint_sizes:
+        sprints = [(f"Sprint {i // sprint_size + 1}", tasks[i:i + sprint_size], numbers[i:i + sprint_size])
+                   for i in range(0, body_count, sprint_size)]
+        elapsed, legacy = timed(lambda: [creator.format_epic_body(*sprint) for sprint in sprints],
+                                lambda: [legacy_format_epic_body(*sprint) for sprint in sprints])
+        print(f"{f'epic of {sprint_size}':>14} {len(sprints):>8} {elapsed:>9.3f} {legacy:>9.3f} "
+              f"{legacy / elapsed:>7.2f}x")
+        assert creator.format_epic_body(*sprints[0]) == legacy_format_epic_body(*sprints[0])
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values; 0.0 when there are none"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def make_backend(name: str, server: Any, scheduler: RequestScheduler, batch_size: int,
+                 mirror: Optional[IssueMirror] = None) -> Any:
+    if name == 'gh':
+        return GhCliBackend([sys.executable, FAKE_GITHUB, 'gh', '--api-url', server.url,
+                             '--repo', server.github.repo], scheduler=scheduler)
+    if name == 'graphql':
+        return GraphQLBackend(server.github.repo, token='', base_url=server.url, batch_size=batch_size,
+                              scheduler=scheduler, mirror=mirror)
+    return RestBackend(server.github.repo, token='', base_url=server.url, scheduler=scheduler, mirror=mirror)
+
+class RecordingCreator(GitHubIssueCreator):
+    """GitHubIssueCreator that keeps the result of every issue and epic it creates"""
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.results: List[Dict[str, Any]] = []
+
+    def issue_result(self, *args: Any) -> Dict[str, Any]:
+        result = super().issue_result(*args)
+        self.results.append(result)
+        return result
+
+def build_prd(story_count: int) -> str:
+    return "# Benchmark PRD\n\n## User Stories\n\n" + ''.join(
+        STORY_BLOCK.format(n=n, persona=PERSONAS[n % len(PERSONAS)], action=ACTIONS[n % len(ACTIONS)])
+        for n in range(story_count))
+
+def write_task_file(path: str, task_count: int, sprint_capacity: int) -> int:
+    """Write a task file of about task_count tasks as generate_tasks.py does by default; returns its task count"""
+    generator = TaskGenerator()
+    one_story = len(generator.build_tasks(build_prd(1)))
+    per_story = len(generator.build_tasks(build_prd(2))) - one_story
+    story_count = max(1, round((task_count - one_story) / per_story) + 1)
+    result = generator.generate_all_tasks(build_prd(story_count), sprint_capacity, source='benchmark-prd.md')
+    with open(path, 'w') as f:
+        json.dump(result, f)
+    return len(result['tasks'])
+
+def benchmark_creator(issue_count: int, gh_issue_count: int, backends: List[str], concurrency_levels: List[int],
+                      latency_ms: float, jitter_ms: float, error_rate: float, batch_size: int,
+                      sprint_capacity: int, seed: int) -> None:
+    """Run process_task_file on a generated task file against the fake server, per backend and worker count
+
+    The task file is generate_tasks.py's default output for a synthetic
+    PRD, and each run gets a fresh server, journal and mirror, so the run
+    is what the CLI does on first use: listing, milestones and labels,
+    issues, milestone updates and epics are all timed and counted.
+    Latency is per creation call as the creator records it, so issues in
+    one GraphQL batch share their batch's time. Errors are injected into
+    every request, and failed issues are counted rather than retried.
+    """
+    print(f"{latency_ms:g}ms latency + {jitter_ms:g}ms mean jitter, {error_rate:.1%} injected 5xx errors")
+    print(f"{'Backend':>8} {'Workers':>8} {'Issues':>7} {'Failed':>7} {'Requests':>9} {'Issues/s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for backend_name in backends:
+            task_file = os.path.join(directory, f'{backend_name}-tasks.json')
+            task_count = write_task_file(task_file, gh_issue_count if backend_name == 'gh' else issue_count,
+                                         sprint_capacity)
+            for concurrency in concurrency_levels:
+                github = FakeGitHub(latency=latency_ms / 1000, latency_jitter=jitter_ms / 1000,
+                                    error_rate=error_rate, seed=seed)
+                server = start_server(github)
+                run = os.path.join(directory, f'{backend_name}-{concurrency}')
+                journal = IssueJournal(f'{run}.journal.db', github.repo)
+                # The CLI mirrors the repository for the API backends
+                mirror = IssueMirror(f'{run}.mirror.db', github.repo) if backend_name != 'gh' else None
+                try:
+                    scheduler = RequestScheduler(max_concurrency=concurrency)
+                    backend = make_backend(backend_name, server, scheduler, batch_size, mirror)
+                    creator = RecordingCreator(concurrency=concurrency, backend=backend, journal=journal,
+                                               mirror=mirror)
+                    # The creator reports every call on stdout
+                    with redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        creator.process_task_file(task_file)
+                        elapsed = time.perf_counter() - start
+                    created = [result['seconds'] for result in creator.results if result['status'] == 'created']
+                    issues = task_count + sum(title.startswith('Epic: ') for title in
+                                              (result['title'] for result in creator.results))
+                    print(f"{backend_name:>8} {concurrency:>8} {issues:>7} {issues - len(created):>7} "
+                          f"{github.request_count:>9} {len(created) / elapsed:>9.1f} "
+                          f"{percentile(created, 0.5) * 1000:>8.1f} {percentile(created, 0.99) * 1000:>8.1f}")
+                    assert len(created) == len(github.issues)
+                finally:
+                    server.shutdown()
+                    journal.close()
+                    if mirror is not None:
+                        mirror.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GitHub issue creation')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    backends_parser = subparsers.add_parser('backends', help='gh subprocess versus pooled REST calls per second')
+    backends_parser.add_argument('--issues', type=int, default=2000, help='Issues to create with the REST backend')
+    backends_parser.add_argument('--gh-issues', type=int, default=100,
+                                 help='Issues to create through the gh stand-in (each spawns a process)')
+    backends_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8],
+                                 help='Worker counts to test')
+    backends_parser.add_argument('--latency-ms', type=float, default=0.0,
+                                 help='Delay the fake server adds to every response')
+
+    batch_parser = subparsers.add_parser('batch', help='REST per issue versus batched GraphQL mutations')
+    batch_parser.add_argument('--issues', type=int, default=2000, help='Issues to create per run')
+    batch_parser.add_argument('--batch-size', type=int, nargs='+', default=[10, 50, 100],
+                              help='GraphQL batch sizes to test')
+    batch_parser.add_argument('--concurrency', type=int, default=1, help='Parallel requests')
+    batch_parser.add_argument('--latency-ms', type=float, default=20.0,
+                              help='Delay the fake server adds to every response')
+
+    throttled_parser = subparsers.add_parser('throttled', help='Issue creation against injected 403/429 rate limits')
+    throttled_parser.add_argument('--issues', type=int, default=500, help='Issues to create per run')
+    throttled_parser.add_argument('--concurrency', type=int, default=8, help='Parallel requests')
+    throttled_parser.add_argument('--throttle-every', type=int, default=10,
+                                  help='Refuse every Nth request with a secondary rate limit')
+    throttled_parser.add_argument('--retry-after', type=float, default=0.1,
+                                  help='Retry-After seconds on the injected 429 responses')
+    throttled_parser.add_argument('--rate-limit', type=int, default=200,
+                                  help='Primary rate limit: requests per window (0: none)')
+    throttled_parser.add_argument('--rate-limit-window', type=float, default=1.0,
+                                  help='Seconds per primary rate limit window')
+    throttled_parser.add_argument('--base-delay', type=float, default=0.05,
+                                  help='Backoff base when a refusal carries no Retry-After')
+
+    render_parser = subparsers.add_parser('render', help='Issue and epic body rendering')
+    render_parser.add_argument('--bodies', type=int, default=100000, help='Issue bodies to render')
+    render_parser.add_argument('--sprint-size', type=int, nargs='+', default=[10, 1000, 100000],
+                               help='Tasks per epic; the bodies are split into epics of each size')
+
+    creator_parser = subparsers.add_parser('creator',
+                                           help='GitHubIssueCreator throughput and latency per backend and worker count')
+    creator_parser.add_argument('--issues', type=int, default=1000,
+                                help='Tasks in the generated task file for REST and GraphQL (approximate)')
+    creator_parser.add_argument('--gh-issues', type=int, default=60,
+                                help='Tasks in the task file for the gh stand-in (each call spawns a process)')
+    creator_parser.add_argument('--backend', nargs='+', choices=BACKENDS, default=BACKENDS,
+                                help='Backends to test')
+    creator_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                                help='Worker counts to test')
+    creator_parser.add_argument('--latency-ms', type=float, default=20.0,
+                                help='Delay the fake server adds to every response')
+    creator_parser.add_argument('--jitter-ms', type=float, default=5.0,
+                                help='Mean of the exponentially distributed extra delay per response')
+    creator_parser.add_argument('--error-rate', type=float, default=0.0,
+                                help='Share of all requests answered with a 5xx (0 to 1)')
+    creator_parser.add_argument('--batch-size', type=int, default=50, help='Issues per GraphQL request')
+    creator_parser.add_argument('--sprint-capacity', type=int, default=20,
+                                help='Sprint capacity in story points the task file is planned with')
+    creator_parser.add_argument('--seed', type=int, default=1, help='Seed for the jitter and error injection')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'backends':
+        benchmark_backends(args.issues, args.gh_issues, args.concurrency, args.latency_ms)
+    elif args.benchmark == 'batch':
+        benchmark_batching(args.issues, args.batch_size, args.concurrency, args.latency_ms)
+    elif args.benchmark == 'throttled':
+        benchmark_throttling(args.issues, args.concurrency, args.throttle_every, args.retry_after,
+                             args.rate_limit, args.rate_limit_window, args.base_delay)
+    elif args.benchmark == 'render':
+        benchmark_rendering(args.bodies, args.sprint_size)
+    elif args.benchmark == 'creator':
+        benchmark_creator(args.issues, args.gh_issues, args.backend, args.concurrency, args.latency_ms,
+                          args.jitter_ms, args.error_rate, args.batch_size, args.sprint_capacity, args.seed)
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
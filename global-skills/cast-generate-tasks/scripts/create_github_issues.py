@@ -3,283 +3,1061 @@
 Create GitHub issues from generated tasks
 """
 import json
-import subprocess
+import os
 import argparse
 import sys
-from typing import Dict, List, Any
+import threading
+import time
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Set
+
+from github_backends import (BACKENDS, DEFAULT_API_URL, GhCliBackend, GitHubError, GraphQLBackend, RestBackend,
+                             detect_repo)
+from issue_journal import IssueJournal, content_hash, legacy_task_key, task_key
+from issue_mirror import IssueMirror
+from json_stream import JsonStreamReader
+from request_scheduler import RequestScheduler
+
+EPIC_LABELS = ['epic', 'sprint']
+# Jobs queued per pool worker ahead of the one it is running
+QUEUE_DEPTH = 4
+# Answers to a PATCH of an issue that was transferred (301), deleted (404) or removed (410)
+ISSUE_GONE_STATUSES = {301, 404, 410}
+
+# Fixed parts of issue and epic bodies. Bodies are assembled as a list of
+# these fragments and per-task lines, then joined once.
+ISSUE_CRITERIA_HEADER = """
+## Acceptance Criteria
+"""
+CRITERION_SEPARATOR = "\n- [ ] "
+ISSUE_DETAILS_HEADER = """
+## Technical Details
+"""
+ISSUE_DEFINITION_OF_DONE = """
+## Definition of Done
+- [ ] Code implemented and tested
+- [ ] Code review completed
+- [ ] Documentation updated
+- [ ] Acceptance criteria verified
+"""
+EPIC_GOALS = """
+## Sprint Goals
+- Complete core feature development
+- Maintain high code quality
+- Ensure proper testing coverage
+
+## Tasks in This Sprint
+"""
+EPIC_DEFINITION_OF_DONE = """
+## Definition of Done
+- [ ] All tasks completed
+- [ ] Code reviews completed
+- [ ] Integration testing passed
+- [ ] Sprint demo conducted
+"""
+SIZE_LABELS = {1: 'size/XS', 2: 'size/S', 3: 'size/M', 5: 'size/L', 8: 'size/XL', 13: 'size/XXL'}
 
 class GitHubIssueCreator:
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, concurrency: int = 1, backend: Any = None,
+                 journal: Optional[IssueJournal] = None, mirror: Optional[IssueMirror] = None,
+                 source: Optional[str] = None):
         self.dry_run = dry_run
+        # Parallel GitHub calls; 1 keeps the original one-at-a-time behaviour
+        self.concurrency = max(1, concurrency)
+        self.backend = backend or GhCliBackend()
+        # Issues created by earlier runs; those tasks are skipped
+        self.journal = journal
+        # Local copy of the repository's issues, the same one the backend refreshes its listings into
+        self.mirror = mirror
+        # The PRD the task file was generated from, as journaled with each issue; None until known
+        self.source = source
+        self._key_counts: Dict[str, int] = {}
+        # Milestone titles and label names the repository has, listed once by prefetch()
+        self.milestone_index: Optional[Set[str]] = None
+        self.label_index: Optional[Set[str]] = None
+        # Milestones being created in the background while a stream is read; issues in them wait
+        self.pending_milestones: Dict[str, Future] = {}
+        # Labels being created the same way; issues that carry them wait
+        self.pending_labels: Dict[str, Future] = {}
+        # The one pool milestones and labels are created on while a stream is read
+        self.setup_pool: Optional[ThreadPoolExecutor] = None
+        # Pool threads print progress; a line is written whole under this lock
+        self._output_lock = threading.Lock()
         
-    def check_gh_cli(self) -> bool:
-        """Check if GitHub CLI is installed and authenticated"""
+    def log(self, message: str) -> None:
+        """Print a progress message without interleaving it with another thread's"""
+        with self._output_lock:
+            print(message)
+    
+    def use_source(self, source: Optional[str]) -> None:
+        """Take source as the task file's source unless one is already set"""
+        if self.source is None:
+            self.source = source or ''
+    
+    def check_backend(self) -> bool:
+        """Check that the backend can reach GitHub with working credentials"""
         try:
-            result = subprocess.run(['gh', 'auth', 'status'], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                print("Error: GitHub CLI not authenticated. Run 'gh auth login' first.")
-                return False
+            self.backend.probe()
             return True
-        except FileNotFoundError:
-            print("Error: GitHub CLI not found. Install from https://cli.github.com/")
+        except GitHubError as e:
+            print(f"Error: {e}")
             return False
     
-    def create_milestone(self, title: str, description: str, due_date: str = None) -> bool:
-        """Create a milestone for sprint organization"""
+    def prefetch(self) -> bool:
+        """List the repository's milestones and labels once into in-memory indexes
+        
+        With a mirror, the issue mirror is brought up to date as well, so
+        issues created by a run the journal missed are found before they
+        are duplicated.
+        """
         if self.dry_run:
-            print(f"[DRY RUN] Would create milestone: {title}")
             return True
-            
-        cmd = ['gh', 'api', 'repos/:owner/:repo/milestones', '--method', 'POST',
-               '--field', f'title={title}',
-               '--field', f'description={description}']
         
-        if due_date:
-            cmd.extend(['--field', f'due_on={due_date}'])
+        try:
+            self.milestone_index = {milestone['title'] for milestone in self.backend.list_milestones()}
+            self.label_index = {label['name'] for label in self.backend.list_labels()}
+            if self.mirror is not None:
+                self.backend.list_issues()
+            return True
+        except GitHubError as e:
+            print(f"Error listing milestones and labels: {e}")
+            return False
+    
+    def create_milestones(self, titles: Iterable[str]) -> int:
+        """Create the sprint milestones the repository does not have yet; how many this call created"""
+        missing = []
+        for title in titles:
+            if self.milestone_index is not None and title in self.milestone_index:
+                self.log(f"Milestone '{title}' already exists")
+            else:
+                missing.append(title)
+        return sum(self.run_pool(self.create_milestone, [(title, f"Development sprint: {title}") for title in missing]))
+    
+    def await_milestone(self, milestone: Optional[str]) -> None:
+        """Block until a milestone started in the background exists"""
+        future = self.pending_milestones.get(milestone) if milestone else None
+        if future is not None:
+            future.result()
+    
+    def await_labels(self, labels: Iterable[str]) -> None:
+        """Block until labels started in the background exist"""
+        for label in labels:
+            future = self.pending_labels.get(label)
+            if future is not None:
+                future.result()
+    
+    def ensure_labels(self, labels: Iterable[str]) -> None:
+        """Create the labels the repository does not have yet, in one pass
+        
+        While setup_pool is open they are created on it in the background,
+        and issues carrying them wait in await_labels().
+        """
+        if self.dry_run or self.label_index is None:
+            return
         
+        missing = [label for label in dict.fromkeys(labels) if label not in self.label_index]
+        if not missing:
+            return
+        self.label_index.update(missing)
+        if self.setup_pool is None:
+            self.run_pool(self.create_label, [(label,) for label in missing])
+            return
+        for label in missing:
+            future = self.setup_pool.submit(self.create_label, label)
+            self.pending_labels[label] = future
+            if self.concurrency <= 1:
+                # Calls run one at a time anyway; waiting here keeps the output in order
+                future.result()
+    
+    def create_label(self, name: str) -> bool:
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"Created milestone: {title}")
+            if self.backend.create_label(name):
+                self.log(f"Created label: {name}")
+            return True
+        except GitHubError as e:
+            self.log(f"Error creating label '{name}': {e}")
+            return False
+    
+    def create_milestone(self, title: str, description: str, due_date: str = None) -> bool:
+        """Create a milestone for sprint organization; True only if this call created it"""
+        if self.dry_run:
+            self.log(f"[DRY RUN] Would create milestone: {title}")
+            return True
+            
+        try:
+            if self.backend.create_milestone(title, description, due_date):
+                self.log(f"Created milestone: {title}")
                 return True
-            else:
-                # Milestone might already exist
-                if "already_exists" in result.stderr:
-                    print(f"Milestone '{title}' already exists")
-                    return True
-                else:
-                    print(f"Error creating milestone: {result.stderr}")
-                    return False
-        except Exception as e:
-            print(f"Error creating milestone: {e}")
+            self.log(f"Milestone '{title}' already exists")
+            return False
+        except GitHubError as e:
+            self.log(f"Error creating milestone: {e}")
             return False
     
     def format_issue_body(self, task: Dict[str, Any]) -> str:
         """Format task as GitHub issue body"""
-        body = f"""## Description
-{task['description']}
-
-## Acceptance Criteria
-"""
-        for criterion in task.get('acceptance_criteria', []):
-            body += f"- [ ] {criterion}\n"
-        
-        body += f"""
-## Technical Details
-- **Story Points:** {task['story_points']}
-- **Type:** {task['type']}
-- **Priority:** {task.get('priority', 'medium')}
-"""
+        criteria = task.get('acceptance_criteria')
+        parts = [f"## Description\n{task['description']}\n", ISSUE_CRITERIA_HEADER]
+        if criteria:
+            # One join for the whole checklist instead of a string per item
+            parts.append(f"- [ ] {CRITERION_SEPARATOR.join(criteria)}\n")
+        parts.append(f"{ISSUE_DETAILS_HEADER}- **Story Points:** {task['story_points']}\n- **Type:** {task['type']}\n"
+                     f"- **Priority:** {task.get('priority', 'medium')}\n")
         
         if task.get('story_id'):
-            body += f"- **User Story:** {task['story_id']}\n"
+            parts.append(f"- **User Story:** {task['story_id']}\n")
         
         if task.get('dependencies'):
-            body += f"- **Dependencies:** {', '.join(task['dependencies'])}\n"
-        
-        body += """
-## Definition of Done
-- [ ] Code implemented and tested
-- [ ] Code review completed
-- [ ] Documentation updated
-- [ ] Acceptance criteria verified
-"""
+            parts.append(f"- **Dependencies:** {', '.join(task['dependencies'])}\n")
         
-        return body
+        parts.append(ISSUE_DEFINITION_OF_DONE)
+        return ''.join(parts)
     
-    def create_issue(self, task: Dict[str, Any], milestone: str = None) -> str:
-        """Create a GitHub issue from a task"""
-        title = task['title']
-        body = self.format_issue_body(task)
-        labels = task.get('labels', [])
+    def issue_labels(self, task: Dict[str, Any]) -> List[str]:
+        """The task's labels plus its size and priority labels"""
+        labels = list(task.get('labels', []))
         
         # Add size label based on story points
-        size_map = {1: 'size/XS', 2: 'size/S', 3: 'size/M', 5: 'size/L', 8: 'size/XL', 13: 'size/XXL'}
-        size_label = size_map.get(task['story_points'], 'size/M')
-        labels.append(size_label)
+        labels.append(SIZE_LABELS.get(task['story_points'], 'size/M'))
         
         # Add priority label
         priority = task.get('priority', 'medium')
         labels.append(f'priority/{priority}')
         
+        return labels
+    
+    def journal_key(self, task: Dict[str, Any]) -> str:
+        """A task's journal key: its ID, or one derived the same way for format 1 tasks"""
+        if task.get('id'):
+            return task['id']
+        key = task_key(task['type'], task['title'])
+        count = self._key_counts.get(key, 0) + 1
+        self._key_counts[key] = count
+        return f"{key}-{count}" if count > 1 else key
+    
+    def journal_issue(self, key: Optional[str], issue_number: str, title: str, body: str,
+                      labels: List[str], milestone: Optional[str] = None) -> None:
+        if self.journal is not None and key and not self.dry_run:
+            self.journal.record(key, issue_number, title, content_hash(title, body, labels, milestone),
+                                self.source or '')
+    
+    def journaled_number(self, key: str) -> Optional[str]:
+        """Issue number the journal has for key from this run's source
+        
+        An entry journaled before keys had a source is adopted by the first
+        source that asks for its key, and one journaled under the shorter
+        legacy form of key is moved to key; a dry run only looks at them.
+        """
+        source = self.source or ''
+        issue_number = self.journal.get(key, source)
+        if issue_number is not None:
+            return issue_number
+        for old_key in filter(None, (key, legacy_task_key(key))):
+            for old_source in dict.fromkeys((source, '')):
+                if (old_key, old_source) == (key, source):
+                    continue
+                if self.dry_run:
+                    issue_number = self.journal.get(old_key, old_source)
+                else:
+                    issue_number = self.journal.adopt(key, source, old_key, old_source)
+                if issue_number is not None:
+                    return issue_number
+        return None
+    
+    def journaled_issue(self, key: Optional[str], title: str,
+                        rendered: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Issue number from an earlier run, if the journal has one for key
+        
+        Failing that, an open issue in the mirror with the rendered title and
+        body is taken as the task's issue and journaled, unless another
+        source's task already has it.
+        """
+        issue_number = self.journaled_number(key) if self.journal is not None and key else None
+        if issue_number:
+            self.log(f"Issue #{issue_number} already exists: {title}")
+        elif self.mirror is not None and rendered is not None:
+            owners = (None, self.source or '')
+            issue_number = next((number for number in self.mirror.find_issues(rendered['title'], rendered['body'])
+                                 if self.journal is None or self.journal.owner(number) in owners), None)
+            if issue_number:
+                self.log(f"Issue #{issue_number} already exists (same title and body): {title}")
+                self.journal_issue(key, issue_number, **rendered)
+        return issue_number
+    
+    def render_issue(self, task: Dict[str, Any], milestone: Optional[str] = None) -> Dict[str, Any]:
+        """The title, body, labels and milestone a task's issue is created with"""
+        return {'title': task['title'], 'body': self.format_issue_body(task),
+                'labels': self.issue_labels(task), 'milestone': milestone}
+    
+    def create_issue(self, task: Dict[str, Any], milestone: str = None, key: Optional[str] = None,
+                     rendered: Optional[Dict[str, Any]] = None) -> str:
+        """Create a GitHub issue from a task, or from its render_issue() output when given"""
+        rendered = rendered or self.render_issue(task, milestone)
+        title, body, labels = rendered['title'], rendered['body'], rendered['labels']
+        
         if self.dry_run:
-            print(f"[DRY RUN] Would create issue: {title}")
-            print(f"  Labels: {', '.join(labels)}")
+            lines = [f"[DRY RUN] Would create issue: {title}", f"  Labels: {', '.join(labels)}"]
             if milestone:
-                print(f"  Milestone: {milestone}")
+                lines.append(f"  Milestone: {milestone}")
+            self.log('\n'.join(lines))
             return f"#{len(title)}"  # Mock issue number
         
-        cmd = ['gh', 'issue', 'create',
-               '--title', title,
-               '--body', body,
-               '--label', ','.join(labels)]
-        
-        if milestone:
-            cmd.extend(['--milestone', milestone])
-        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                issue_url = result.stdout.strip()
-                issue_number = issue_url.split('/')[-1]
-                print(f"Created issue #{issue_number}: {title}")
-                return issue_number
-            else:
-                print(f"Error creating issue '{title}': {result.stderr}")
-                return None
-        except Exception as e:
-            print(f"Error creating issue '{title}': {e}")
+            self.await_milestone(milestone)
+            self.await_labels(labels)
+            issue_number = self.backend.create_issue(title, body, labels, milestone)
+            self.log(f"Created issue #{issue_number}: {title}")
+            self.journal_issue(key, issue_number, title, body, labels, milestone)
+            return issue_number
+        except GitHubError as e:
+            self.log(f"Error creating issue '{title}': {e}")
             return None
     
-    def create_epic_issues(self, sprints: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
-        """Create epic issues for each sprint"""
-        epic_issues = {}
+    def set_issue_milestone(self, issue_number: str, milestone: str) -> bool:
+        """Attach an existing issue to a milestone"""
+        if self.dry_run:
+            self.log(f"[DRY RUN] Would add issue {issue_number} to milestone: {milestone}")
+            return True
         
-        for sprint_name, tasks in sprints.items():
-            total_points = sum(task['story_points'] for task in tasks)
-            task_count = len(tasks)
-            
-            epic_title = f"Epic: {sprint_name}"
-            epic_body = f"""# {sprint_name}
-            
-## Overview
-Sprint containing {task_count} tasks with {total_points} story points total.
-
-## Sprint Goals
-- Complete core feature development
-- Maintain high code quality
-- Ensure proper testing coverage
-
-## Tasks in This Sprint
-"""
-            
-            for task in tasks:
-                epic_body += f"- [ ] {task['title']} ({task['story_points']} pts)\n"
-            
-            epic_body += f"""
+        try:
+            self.backend.set_issue_milestone(str(issue_number).lstrip('#'), milestone)
+            return True
+        except GitHubError as e:
+            self.log(f"Error setting milestone on issue #{issue_number}: {e}")
+            return False
+    
+    def create_epic_issue(self, sprint_name: str, tasks: List[Dict[str, Any]],
+                          issue_numbers: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+        """Create the epic issue for one sprint, linking its task issues when known
+        
+        Returns its result for the result table; an epic from an earlier run
+        has status 'existing'.
+        """
+        start = time.perf_counter()
+        key = f"epic:{sprint_name}"
+        epic_title = f"Epic: {sprint_name}"
+        epic_body = self.format_epic_body(sprint_name, tasks, issue_numbers)
+        existing = self.journaled_issue(key, epic_title, {'title': epic_title, 'body': epic_body,
+                                                          'labels': EPIC_LABELS, 'milestone': None})
+        if existing:
+            return self.issue_result({'title': epic_title}, sprint_name, existing, 'existing',
+                                     time.perf_counter() - start)
+        
+        if self.dry_run:
+            self.log(f"[DRY RUN] Would create epic: {epic_title}")
+            issue_number = f"#{len(epic_title)}"
+        else:
+            try:
+                issue_number = self.backend.create_issue(epic_title, epic_body, EPIC_LABELS)
+                self.log(f"Created epic #{issue_number}: {epic_title}")
+                self.journal_issue(key, issue_number, epic_title, epic_body, EPIC_LABELS)
+            except GitHubError as e:
+                self.log(f"Error creating epic '{epic_title}': {e}")
+                issue_number = None
+        return self.issue_result({'title': epic_title}, sprint_name, issue_number, None, time.perf_counter() - start)
+    
+    def format_epic_body(self, sprint_name: str, tasks: List[Dict[str, Any]],
+                         issue_numbers: Optional[List[Optional[str]]] = None) -> str:
+        """Format a sprint as its epic issue body
+        
+        The checklist and the point total come from one pass over the
+        tasks; the overview that quotes the total is filled in after it.
+        """
+        parts = [None, EPIC_GOALS]
+        total_points = 0
+        for i, task in enumerate(tasks):
+            issue_number = issue_numbers[i] if issue_numbers else None
+            link = f"#{str(issue_number).lstrip('#')} " if issue_number else ''
+            parts.append(f"- [ ] {link}{task['title']} ({task['story_points']} pts)\n")
+            total_points += task['story_points']
+        task_count = len(tasks)
+        
+        parts[0] = (f"# {sprint_name}\n            \n## Overview\n"
+                    f"Sprint containing {task_count} tasks with {total_points} story points total.\n")
+        parts.append(f"""
 ## Sprint Metrics
 - **Total Tasks:** {task_count}
 - **Total Story Points:** {total_points}
 - **Sprint Capacity:** {total_points} points
-
-## Definition of Done
-- [ ] All tasks completed
-- [ ] Code reviews completed
-- [ ] Integration testing passed
-- [ ] Sprint demo conducted
-"""
-            
-            epic_task = {
-                'title': epic_title,
-                'description': f"Epic for {sprint_name}",
-                'type': 'epic',
-                'story_points': total_points,
-                'labels': ['epic', 'sprint'],
-                'acceptance_criteria': [
-                    'All sprint tasks completed',
-                    'Sprint goals achieved',
-                    'Quality standards maintained'
-                ]
-            }
-            
-            # Override body for epic
-            if self.dry_run:
-                print(f"[DRY RUN] Would create epic: {epic_title}")
-                epic_issues[sprint_name] = f"#{len(epic_title)}"
+""")
+        parts.append(EPIC_DEFINITION_OF_DONE)
+        return ''.join(parts)
+    
+    def create_epic_issues(self, sprints: Dict[str, List[Dict[str, Any]]],
+                           issue_numbers: Optional[Dict[str, List[Optional[str]]]] = None) -> List[Dict[str, Any]]:
+        """Create epic issues for each sprint, returning their results in sprint order
+        
+        issue_numbers maps each sprint to the issue numbers of its tasks, in
+        task order, so the epic checklist can link them.
+        """
+        jobs = [(sprint_name, tasks, (issue_numbers or {}).get(sprint_name)) for sprint_name, tasks in sprints.items()]
+        return self.run_pool(self.create_epic_issue, jobs)
+    
+    def run_pool(self, fn: Callable[..., Any], jobs: Iterable[tuple]) -> List[Any]:
+        """Run fn(*job) for every job, returning results in job order
+        
+        With concurrency above 1 the calls run on a bounded thread pool; jobs
+        are submitted as the iterable yields them, so a streamed task file
+        keeps the workers busy while it is still being read. At most
+        QUEUE_DEPTH jobs per worker wait to run, which keeps a file read no
+        further ahead of the API than that.
+        """
+        if self.concurrency <= 1:
+            return [fn(*job) for job in jobs]
+        slots = threading.BoundedSemaphore(self.concurrency * QUEUE_DEPTH)
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for job in jobs:
+                slots.acquire()
+                future = pool.submit(fn, *job)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+            return [future.result() for future in futures]
+    
+    def issue_result(self, task: Dict[str, Any], sprint_name: Optional[str], issue_number: Optional[str],
+                     status: Optional[str], seconds: float) -> Dict[str, Any]:
+        return {
+            'title': task['title'],
+            'sprint': sprint_name,
+            'number': issue_number,
+            'status': status or ('created' if issue_number else 'failed'),
+            'seconds': round(seconds, 3)
+        }
+    
+    def create_issue_result(self, task: Dict[str, Any], sprint_name: Optional[str],
+                            milestone: Optional[str] = None, key: Optional[str] = None) -> Dict[str, Any]:
+        """Create one issue and record its outcome for the result table"""
+        start = time.perf_counter()
+        rendered = self.render_issue(task, milestone) if self.mirror is not None else None
+        issue_number = self.journaled_issue(key, task['title'], rendered)
+        if issue_number:
+            return self.issue_result(task, sprint_name, issue_number, 'existing', time.perf_counter() - start)
+        issue_number = self.create_issue(task, milestone, key, rendered)
+        return self.issue_result(task, sprint_name, issue_number, None, time.perf_counter() - start)
+    
+    def create_issue_batch(self, jobs: List[tuple]) -> List[Dict[str, Any]]:
+        """Create the issues of several (task, sprint_name, milestone, key) jobs in one backend call"""
+        start = time.perf_counter()
+        rendered = [self.render_issue(task, milestone) for task, _, milestone, _ in jobs]
+        existing = [self.journaled_issue(key, task['title'], issue)
+                    for (task, _, _, key), issue in zip(jobs, rendered)]
+        issues = [issue for issue, issue_number in zip(rendered, existing) if not issue_number]
+        for milestone in {issue['milestone'] for issue in issues}:
+            self.await_milestone(milestone)
+        self.await_labels({label for issue in issues for label in issue['labels']})
+        numbers = iter(self.backend.create_issues(issues) if issues else [])
+        seconds = time.perf_counter() - start
+        
+        results = []
+        issues = iter(issues)
+        for (task, sprint_name, _, key), issue_number in zip(jobs, existing):
+            if issue_number:
+                results.append(self.issue_result(task, sprint_name, issue_number, 'existing', 0))
+                continue
+            issue, issue_number = next(issues), next(numbers)
+            if isinstance(issue_number, GitHubError):
+                self.log(f"Error creating issue '{task['title']}': {issue_number}")
+                issue_number = None
             else:
-                cmd = ['gh', 'issue', 'create',
-                       '--title', epic_title,
-                       '--body', epic_body,
-                       '--label', 'epic,sprint']
-                
-                try:
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-                    if result.returncode == 0:
-                        issue_url = result.stdout.strip()
-                        issue_number = issue_url.split('/')[-1]
-                        epic_issues[sprint_name] = issue_number
-                        print(f"Created epic #{issue_number}: {epic_title}")
-                    else:
-                        print(f"Error creating epic '{epic_title}': {result.stderr}")
-                except Exception as e:
-                    print(f"Error creating epic '{epic_title}': {e}")
-        
-        return epic_issues
+                self.log(f"Created issue #{issue_number}: {task['title']}")
+                self.journal_issue(key, issue_number, **issue)
+            results.append(self.issue_result(task, sprint_name, issue_number, None, seconds))
+        return results
     
-    def process_task_file(self, task_file: str, create_milestones: bool = True) -> bool:
-        """Process generated tasks file and create GitHub issues"""
+    def create_issue_results(self, jobs: Iterable[tuple]) -> List[Dict[str, Any]]:
+        """Create issues for (task, sprint_name, milestone) jobs, returning results in job order
+        
+        Tasks the journal already has an issue for are skipped. Backends that
+        can create issues in bulk get the jobs in chunks of their batch size;
+        each chunk is one call, and chunks run in parallel up to the
+        concurrency limit.
+        """
+        # Keys are assigned here, in job order, so format 1 duplicates number consistently across runs
+        return self.create_keyed_issue_results(
+            (task, sprint_name, milestone, self.journal_key(task)) for task, sprint_name, milestone in jobs)
+    
+    def create_keyed_issue_results(self, jobs: Iterable[tuple]) -> List[Dict[str, Any]]:
+        """create_issue_results for (task, sprint_name, milestone, key) jobs"""
+        if self.dry_run or not hasattr(self.backend, 'create_issues'):
+            return self.run_pool(self.create_issue_result, jobs)
+        
+        batches = ((batch,) for batch in chunked(jobs, self.backend.batch_size))
+        return [result for batch in self.run_pool(self.create_issue_batch, batches) for result in batch]
+    
+    def all_labels(self, sprints: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        """Every label the issues and epics for these sprints will carry"""
+        labels = list(EPIC_LABELS)
+        for sprint_tasks in sprints.values():
+            for task in sprint_tasks:
+                labels.extend(self.issue_labels(task))
+        return labels
+    
+    def print_result_table(self, results: List[Dict[str, Any]]) -> None:
+        print(f"\n{'Issue':>7}  {'Status':<9} {'Sprint':<12} {'Seconds':>8}  Title")
+        for result in results:
+            number = str(result['number'] or '-').lstrip('#')
+            print(f"{number:>7}  {result['status']:<9} {result['sprint'] or '-':<12} "
+                  f"{result['seconds']:>8.3f}  {result['title']}")
+    
+    def print_skipped(self, results: List[Dict[str, Any]]) -> None:
+        existing = sum(result['status'] == 'existing' for result in results)
+        if existing:
+            print(f"✅ Skipped {existing} issues already created by an earlier run")
+    
+    def resolve_sprints(self, data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Return sprints with full task dicts for both output formats
+        
+        Format 2 sprints list task IDs; format 1 sprints embed task copies.
+        """
+        sprints = data.get('sprints', {})
+        if data.get('format_version', 1) < 2:
+            return sprints
+        
+        tasks_by_id = {task['id']: task for task in data.get('tasks', [])}
+        resolved = {}
+        for sprint_name, task_ids in sprints.items():
+            missing = [task_id for task_id in task_ids if task_id not in tasks_by_id]
+            if missing:
+                print(f"Warning: {sprint_name} references unknown tasks: {', '.join(missing)}")
+            resolved[sprint_name] = [tasks_by_id[task_id] for task_id in task_ids if task_id in tasks_by_id]
+        return resolved
+    
+    def parse_stream_header(self, first_line: str) -> Optional[Dict[str, Any]]:
+        """Return the first record if the file is an NDJSON task stream, else None"""
+        try:
+            record = json.loads(first_line)
+        except json.JSONDecodeError:
+            return None
+        # A single-line JSON document is a whole task file, not a stream record
+        if not isinstance(record, dict) or 'tasks' in record:
+            return None
+        return record
+    
+    def iter_task_stream(self, lines: Iterator[str]) -> Iterator[Dict[str, Any]]:
+        """Yield records from an NDJSON task stream, skipping blank lines"""
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    
+    def iter_task_document(self, reader: JsonStreamReader) -> Iterator[Dict[str, Any]]:
+        """Yield a JSON task file as task stream records while it is decoded
+        
+        Format 2 files written by generate_tasks.py list the sprints' task
+        IDs ahead of the tasks, so each task is yielded as {'sprint', 'task'}
+        as it is decoded. Tasks listed before the sprints, as in older files,
+        are yielded bare and placed from the trailer, as in an NDJSON stream.
+        Every task embedded in a format 1 sprint is yielded as {'sprint',
+        'task'}; format 1's top-level task copies are skipped. The file's
+        source, which generate_tasks.py writes first, is yielded as a header.
+        """
+        trailer = {'sprints': {}}
+        sprint_of: Dict[str, str] = {}
+        for key in reader.members():
+            if key == 'source':
+                yield {'header': {'source': reader.value()}}
+            elif key == 'tasks':
+                for task in reader.items():
+                    if isinstance(task, dict) and task.get('id'):
+                        sprint_name = sprint_of.get(task['id'])
+                        yield {'sprint': sprint_name, 'task': task} if sprint_name else task
+            elif key == 'sprints':
+                for sprint_name in reader.members():
+                    task_ids = []
+                    for task in reader.items():
+                        if isinstance(task, dict):
+                            yield {'sprint': sprint_name, 'task': task}
+                        else:
+                            task_ids.append(task)
+                            sprint_of.setdefault(task, sprint_name)
+                    if task_ids:
+                        trailer['sprints'][sprint_name] = task_ids
+            else:
+                trailer[key] = reader.value()
+        yield {'trailer': trailer}
+    
+    def process_task_stream(self, records: Iterator[Dict[str, Any]], create_milestones: bool = True,
+                            default_source: str = '') -> bool:
+        """Create issues from a task stream as each task arrives
+        
+        The source named by a header record, or else default_source, is
+        journaled with each issue.
+        
+        A {'sprint', 'task'} record names its sprint up front, and its issue is
+        created in the milestone directly. A bare task's sprint is only known
+        once the trailer arrives, so its issue is created without a milestone
+        and attached to its sprint's milestone afterwards. The trailer's ID lists still set
+        the order of each sprint's epic checklist.
+        
+        Of each task only the ID, title and story points the epics need are
+        kept once its issue is queued.
+        """
+        # Per job, in job order
+        job_tasks: List[Dict[str, Any]] = []
+        job_sprints: List[Optional[str]] = []
+        stream = {'trailer': None}
+        
+        if not self.prefetch():
+            return False
+        self.ensure_labels(EPIC_LABELS)
+        
+        # A sprint's milestone, or a new label, is started when the first task needing it arrives;
+        # only issues in it or carrying it wait for it
+        self.setup_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        
+        def jobs() -> Iterator[tuple]:
+            for record in records:
+                if 'header' in record:
+                    self.use_source(record['header'].get('source'))
+                    continue
+                if 'trailer' in record:
+                    stream['trailer'] = record['trailer']
+                    return
+                self.use_source(default_source)
+                task, sprint_name = (record['task'], record['sprint']) if 'task' in record else (record, None)
+                milestone = sprint_name if create_milestones else None
+                if milestone and milestone not in self.pending_milestones:
+                    future = self.setup_pool.submit(self.create_milestones, [milestone])
+                    self.pending_milestones[milestone] = future
+                    if self.concurrency <= 1:
+                        # Calls run one at a time anyway; waiting here keeps the output in order
+                        future.result()
+                job_tasks.append({key: task[key] for key in ('id', 'title', 'story_points') if key in task})
+                job_sprints.append(sprint_name)
+                self.ensure_labels(self.issue_labels(task))
+                yield (task, sprint_name, milestone)
+        
+        print("Creating issues as tasks arrive...")
+        try:
+            with self.setup_pool:
+                results = self.create_issue_results(jobs())
+        finally:
+            self.setup_pool = None
+        trailer = stream['trailer']
+        
+        if trailer is None:
+            print("Error: task stream ended without a trailer record")
+            return False
+        if not results:
+            print("No tasks found in file")
+            return False
+        
+        placed: Dict[str, List[int]] = {}
+        for index, sprint_name in enumerate(job_sprints):
+            if sprint_name is not None:
+                placed.setdefault(sprint_name, []).append(index)
+        
+        index_of = {task['id']: index for index, task in enumerate(job_tasks) if 'id' in task}
+        referenced = self.resolve_sprints({
+            'format_version': trailer.get('format_version', 2),
+            'tasks': [job_tasks[index] for index in index_of.values()],
+            'sprints': trailer.get('sprints', {})
+        })
+        sprint_jobs = {sprint_name: [index_of[task['id']] for task in sprint_tasks]
+                       for sprint_name, sprint_tasks in referenced.items()}
+        for sprint_name, indexes in placed.items():
+            listed = set(sprint_jobs.get(sprint_name, []))
+            sprint_jobs.setdefault(sprint_name, []).extend(index for index in indexes if index not in listed)
+        
+        # Issues created before their sprint was known
+        unplaced = [(index, sprint_name) for sprint_name, indexes in sprint_jobs.items()
+                    for index in indexes if job_sprints[index] is None]
+        for index, sprint_name in unplaced:
+            results[index]['sprint'] = sprint_name
+        
+        # Milestones this run created, not the ones it found
+        milestones_created = sum(future.result() for future in self.pending_milestones.values())
+        if create_milestones:
+            milestones_created += self.create_milestones(dict.fromkeys(sprint_name for _, sprint_name in unplaced))
+            # Issues from an earlier run that the mirror already shows in their milestone need no call
+            mirrored = ({str(issue['number']): (issue.get('milestone') or {}).get('title')
+                         for issue in self.mirror.issues()} if self.mirror is not None and not self.dry_run else {})
+            self.run_pool(self.set_issue_milestone, [
+                (results[index]['number'], sprint_name) for index, sprint_name in unplaced
+                if results[index]['number'] and mirrored.get(str(results[index]['number']).lstrip('#')) != sprint_name
+            ])
+        
+        sprints = {sprint_name: [job_tasks[index] for index in indexes] for sprint_name, indexes in sprint_jobs.items()}
+        epic_results = self.create_epic_issues(sprints, {
+            sprint_name: [results[index]['number'] for index in indexes]
+            for sprint_name, indexes in sprint_jobs.items()
+        })
+        
+        self.print_result_table(results)
+        
+        # Summary
+        print(f"\n✅ Created {sum(result['status'] == 'created' for result in results)} issues")
+        self.print_skipped(results)
+        print(f"✅ Created {sum(result['status'] == 'created' for result in epic_results)} epic issues")
+        if create_milestones:
+            print(f"✅ Created {milestones_created} milestones")
+        
+        return True
+    
+    def load_task_data(self, task_file: str) -> Optional[Dict[str, Any]]:
+        """Read a whole JSON task file or NDJSON task stream into the JSON file layout"""
         try:
-            with open(task_file, 'r') as f:
-                data = json.load(f)
+            f = sys.stdin if task_file == '-' else open(task_file, 'r')
         except FileNotFoundError:
             print(f"Error: Task file '{task_file}' not found")
-            return False
+            return None
+        
+        tasks = []
+        header = {}
+        trailer = None
+        try:
+            with f:
+                first_line = f.readline()
+                first_record = self.parse_stream_header(first_line)
+                if first_record is None:
+                    return json.loads(first_line + f.read())
+                for record in prepend(first_record, self.iter_task_stream(f)):
+                    if 'header' in record:
+                        header = record['header']
+                        continue
+                    if 'trailer' in record:
+                        trailer = record['trailer']
+                        break
+                    tasks.append(record)
         except json.JSONDecodeError as e:
             print(f"Error parsing task file: {e}")
-            return False
+            return None
         
-        tasks = data.get('tasks', [])
-        sprints = data.get('sprints', {})
+        if trailer is None:
+            print("Error: task stream ended without a trailer record")
+            return None
+        data = {'format_version': trailer.get('format_version', 2), 'tasks': tasks,
+                'sprints': trailer.get('sprints', {}), 'summary': trailer.get('summary', {})}
+        if header.get('source'):
+            data['source'] = header['source']
+        return data
+    
+    def issue_changes(self, issue: Dict[str, Any], title: str, body: str, labels: List[str],
+                      milestone: Optional[str]) -> Dict[str, Any]:
+        """Fields to PATCH so an existing issue matches its rendered task; empty if it already does
+        
+        A milestone of None leaves the issue's milestone alone.
+        """
+        current_labels = [label['name'] for label in issue.get('labels') or []]
+        current_milestone = (issue.get('milestone') or {}).get('title')
+        milestone = milestone or current_milestone
+        current_body = issue.get('body') or ''
+        if (issue.get('state') == 'open' and content_hash(issue['title'], current_body, current_labels, current_milestone)
+                == content_hash(title, body, labels, milestone)):
+            return {}
+        
+        changes = {}
+        if issue['title'] != title:
+            changes['title'] = title
+        if current_body != body:
+            changes['body'] = body
+        if sorted(current_labels) != sorted(labels):
+            changes['labels'] = labels
+        if milestone != current_milestone:
+            changes['milestone'] = milestone
+        if issue.get('state') != 'open':
+            changes['state'] = 'open'
+        return changes
+    
+    def update_issue_result(self, issue_number: str, title: str, sprint_name: Optional[str],
+                            changes: Dict[str, Any], key: Optional[str] = None,
+                            rendered: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """PATCH one issue and record its outcome for the result table
         
-        if not tasks:
+        rendered holds the title, body, labels and milestone the issue now
+        matches, to refresh its journal entry. An issue GitHub no longer has
+        is dropped from the journal and the mirror, and created again from
+        rendered when there is one.
+        """
+        start = time.perf_counter()
+        status = 'closed' if changes.get('state') == 'closed' else 'updated'
+        action = 'close' if status == 'closed' else f"update ({', '.join(changes)})"
+        if self.dry_run:
+            self.log(f"[DRY RUN] Would {action} issue #{issue_number}: {title}")
+        else:
+            try:
+                self.backend.update_issue(issue_number, changes)
+                self.log(f"{status.capitalize()} issue #{issue_number}: {title}")
+                if rendered:
+                    self.journal_issue(key, issue_number, **rendered)
+            except GitHubError as e:
+                if e.status not in ISSUE_GONE_STATUSES:
+                    self.log(f"Error trying to {action} issue #{issue_number}: {e}")
+                    status = 'failed'
+                else:
+                    self.log(f"Warning: issue #{issue_number} no longer exists: {title}")
+                    self.forget_issue(issue_number, key)
+                    status = 'gone'
+                    if rendered:
+                        issue_number = self.create_issue({'title': title}, rendered['milestone'], key, rendered)
+                        status = None
+        return self.issue_result({'title': title}, sprint_name, issue_number, status, time.perf_counter() - start)
+    
+    def forget_issue(self, issue_number: str, key: Optional[str] = None) -> None:
+        """Drop an issue GitHub no longer has from the journal and the mirror"""
+        if self.journal is not None and key:
+            self.journal.forget(key, self.source or '')
+        if self.mirror is not None:
+            self.mirror.forget_issue(issue_number)
+    
+    def sync_task_file(self, task_file: str, create_milestones: bool = True) -> bool:
+        """Bring the repository's issues in line with a task file
+        
+        Existing issues are listed once and matched to tasks through the
+        journal. Tasks without an issue are created, issues whose rendered
+        title, body, labels or milestone changed are patched, and open issues
+        whose task or sprint is gone are closed. Only issues journaled from
+        the same source (PRD) are closed; other task files' issues are left
+        alone. Unchanged issues cost no calls beyond the listing.
+        """
+        if self.journal is None:
+            print("Error: sync matches tasks to issues through the journal; drop --no-journal")
+            return False
+        
+        data = self.load_task_data(task_file)
+        if data is None:
+            return False
+        self.use_source(data.get('source') or default_source(task_file))
+        sprints = self.resolve_sprints(data)
+        if not data.get('tasks'):
             print("No tasks found in file")
             return False
         
-        print(f"Processing {len(tasks)} tasks across {len(sprints)} sprints...")
+        if not self.prefetch():
+            return False
+        try:
+            # Closing and re-creating go by which issues still exist, which the mirror's
+            # incremental refresh cannot tell; unchanged listing pages cost a 304 each
+            listed = (self.mirror.reconcile_issues(self.backend) if self.mirror is not None and not self.dry_run
+                      else self.backend.list_issues())
+            issues = {str(issue['number']): issue for issue in listed}
+        except GitHubError as e:
+            print(f"Error listing issues: {e}")
+            return False
+        print(f"Syncing {len(data['tasks'])} tasks across {len(sprints)} sprints "
+              f"against {len(issues)} existing issues...")
         
-        # Create milestones for sprints
         if create_milestones:
-            for sprint_name in sprints.keys():
-                milestone_desc = f"Development sprint: {sprint_name}"
-                self.create_milestone(sprint_name, milestone_desc)
+            self.create_milestones(sprints)
+        self.ensure_labels(self.all_labels(sprints))
         
-        # Create epic issues for sprints
-        epic_issues = self.create_epic_issues(sprints)
+        def missing(key: str) -> bool:
+            # Journaled issues deleted on GitHub are created again
+            issue_number = self.journaled_number(key)
+            if issue_number and issue_number not in issues:
+                print(f"Warning: issue #{issue_number} from the journal no longer exists")
+                self.journal.forget(key, self.source)
+                return True
+            return issue_number is None
         
-        # Create individual task issues
-        created_issues = []
+        results: List[Optional[Dict[str, Any]]] = []
+        create_jobs, update_jobs = [], []
+        current_keys = set()
         for sprint_name, sprint_tasks in sprints.items():
-            print(f"\nCreating issues for {sprint_name}...")
-            
+            milestone = sprint_name if create_milestones else None
             for task in sprint_tasks:
-                issue_number = self.create_issue(task, sprint_name if create_milestones else None)
-                if issue_number:
-                    created_issues.append({
-                        'number': issue_number,
-                        'title': task['title'],
-                        'sprint': sprint_name
-                    })
+                key = self.journal_key(task)
+                current_keys.add(key)
+                results.append(None)
+                if missing(key):
+                    create_jobs.append((len(results) - 1, (task, sprint_name, milestone, key)))
+                    continue
+                issue_number = self.journaled_number(key)
+                rendered = self.render_issue(task, milestone)
+                changes = self.issue_changes(issues[issue_number], **rendered)
+                if changes:
+                    update_jobs.append((len(results) - 1, (issue_number, task['title'], sprint_name, changes,
+                                                           key, rendered)))
+                else:
+                    results[-1] = self.issue_result(task, sprint_name, issue_number, 'unchanged', 0)
+        
+        for (index, _), result in zip(create_jobs, self.create_keyed_issue_results(job for _, job in create_jobs)):
+            results[index] = result
+        for (index, _), result in zip(update_jobs, self.run_pool(self.update_issue_result,
+                                                                 [job for _, job in update_jobs])):
+            results[index] = result
+        
+        # Epics link the current issue numbers, so they are synced after the tasks
+        numbers = iter(result['number'] for result in results)
+        epic_jobs, epic_creates = [], []
+        for sprint_name, sprint_tasks in sprints.items():
+            key = f"epic:{sprint_name}"
+            current_keys.add(key)
+            issue_numbers = [next(numbers) for _ in sprint_tasks]
+            if missing(key):
+                epic_creates.append((sprint_name, sprint_tasks, issue_numbers))
+                continue
+            rendered = {'title': f"Epic: {sprint_name}", 'labels': EPIC_LABELS, 'milestone': None,
+                        'body': self.format_epic_body(sprint_name, sprint_tasks, issue_numbers)}
+            issue_number = self.journaled_number(key)
+            changes = self.issue_changes(issues[issue_number], **rendered)
+            if changes:
+                epic_jobs.append((issue_number, rendered['title'], sprint_name, changes, key, rendered))
+        epic_results = self.run_pool(self.update_issue_result, epic_jobs)
+        epic_results += self.run_pool(self.create_epic_issue, epic_creates)
+        
+        # Close open issues of this source whose task or sprint no longer exists
+        close_jobs = [
+            (issue_number, issues[issue_number]['title'], None, {'state': 'closed', 'state_reason': 'not_planned'},
+             key)
+            for key in self.journal.keys_from(self.source)
+            for issue_number in [self.journal.get(key, self.source)]
+            if key not in current_keys and issues.get(issue_number, {}).get('state') == 'open'
+        ]
+        closed = self.run_pool(self.update_issue_result, close_jobs)
+        
+        self.print_result_table(results + closed)
         
         # Summary
-        print(f"\n✅ Created {len(created_issues)} issues")
-        print(f"✅ Created {len(epic_issues)} epic issues")
-        if create_milestones:
-            print(f"✅ Created {len(sprints)} milestones")
+        counts = {}
+        for result in results + epic_results + closed:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        print(f"\n✅ Created {counts.get('created', 0)} issues")
+        print(f"✅ Updated {counts.get('updated', 0)} issues")
+        print(f"✅ Closed {counts.get('closed', 0)} issues")
+        print(f"✅ Left {counts.get('unchanged', 0)} issues unchanged")
+        if counts.get('failed'):
+            print(f"❌ {counts['failed']} calls failed")
         
         return True
+    
+    def process_task_file(self, task_file: str, create_milestones: bool = True) -> bool:
+        """Process generated tasks file and create GitHub issues
+        
+        Accepts a JSON task file or an NDJSON task stream; '-' reads stdin.
+        Either is decoded a task at a time, and issues are created while the
+        rest of the file is still being read. Each issue is created in its
+        sprint's milestone when the sprint is known before its task, as in
+        generate_tasks.py's output; tasks of --stream output and older
+        format 2 files are attached to their milestone afterwards.
+        """
+        try:
+            f = sys.stdin if task_file == '-' else open(task_file, 'r')
+        except FileNotFoundError:
+            print(f"Error: Task file '{task_file}' not found")
+            return False
+        
+        try:
+            with f:
+                first_line = f.readline()
+                first_record = self.parse_stream_header(first_line)
+                if first_record is not None:
+                    records = prepend(first_record, self.iter_task_stream(f))
+                else:
+                    records = self.iter_task_document(JsonStreamReader(f, first_line))
+                return self.process_task_stream(records, create_milestones, default_source(task_file))
+        except json.JSONDecodeError as e:
+            print(f"Error parsing task file: {e}")
+            return False
+
+def default_source(task_file: str) -> str:
+    """Source for a task file that names none: its file name, or '' for stdin"""
+    return '' if task_file == '-' else os.path.basename(task_file)
+
+def prepend(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+    yield first
+    yield from rest
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Lists of up to size consecutive items, read lazily"""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
 
 def main():
     parser = argparse.ArgumentParser(description='Create GitHub issues from generated tasks')
-    parser.add_argument('task_file', help='Path to generated tasks JSON file')
+    parser.add_argument('task_file', help='Path to generated tasks JSON or NDJSON file, or - for stdin')
     parser.add_argument('--dry-run', action='store_true', 
                        help='Show what would be created without actually creating')
     parser.add_argument('--no-milestones', action='store_true',
                        help='Skip milestone creation')
+    parser.add_argument('--concurrency', '-j', type=int, default=1,
+                       help='Number of GitHub requests to run in parallel (default: 1)')
+    parser.add_argument('--backend', choices=BACKENDS, default='gh',
+                       help="'gh' runs the GitHub CLI per call; 'rest' calls the API directly over pooled connections; "
+                            "'graphql' creates issues in batched GraphQL mutations")
+    parser.add_argument('--api-url', default=os.environ.get('GITHUB_API_URL', DEFAULT_API_URL),
+                       help='REST API base URL, e.g. a GitHub Enterprise or local stub server')
+    parser.add_argument('--repo', help='owner/name for the REST and GraphQL backends (default: the origin remote)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                       help='Issues per GraphQL request with --backend graphql (default: 50)')
+    parser.add_argument('--journal', default='.github-issues.db',
+                       help='SQLite journal of created issues; re-runs skip tasks it lists (default: .github-issues.db)')
+    parser.add_argument('--no-journal', action='store_true',
+                       help='Neither read nor write the journal')
+    parser.add_argument('--mirror', default='.github-issues.db',
+                       help='SQLite mirror of the repository, refreshed with conditional requests; '
+                            'REST and GraphQL backends only (default: .github-issues.db)')
+    parser.add_argument('--no-mirror', action='store_true',
+                       help='List issues, milestones and labels from the API every run')
+    parser.add_argument('--max-rate', type=float,
+                       help='Most API calls per second; by default calls are only slowed when GitHub reports '
+                            'the rate limit is nearly used up')
+    parser.add_argument('--source',
+                       help="Name of the PRD the tasks came from, journaled with each issue so --sync only closes "
+                            "this PRD's issues (default: the source the task file names, else its file name)")
+    parser.add_argument('--sync', action='store_true',
+                       help='Update journaled issues whose task changed and close those whose task is gone, '
+                            'instead of only creating new ones')
     
     args = parser.parse_args()
     
-    creator = GitHubIssueCreator(dry_run=args.dry_run)
+    # Paces every API call and retries rate-limited ones
+    scheduler = RequestScheduler(max_concurrency=args.concurrency, max_rate=args.max_rate)
+    backend = GhCliBackend(scheduler=scheduler)
+    mirror = None
+    repo = args.repo or detect_repo()
+    # A dry-run sync still reads the existing issues
+    if args.backend in ('rest', 'graphql') and (args.sync or not args.dry_run):
+        if not repo:
+            print("Error: could not determine the repository; pass --repo owner/name")
+            return 1
+        if not args.no_mirror:
+            mirror = IssueMirror(args.mirror, repo)
+        try:
+            if args.backend == 'graphql':
+                backend = GraphQLBackend(repo, base_url=args.api_url, batch_size=args.batch_size,
+                                         scheduler=scheduler, mirror=mirror)
+            else:
+                backend = RestBackend(repo, base_url=args.api_url, scheduler=scheduler, mirror=mirror)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    
+    # A dry run only reads an existing journal
+    journal = None
+    if not args.no_journal and not (args.dry_run and not os.path.exists(args.journal)):
+        journal = IssueJournal(args.journal, repo or '')
+        if len(journal):
+            print(f"Journal {args.journal} lists {len(journal)} issues already created")
+    
+    creator = GitHubIssueCreator(dry_run=args.dry_run, concurrency=args.concurrency, backend=backend,
+                                 journal=journal, mirror=mirror, source=args.source)
     
     # Check prerequisites
-    if not args.dry_run and not creator.check_gh_cli():
+    if not args.dry_run and not creator.check_backend():
         return 1
     
     # Process tasks and create issues
-    success = creator.process_task_file(
-        args.task_file, 
-        create_milestones=not args.no_milestones
-    )
+    process = creator.sync_task_file if args.sync else creator.process_task_file
+    try:
+        success = process(
+            args.task_file, 
+            create_milestones=not args.no_milestones
+        )
+    finally:
+        if journal is not None:
+            journal.close()
+        if mirror is not None:
+            mirror.close()
+    
+    if mirror is not None and mirror.requests:
+        print(f"Mirror: {mirror.not_modified} of {mirror.requests} listing pages unchanged (304)")
+    if scheduler.requests:
+        print(f"API: {scheduler.summary()}")
     
     return 0 if success else 1
 
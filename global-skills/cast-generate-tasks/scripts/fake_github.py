@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for the GitHub API, for exercising the issue creator offline
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+# Transient failures injected by error_rate, in rotation
+INJECTED_ERRORS = [(502, 'Server Error'), (503, 'Service Unavailable'), (500, 'Internal Server Error')]
+
+def timestamp() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+class FakeGitHub:
+    """Repository state shared by all request handler threads"""
+    def __init__(self, repo: str = 'octo/project', token: Optional[str] = None, latency: float = 0.0,
+                 graphql_max_mutations: int = 0, rate_limit: int = 0, rate_limit_window: float = 3600.0,
+                 throttle_every: int = 0, retry_after: float = 1.0, latency_jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        self.repo = repo
+        self.repository_id = 'R_1'
+        self.token = token
+        # Seconds added to every response, to stand in for network round-trips, plus an
+        # exponentially distributed extra with mean latency_jitter for a realistic tail
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # Share of requests answered with a 5xx instead of being handled
+        self.error_rate = error_rate
+        self.error_count = 0
+        self.random = random.Random(seed)
+        # GraphQL requests with more mutations than this time out like an oversized request
+        # on GitHub: the first graphql_max_mutations are applied, then the answer is a 502;
+        # 0 means no limit
+        self.graphql_max_mutations = graphql_max_mutations
+        # Primary rate limit: requests allowed per window, reported in X-RateLimit-* headers; 0 means none
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.window_start = time.time()
+        self.window_used = 0
+        # Every throttle_every-th request hits a secondary rate limit, alternately a 429
+        # with Retry-After and a 403 without one; 0 means never
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.throttled_count = 0
+        # Conditional GETs answered with 304; like GitHub, they do not count against the rate limit
+        self.not_modified_count = 0
+        self.lock = threading.Lock()
+        self.milestones: Dict[int, Dict[str, Any]] = {}
+        self.labels: Dict[str, Dict[str, Any]] = {}
+        self.issues: Dict[int, Dict[str, Any]] = {}
+        self.next_number = 1
+        self.request_count = 0
+    
+    def response_delay(self) -> float:
+        if not self.latency_jitter:
+            return self.latency
+        with self.lock:
+            return self.latency + self.random.expovariate(1 / self.latency_jitter)
+
+    def injected_error(self) -> Optional[Tuple[int, Any]]:
+        """A 5xx (status, body) to answer the current request with instead, or None"""
+        if not self.error_rate:
+            return None
+        with self.lock:
+            if self.random.random() >= self.error_rate:
+                return None
+            status, message = INJECTED_ERRORS[self.error_count % len(INJECTED_ERRORS)]
+            self.error_count += 1
+        return status, {'message': message}
+
+    def check_rate_limit(self) -> Tuple[Optional[Tuple[int, Any]], Dict[str, str]]:
+        """The refusal (status, body) for the request being counted, or None; and its rate limit headers"""
+        with self.lock:
+            headers = {}
+            if self.rate_limit:
+                now = time.time()
+                if now >= self.window_start + self.rate_limit_window:
+                    self.window_start, self.window_used = now, 0
+                exhausted = self.window_used >= self.rate_limit
+                if not exhausted:
+                    self.window_used += 1
+                headers = {
+                    'X-RateLimit-Limit': str(self.rate_limit),
+                    'X-RateLimit-Remaining': str(self.rate_limit - self.window_used),
+                    'X-RateLimit-Reset': str(math.ceil(self.window_start + self.rate_limit_window)),
+                    'X-RateLimit-Used': str(self.window_used)
+                }
+                if exhausted:
+                    self.throttled_count += 1
+                    return (403, {'message': 'API rate limit exceeded for user.'}), headers
+
+            if self.throttle_every and self.request_count % self.throttle_every == 0:
+                self.throttled_count += 1
+                if self.throttled_count % 2:
+                    headers['Retry-After'] = f'{self.retry_after:g}'
+                    return (429, {'message': 'Too Many Requests'}), headers
+                return (403, {'message': 'You have exceeded a secondary rate limit. '
+                                         'Please wait a few minutes before you try again.'}), headers
+            return None, headers
+
+    def refund_rate_limit(self) -> None:
+        with self.lock:
+            if self.rate_limit and self.window_used:
+                self.window_used -= 1
+            self.not_modified_count += 1
+
+    def _label(self, name: str) -> Dict[str, Any]:
+        # Caller holds the lock
+        if name not in self.labels:
+            self.labels[name] = {'name': name, 'color': 'ededed', 'node_id': f'LA_{len(self.labels) + 1}'}
+        return self.labels[name]
+
+    def create_label(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        name = payload.get('name')
+        if not name:
+            return 422, {'message': 'Validation Failed', 'errors': [{'field': 'name', 'code': 'missing_field'}]}
+        with self.lock:
+            if name in self.labels:
+                return 422, {'message': 'Validation Failed',
+                             'errors': [{'resource': 'Label', 'field': 'name', 'code': 'already_exists'}]}
+            label = self._label(name)
+            label['color'] = payload.get('color', label['color'])
+        return 201, label
+
+    def create_milestone(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        title = payload.get('title')
+        if not title:
+            return 422, {'message': 'Validation Failed', 'errors': [{'field': 'title', 'code': 'missing_field'}]}
+        with self.lock:
+            if any(milestone['title'] == title for milestone in self.milestones.values()):
+                return 422, {'message': 'Validation Failed',
+                             'errors': [{'resource': 'Milestone', 'field': 'title', 'code': 'already_exists'}]}
+            number = len(self.milestones) + 1
+            milestone = {'number': number, 'node_id': f'MI_{number}', 'title': title,
+                         'description': payload.get('description', ''), 'state': 'open',
+                         'due_on': payload.get('due_on')}
+            self.milestones[number] = milestone
+        return 201, milestone
+
+    def create_issue(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        if not payload.get('title'):
+            return 422, {'message': 'Validation Failed', 'errors': [{'field': 'title', 'code': 'missing_field'}]}
+        milestone = payload.get('milestone')
+        with self.lock:
+            if milestone is not None and milestone not in self.milestones:
+                return 422, {'message': 'Validation Failed', 'errors': [{'field': 'milestone', 'code': 'invalid'}]}
+            number = self.next_number
+            self.next_number += 1
+            issue = {
+                'number': number,
+                'title': payload['title'],
+                'body': payload.get('body', ''),
+                # REST creates labels that do not exist yet
+                'labels': [self._label(label) for label in payload.get('labels', [])],
+                'milestone': self.milestones[milestone] if milestone is not None else None,
+                'state': 'open',
+                'html_url': f"https://github.com/{self.repo}/issues/{number}",
+                'created_at': timestamp(),
+                'updated_at': timestamp()
+            }
+            self.issues[number] = issue
+        return 201, issue
+
+    def update_issue(self, number: int, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        with self.lock:
+            issue = self.issues.get(number)
+            if issue is None:
+                return 404, {'message': 'Not Found'}
+            if 'milestone' in payload:
+                milestone = payload['milestone']
+                if milestone is not None and milestone not in self.milestones:
+                    return 422, {'message': 'Validation Failed', 'errors': [{'field': 'milestone', 'code': 'invalid'}]}
+                issue['milestone'] = self.milestones[milestone] if milestone is not None else None
+            for field in ('title', 'body', 'state'):
+                if field in payload:
+                    issue[field] = payload[field]
+            if 'labels' in payload:
+                issue['labels'] = [self._label(label) for label in payload['labels']]
+            issue['updated_at'] = timestamp()
+        return 200, issue
+
+    def graphql(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        """Run the aliased createIssue mutations the GraphQL backend sends"""
+        query = payload.get('query', '')
+        variables = payload.get('variables') or {}
+        mutations = re.findall(r'(\w+): createIssue\(input: \$(\w+)\)', query)
+        if not mutations:
+            return 200, {'data': None, 'errors': [{'message': 'Unsupported query'}]}
+        timed_out = bool(self.graphql_max_mutations) and len(mutations) > self.graphql_max_mutations
+        if timed_out:
+            mutations = mutations[:self.graphql_max_mutations]
+
+        data: Dict[str, Any] = {}
+        errors = []
+        for alias, variable in mutations:
+            issue_input = variables.get(variable) or {}
+            error = None
+            with self.lock:
+                label_names = {label['node_id']: name for name, label in self.labels.items()}
+                milestone_numbers = {m['node_id']: number for number, m in self.milestones.items()}
+            if issue_input.get('repositoryId') != self.repository_id:
+                error = f"Could not resolve to a node with the global id of '{issue_input.get('repositoryId')}'"
+            elif any(label_id not in label_names for label_id in issue_input.get('labelIds', [])):
+                error = "Could not resolve to a Label node"
+            elif issue_input.get('milestoneId') and issue_input['milestoneId'] not in milestone_numbers:
+                error = "Could not resolve to a Milestone node"
+            else:
+                status, issue = self.create_issue({
+                    'title': issue_input.get('title'),
+                    'body': issue_input.get('body', ''),
+                    'labels': [label_names[label_id] for label_id in issue_input.get('labelIds', [])],
+                    'milestone': milestone_numbers.get(issue_input.get('milestoneId'))
+                })
+                if status >= 400:
+                    error = issue['message']
+            if error:
+                data[alias] = None
+                errors.append({'path': [alias], 'type': 'NOT_FOUND', 'message': error})
+            else:
+                data[alias] = {'issue': {'number': issue['number']}}
+
+        if timed_out:
+            return 502, {'message': 'Server Error'}
+        response = {'data': data}
+        if errors:
+            response['errors'] = errors
+        return 200, response
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    @property
+    def github(self) -> FakeGitHub:
+        return self.server.github
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        if self.command == 'GET' and status == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers = {**(headers or {}), 'ETag': etag}
+            if self.headers.get('If-None-Match') == etag:
+                self.github.refund_rate_limit()
+                status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in {**self.rate_headers, **(headers or {})}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def handle_request(self, method: str) -> None:
+        github = self.github
+        with github.lock:
+            github.request_count += 1
+        delay = github.response_delay()
+        if delay:
+            time.sleep(delay)
+
+        payload = self.read_json() if method in ('POST', 'PATCH') else None
+        self.rate_headers: Dict[str, str] = {}
+        if github.token and self.headers.get('Authorization') != f'Bearer {github.token}':
+            self.send_json(401, {'message': 'Bad credentials'})
+            return
+
+        error = github.injected_error()
+        if error:
+            self.send_json(*error)
+            return
+
+        refusal, self.rate_headers = github.check_rate_limit()
+        if refusal:
+            self.send_json(*refusal)
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        prefix = f'/repos/{github.repo}'
+        path = url.path
+
+        if method == 'GET' and path == prefix:
+            self.send_json(200, {'full_name': github.repo, 'node_id': github.repository_id,
+                                 'permissions': {'push': True}})
+        elif path == '/graphql' and method == 'POST':
+            self.send_json(*github.graphql(payload))
+        elif path == f'{prefix}/labels' and method == 'POST':
+            self.send_json(*github.create_label(payload))
+        elif path == f'{prefix}/labels' and method == 'GET':
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            with github.lock:
+                labels = list(github.labels.values())
+            self.send_json(200, labels[(page - 1) * per_page:page * per_page])
+        elif path.startswith(f'{prefix}/labels/') and method == 'GET':
+            name = urllib.parse.unquote(path[len(f'{prefix}/labels/'):])
+            if name in github.labels:
+                self.send_json(200, github.labels[name])
+            else:
+                self.send_json(404, {'message': 'Not Found'})
+        elif path == f'{prefix}/milestones' and method == 'POST':
+            self.send_json(*github.create_milestone(payload))
+        elif path == f'{prefix}/milestones' and method == 'GET':
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            with github.lock:
+                milestones = list(github.milestones.values())
+            self.send_json(200, milestones[(page - 1) * per_page:page * per_page])
+        elif path == f'{prefix}/issues' and method == 'POST':
+            self.send_json(*github.create_issue(payload))
+        elif path == f'{prefix}/issues' and method == 'GET':
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            state = query.get('state', ['open'])[0]
+            since = query.get('since', [''])[0]
+            with github.lock:
+                issues = [issue for issue in github.issues.values()
+                          if (state == 'all' or issue['state'] == state) and issue['updated_at'] >= since]
+            # Newest first by default, like GitHub
+            sort_key = 'updated_at' if query.get('sort', ['created'])[0] == 'updated' else 'number'
+            issues.sort(key=lambda issue: (issue[sort_key], issue['number']),
+                        reverse=query.get('direction', ['desc'])[0] == 'desc')
+            self.send_json(200, issues[(page - 1) * per_page:page * per_page])
+        elif re.fullmatch(f'{re.escape(prefix)}/issues/\\d+', path):
+            number = int(path.rsplit('/', 1)[1])
+            if method == 'PATCH':
+                self.send_json(*github.update_issue(number, payload))
+            elif number in github.issues:
+                self.send_json(200, github.issues[number])
+            else:
+                self.send_json(404, {'message': 'Not Found'})
+        else:
+            self.send_json(404, {'message': 'Not Found'})
+
+    def do_GET(self) -> None:
+        self.handle_request('GET')
+
+    def do_POST(self) -> None:
+        self.handle_request('POST')
+
+    def do_PATCH(self) -> None:
+        self.handle_request('PATCH')
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, github: FakeGitHub, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), FakeGitHubHandler)
+        self.github = github
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_server(github: Optional[FakeGitHub] = None, host: str = '127.0.0.1', port: int = 0) -> FakeGitHubServer:
+    """Serve a FakeGitHub on a background thread; call shutdown() when done"""
+    server = FakeGitHubServer(github or FakeGitHub(), host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def gh_shim(api_url: str, repo: str, args: list) -> int:
+    """Answer the gh commands the issue creator runs, one HTTP call per process like gh itself"""
+    def call(method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(f"{api_url}/repos/{repo}{path}", data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            body = json.loads(e.read() or b'{}')
+            if e.code == 429 or (e.code == 403 and 'rate limit' in body.get('message', '')):
+                # gh gives up on the whole command when any of its calls is rate limited
+                print(f"gh: {body['message']} (HTTP {e.code})", file=sys.stderr)
+                raise SystemExit(1)
+            return e.code, body
+
+    def option(name: str) -> Optional[str]:
+        return args[args.index(name) + 1] if name in args else None
+
+    if args[:2] == ['auth', 'status']:
+        status, _ = call('GET', '')
+    elif args[:1] == ['api'] and args[1].endswith('/milestones'):
+        fields = dict(args[i + 1].split('=', 1) for i, arg in enumerate(args) if arg == '--field')
+        status, body = call('POST', '/milestones', fields)
+    elif args[:1] == ['api'] and '/milestones?' in args[1]:
+        # Stands in for --paginate --jq '.[] | ...': one JSON object per line
+        status, body = call('GET', f"/milestones?{args[1].split('?', 1)[1]}&per_page=100")
+        if status < 400:
+            for milestone in body:
+                print(json.dumps({'number': milestone['number'], 'title': milestone['title']}))
+    elif args[:2] == ['label', 'list']:
+        status, body = call('GET', '/labels?per_page=100')
+        if status < 400:
+            print(json.dumps([{'name': label['name']} for label in body]))
+    elif args[:2] == ['label', 'create']:
+        status, body = call('POST', '/labels', {'name': args[2], 'color': option('--color') or 'ededed'})
+        if status == 422:
+            print(f"label with name \"{args[2]}\" already exists; use `--force` to update its color and description",
+                  file=sys.stderr)
+            return 1
+    elif args[:1] == ['api'] and re.search(r'/issues/\d+$', args[1]) and option('--input') == '-':
+        status, body = call(option('--method') or 'GET', f"/issues/{args[1].rsplit('/', 1)[1]}",
+                            json.load(sys.stdin))
+    elif args[:2] == ['issue', 'list']:
+        issues = []
+        page = 1
+        while True:
+            status, body = call('GET', f'/issues?state=all&per_page=100&page={page}')
+            if status >= 400:
+                break
+            issues.extend(body)
+            if len(body) < 100:
+                break
+            page += 1
+        if status < 400:
+            # gh's --json shape: upper-case states, only the requested fields
+            fields = (option('--json') or 'number').split(',')
+            print(json.dumps([{field: issue['state'].upper() if field == 'state' else issue.get(field)
+                               for field in fields} for issue in issues]))
+    elif args[:2] == ['issue', 'create']:
+        milestone = option('--milestone')
+        payload = {'title': option('--title'), 'body': option('--body') or '',
+                   'labels': [label for label in (option('--label') or '').split(',') if label]}
+        if payload['labels']:
+            # gh looks labels up and refuses ones the repository lacks
+            _, labels = call('GET', '/labels?per_page=100')
+            missing = set(payload['labels']) - {label['name'] for label in labels}
+            if missing:
+                print(f"could not add label: '{sorted(missing)[0]}' not found", file=sys.stderr)
+                return 1
+        if milestone:
+            _, milestones = call('GET', '/milestones?state=all&per_page=100')
+            numbers = {m['title']: m['number'] for m in milestones}
+            if milestone not in numbers:
+                print(f"could not add to milestone '{milestone}': not found", file=sys.stderr)
+                return 1
+            payload['milestone'] = numbers[milestone]
+        status, body = call('POST', '/issues', payload)
+        if status < 400:
+            print(body['html_url'])
+    elif args[:2] == ['issue', 'edit']:
+        _, milestones = call('GET', '/milestones?state=all&per_page=100')
+        numbers = {m['title']: m['number'] for m in milestones}
+        status, body = call('PATCH', f'/issues/{args[2]}', {'milestone': numbers.get(option('--milestone'))})
+    else:
+        print(f"unsupported gh command: {' '.join(args)}", file=sys.stderr)
+        return 1
+
+    if status >= 400:
+        message = body.get('message', '') if isinstance(body, dict) else ''
+        print(f"{json.dumps(body)}\ngh: {message} (HTTP {status})", file=sys.stderr)
+        return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Run an in-memory fake GitHub API')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Serve the fake REST API')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--repo', default='octo/project', help='owner/name of the fake repository')
+    serve_parser.add_argument('--token', help='Require this bearer token')
+    serve_parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every response')
+    serve_parser.add_argument('--latency-jitter-ms', type=float, default=0.0,
+                              help='Mean of an exponentially distributed extra delay per response')
+    serve_parser.add_argument('--error-rate', type=float, default=0.0,
+                              help='Share of requests answered with a 502/503/500 (0 to 1)')
+    serve_parser.add_argument('--seed', type=int, help='Seed for the jitter and error injection')
+    serve_parser.add_argument('--graphql-max-mutations', type=int, default=0,
+                              help='Time out GraphQL requests with more mutations than this after applying that many, '
+                                   'answering 502 (0: no limit)')
+    serve_parser.add_argument('--rate-limit', type=int, default=0,
+                              help='Requests allowed per rate limit window, refused with 403 beyond it (0: no limit)')
+    serve_parser.add_argument('--rate-limit-window', type=float, default=3600.0,
+                              help='Seconds until the rate limit resets (default: 3600)')
+    serve_parser.add_argument('--throttle-every', type=int, default=0,
+                              help='Refuse every Nth request with a secondary rate limit 429/403 (0: never)')
+    serve_parser.add_argument('--retry-after', type=float, default=1.0,
+                              help='Retry-After seconds sent with injected 429 responses')
+
+    gh_parser = subparsers.add_parser('gh', help='Stand in for the gh CLI against a fake server')
+    gh_parser.add_argument('--api-url', required=True)
+    gh_parser.add_argument('--repo', default='octo/project')
+    gh_parser.add_argument('gh_args', nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+
+    if args.command == 'gh':
+        return gh_shim(args.api_url.rstrip('/'), args.repo, args.gh_args)
+
+    github = FakeGitHub(args.repo, args.token, args.latency_ms / 1000, args.graphql_max_mutations,
+                        args.rate_limit, args.rate_limit_window, args.throttle_every, args.retry_after,
+                        args.latency_jitter_ms / 1000, args.error_rate, args.seed)
+    server = FakeGitHubServer(github, args.host, args.port)
+    print(f"Fake GitHub API for {args.repo} at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -2,13 +2,538 @@
 """
 Generate development tasks from PRD content
 """
+import gc
+import glob
+import hashlib
 import json
+import os
 import re
+import sys
 import argparse
-from typing import List, Dict, Any
+import functools
+import tempfile
+import textwrap
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set, TextIO, Tuple
 
-class TaskGenerator:
+from plan_sprints import (STRATEGIES as PACKING_STRATEGIES, DependencyPlanner, SprintPacker, format_sweep_table,
+                          name_sprints, parse_capacity_range, sprint_references, sweep_capacities)
+from story_dedup import StoryDeduplicator
+
+class PRDParser:
+    """Line-oriented PRD parser that extracts everything in a single pass.
+
+    Feed lines (without trailing newlines) one at a time; each line is
+    inspected a constant number of times, so cost is linear in document
+    size. A story that is interrupted by a blank line or heading before
+    its "So that" clause is dropped locally instead of being matched
+    against text further down the document.
+
+    parse() gives the same result for a whole document already in memory,
+    using regular expressions that follow the same rules.
+    """
+    STORY_START = 'As a '
+    STORY_WANT = 'I want '
+    STORY_VALUE = 'So that '
+    CRITERIA_START = 'Acceptance Criteria:'
+    CRITERIA_MARK = '✅ '
+    TECH_START = 'Technical Requirements'
+
+    # No story part runs past a blank line or heading, and persona and want
+    # stop at a line that starts another story, so a failed match costs one
+    # paragraph rather than the rest of the document
+    STORY_PATTERN = re.compile(
+        r'As a ([^\n]*(?:\n(?!I want |#|\n|[^\n]*As a )[^\n]*)*)'
+        r'\nI want ([^\n]*(?:\n(?!So that |#|\n|[^\n]*As a )[^\n]*)*)'
+        r'\nSo that ([^\n]*(?:\n(?!Acceptance|\n)[^\n]*)*)'
+        r'(?=\n\n|\nAcceptance)')
+    CRITERIA_PATTERN = re.compile(r'Acceptance Criteria:([^\n]*(?:\n(?!#|\n)[^\n]*)*)')
+    CRITERION_PATTERN = re.compile(r'✅ (.+)')
+    TECH_PATTERN = re.compile(r'Technical Requirements(.*?)(?=\n## |\Z)', re.DOTALL)
+
+    def __init__(self, collect: bool = True):
+        # With collect=False completed stories are only returned from feed(),
+        # so memory stays bounded when streaming large documents
+        self.collect = collect
+        self.user_stories: List[Dict[str, str]] = []
+        self.acceptance_criteria: List[str] = []
+        self.technical_requirements: Optional[str] = None
+        # Story state: None, 'persona', 'want' or 'value'
+        self._story_state = None
+        self._story_parts: Dict[str, List[str]] = {}
+        self._in_criteria = False
+        # Technical requirements state: None, 'open' or 'done'
+        self._tech_state = None
+        self._tech_lines: List[str] = []
+
+    @classmethod
+    def parse(cls, text: str) -> Dict[str, Any]:
+        """Parse a whole document; the result equals feeding it line by line and calling close()"""
+        sections = {
+            'user_stories': [
+                {'persona': persona.strip(), 'want': want.strip(), 'value': value.strip()}
+                for persona, want, value in cls.STORY_PATTERN.findall(text)
+            ],
+            'acceptance_criteria': [
+                criterion
+                for block in cls.CRITERIA_PATTERN.findall(text)
+                for criterion in cls.CRITERION_PATTERN.findall(block)
+            ]
+        }
+        tech_section = cls.TECH_PATTERN.search(text)
+        if tech_section:
+            sections['technical_requirements'] = tech_section.group(1).strip()
+        return sections
+
+    def feed(self, line: str) -> Optional[Dict[str, str]]:
+        """Consume one line; return a user story if this line completed one"""
+        # Cheap substring checks keep the common "nothing to do" line fast
+        if self.collect and (self._in_criteria or self.CRITERIA_START in line):
+            self._feed_criteria(line)
+        if self._tech_state == 'open' or (self._tech_state is None and self.collect and self.TECH_START in line):
+            self._feed_technical(line)
+        if self._story_state is None and self.STORY_START not in line:
+            return None
+        return self._feed_story(line)
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the sections dict"""
+        # A story still collecting its value at end of input has no terminator
+        self._story_state = None
+        self._story_parts = {}
+        self._in_criteria = False
+        if self._tech_state == 'open':
+            self._finish_technical()
+
+        sections = {
+            'user_stories': self.user_stories,
+            'acceptance_criteria': self.acceptance_criteria
+        }
+        if self.technical_requirements is not None:
+            sections['technical_requirements'] = self.technical_requirements
+        return sections
+
+    def _feed_story(self, line: str) -> Optional[Dict[str, str]]:
+        state = self._story_state
+        completed = None
+
+        if state == 'value':
+            if line == '' or line.startswith('Acceptance'):
+                completed = self._finish_story()
+                if line == '':
+                    return completed
+            else:
+                self._story_parts['value'].append(line)
+                return None
+        elif state == 'persona' and line.startswith(self.STORY_WANT):
+            self._story_parts['want'] = [line[len(self.STORY_WANT):]]
+            self._story_state = 'want'
+            return None
+        elif state == 'want' and line.startswith(self.STORY_VALUE):
+            self._story_parts['value'] = [line[len(self.STORY_VALUE):]]
+            self._story_state = 'value'
+            return None
+        elif state is not None:
+            if line == '' or line.startswith('#'):
+                # Malformed story: abandon it rather than scan ahead
+                self._story_state = None
+                self._story_parts = {}
+            elif self.STORY_START not in line:
+                self._story_parts[state].append(line)
+                return None
+
+        index = line.find(self.STORY_START)
+        if index != -1:
+            self._story_parts = {'persona': [line[index + len(self.STORY_START):]]}
+            self._story_state = 'persona'
+
+        return completed
+
+    def _finish_story(self) -> Dict[str, str]:
+        parts = self._story_parts
+        story = {
+            'persona': '\n'.join(parts['persona']).strip(),
+            'want': '\n'.join(parts['want']).strip(),
+            'value': '\n'.join(parts['value']).strip()
+        }
+        if self.collect:
+            self.user_stories.append(story)
+        self._story_state = None
+        self._story_parts = {}
+        return story
+
+    def _feed_criteria(self, line: str) -> None:
+        if self._in_criteria:
+            if line == '' or line.startswith('#'):
+                self._in_criteria = False
+            else:
+                self._collect_criterion(line)
+                return
+
+        index = line.find(self.CRITERIA_START)
+        if index != -1:
+            self._in_criteria = True
+            self._collect_criterion(line[index + len(self.CRITERIA_START):])
+
+    def _collect_criterion(self, text: str) -> None:
+        index = text.find(self.CRITERIA_MARK)
+        if index != -1:
+            criterion = text[index + len(self.CRITERIA_MARK):]
+            if criterion:
+                self.acceptance_criteria.append(criterion)
+
+    def _feed_technical(self, line: str) -> None:
+        if self._tech_state == 'done':
+            return
+        if self._tech_state == 'open':
+            if line.startswith('## '):
+                self._finish_technical()
+            else:
+                self._tech_lines.append(line)
+            return
+
+        index = line.find(self.TECH_START)
+        if index != -1:
+            self._tech_state = 'open'
+            self._tech_lines = [line[index + len(self.TECH_START):]]
+
+    def _finish_technical(self) -> None:
+        self.technical_requirements = '\n'.join(self._tech_lines).strip()
+        self._tech_lines = []
+        self._tech_state = 'done'
+
+def iter_lines(text: str):
+    """Yield lines of text without newlines, without materializing a list"""
+    start = 0
+    find = text.find
+    while True:
+        end = find('\n', start)
+        if end == -1:
+            if start < len(text):
+                yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+# Boilerplate shared by every generated task of a type. Tasks reference
+# these tuples instead of carrying their own copies.
+TASK_LABELS = {
+    'frontend': ('frontend', 'feature'),
+    'backend': ('backend', 'api'),
+    'database': ('database', 'schema'),
+    'testing': ('testing', 'quality')
+}
+
+TASK_CRITERIA = {
+    # The frontend list also starts with a story-specific criterion
+    'frontend': (
+        "UI is responsive and accessible",
+        "Error states are handled gracefully"
+    ),
+    'backend': (
+        "API endpoints are created and documented",
+        "Business logic is implemented correctly",
+        "Input validation is in place",
+        "Error responses are standardized"
+    ),
+    'database': (
+        "Database schema supports required data",
+        "Proper indexes are created",
+        "Migration script is provided"
+    ),
+    'testing': (
+        "Unit tests cover business logic",
+        "Integration tests verify API endpoints",
+        "E2E tests cover user workflows"
+    )
+}
+
+SUPPORTING_TASKS = [
+    # DevOps tasks
+    {
+        'title': 'Setup CI/CD pipeline',
+        'description': 'Configure automated testing and deployment pipeline',
+        'type': 'devops',
+        'story_points': 5,
+        'labels': ('devops', 'infrastructure'),
+        'acceptance_criteria': (
+            'Automated tests run on every PR',
+            'Automated deployment to staging',
+            'Production deployment workflow defined'
+        )
+    },
+    {
+        'title': 'Configure monitoring and alerts',
+        'description': 'Setup application monitoring, logging, and alerting',
+        'type': 'devops',
+        'story_points': 3,
+        'labels': ('devops', 'monitoring'),
+        'acceptance_criteria': (
+            'Application metrics are collected',
+            'Error tracking is configured',
+            'Performance monitoring is active'
+        )
+    },
+    # Documentation tasks
+    {
+        'title': 'API documentation',
+        'description': 'Create comprehensive API documentation',
+        'type': 'documentation',
+        'story_points': 2,
+        'labels': ('documentation', 'api'),
+        'acceptance_criteria': (
+            'All endpoints are documented',
+            'Request/response examples provided',
+            'Authentication requirements specified'
+        )
+    },
+    {
+        'title': 'User guide documentation',
+        'description': 'Create user-facing documentation and guides',
+        'type': 'documentation',
+        'story_points': 3,
+        'labels': ('documentation', 'user-guide'),
+        'acceptance_criteria': (
+            'User workflows are documented',
+            'Screenshots and examples included',
+            'Troubleshooting guide provided'
+        )
+    }
+]
+
+class Task:
+    """Compact task record that behaves like the task dicts it replaces.
+
+    Fields live in __slots__ rather than a per-task dict, labels and
+    acceptance criteria are shared tuples, and the type string is
+    interned. Optional fields set to None are treated as absent, and
+    to_dict() rebuilds the original JSON shape and key order.
+    """
+    __slots__ = ('id', 'title', 'description', 'type', 'story_points', 'labels', 'story_id',
+                 'dependencies', 'acceptance_criteria', 'priority')
+    OPTIONAL = frozenset(('id', 'story_id', 'dependencies', 'priority'))
+    
+    def __init__(self, title: str, description: str, type: str, story_points: int,
+                 labels: Tuple[str, ...], acceptance_criteria: Tuple[str, ...],
+                 story_id: Optional[str] = None, dependencies: Optional[Tuple[str, ...]] = None,
+                 priority: Optional[str] = None, id: Optional[str] = None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.type = sys.intern(type)
+        self.story_points = story_points
+        self.labels = labels
+        self.story_id = story_id
+        self.dependencies = dependencies
+        self.acceptance_criteria = acceptance_criteria
+        self.priority = priority
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Task':
+        return cls(**{
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in data.items()
+        })
+    
+    def keys(self) -> List[str]:
+        return [field for field in self.__slots__ if getattr(self, field) is not None]
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(field, getattr(self, field)) for field in self.keys()]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(f"Task has no field '{key}'")
+        setattr(self, key, value)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Task, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Task) else other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"Task({self.title!r}, type={self.type!r}, story_points={self.story_points!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The plain-dict form, with lists in place of shared tuples"""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.items()}
+
+# Hex digits of the type-and-title hash kept in a task ID (IDs used to keep 10)
+ID_DIGEST_LENGTH = 16
+
+class TaskIdAssigner:
+    """Give tasks stable IDs derived from their type and title.
+
+    The same PRD always yields the same IDs, independent of story order.
+    Tasks that would collide (duplicate stories) get a numeric suffix in
+    generation order. Every title of a story's tasks embeds the story's
+    want, so repeats are tracked per story as one 64-bit key rather than
+    per task; that set is the only state that grows with the backlog.
+    IDs keep ID_DIGEST_LENGTH hex digits of the hash, so two different
+    tasks of one type get the same ID with odds of about 3e-8 even in a
+    backlog of a million tasks.
+    """
     def __init__(self):
+        self._seen: Set[int] = set()
+        self._repeats: Dict[int, int] = {}
+    
+    def assign_story(self, want: str, tasks: List[Task]) -> None:
+        """Give IDs to the tasks generated from the story with this want"""
+        key = int.from_bytes(hashlib.blake2b(want.encode('utf-8'), digest_size=8).digest(), 'big')
+        if key in self._seen:
+            count = self._repeats[key] = self._repeats.get(key, 1) + 1
+        else:
+            self._seen.add(key)
+            count = 1
+        for task in tasks:
+            self.assign(task, count)
+    
+    @staticmethod
+    def assign(task: Task, occurrence: int = 1) -> str:
+        """Give task its ID; occurrence counts earlier tasks with the same type and title"""
+        digest = hashlib.sha1(f"{task.type}\0{task.title}".encode('utf-8')).hexdigest()[:ID_DIGEST_LENGTH]
+        task_id = f"{task.type}-{digest}"
+        if occurrence > 1:
+            task_id = f"{task_id}-{occurrence}"
+        task.id = task_id
+        return task_id
+
+def task_json_default(obj: Any) -> Any:
+    """json.dump default hook that serializes Task records"""
+    if isinstance(obj, Task):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class KeywordMatcher:
+    """Single-scan matcher that scores complexity and database keywords together.
+
+    All keywords are compiled into one regex shaped like a trie of the
+    keyword table, wrapped in a lookahead so overlapping keywords are all
+    found. Each position costs at most the depth of the trie, so growing
+    the tables to hundreds of terms does not make a scan linearly slower.
+    At a given position the longest keyword wins, so each keyword's score
+    is pre-merged with the scores of keywords that are prefixes of it.
+    """
+    def __init__(self, complexity_keywords: Dict[str, int], database_keywords: List[str],
+                 cache_size: int = 4096):
+        trie: Dict[str, Any] = {}
+        for keyword in list(complexity_keywords) + list(database_keywords):
+            node = trie
+            for char in keyword.lower():
+                node = node.setdefault(char, {})
+            node[''] = True
+        
+        database = {keyword.lower() for keyword in database_keywords}
+        points = {}
+        for keyword, value in complexity_keywords.items():
+            keyword = keyword.lower()
+            points[keyword] = max(points.get(keyword, 0), value)
+        
+        # Score for "the longest keyword found at a position is K"
+        self._scores: Dict[str, Tuple[int, bool]] = {}
+        for keyword in set(points) | database:
+            prefixes = [keyword[:i] for i in range(1, len(keyword) + 1)]
+            self._scores[keyword] = (
+                max((points.get(prefix, 0) for prefix in prefixes), default=0),
+                any(prefix in database for prefix in prefixes)
+            )
+        
+        self._pattern = re.compile(f"(?=({self._trie_pattern(trie)}))") if trie else None
+        self.match = functools.lru_cache(maxsize=cache_size)(self._scan)
+    
+    @classmethod
+    def _trie_pattern(cls, node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + cls._trie_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if '' in node:
+            # A keyword ends here; greedily try to extend to a longer one
+            pattern = f"(?:{pattern})?"
+        return pattern
+    
+    def _scan(self, text: str) -> Tuple[int, bool]:
+        """Return (highest keyword points, whether a database keyword appears)"""
+        best_points = 0
+        needs_database = False
+        if self._pattern is None:
+            return best_points, needs_database
+        
+        scores = self._scores
+        for found in self._pattern.finditer(text.lower()):
+            points, database = scores[found.group(1)]
+            if points > best_points:
+                best_points = points
+            needs_database = needs_database or database
+        
+        return best_points, needs_database
+
+OUTPUT_FORMAT_VERSION = 2
+
+DEDUP_MODES = (None, 'flag', 'merge')
+DUPLICATE_LABEL = 'possible-duplicate'
+
+class TaskGenerator:
+    COMPLEXITY_KEYWORDS = {
+        'simple': 1,
+        'basic': 1,
+        'create': 2,
+        'implement': 3,
+        'complex': 5,
+        'integration': 5,
+        'authentication': 5,
+        'real-time': 8,
+        'optimization': 8,
+        'migration': 8
+    }
+    
+    # Keywords in a story that call for a database task
+    DATABASE_KEYWORDS = ['save', 'store', 'create', 'update', 'delete']
+    
+    def __init__(self, complexity_keywords: Optional[Dict[str, int]] = None,
+                 database_keywords: Optional[List[str]] = None,
+                 packing_strategy: str = 'next-fit',
+                 output_format: int = OUTPUT_FORMAT_VERSION,
+                 analytics: bool = False,
+                 dedup: Optional[str] = None,
+                 dedup_threshold: float = 0.8):
+        if packing_strategy not in PACKING_STRATEGIES:
+            raise ValueError(f"Unknown packing strategy '{packing_strategy}'")
+        if output_format not in (1, 2):
+            raise ValueError(f"Unknown output format version {output_format}")
+        self.packing_strategy = packing_strategy
+        # 1: sprints embed full task copies; 2: tasks carry IDs and sprints list IDs
+        self.output_format = output_format
+        self.analytics = analytics
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode '{dedup}'")
+        # 'flag' labels tasks of near-duplicate stories, 'merge' drops those stories
+        self.dedup = dedup
+        self.dedup_threshold = dedup_threshold
+        self.deduplicator: Optional[StoryDeduplicator] = None
+        self.complexity_keywords = dict(complexity_keywords or self.COMPLEXITY_KEYWORDS)
+        self.database_keywords = list(database_keywords or self.DATABASE_KEYWORDS)
+        self.keyword_matcher = KeywordMatcher(self.complexity_keywords, self.database_keywords)
         self.task_templates = {
             'feature': {
                 'frontend': 1.5,  # Multiplier for frontend tasks
@@ -19,52 +544,54 @@ class TaskGenerator:
             }
         }
         
+    def estimator_config(self) -> Dict[str, Any]:
+        """Everything that influences generated tasks besides the story itself"""
+        return {
+            'task_templates': self.task_templates,
+            'complexity_keywords': self.complexity_keywords,
+            'database_keywords': sorted(self.database_keywords)
+        }
+    
+    def iter_stories(self, fileobj: TextIO) -> Iterator[Dict[str, str]]:
+        """Yield user stories from a PRD file as soon as each one is parsed"""
+        parser = PRDParser(collect=False)
+        for line in fileobj:
+            if line.endswith('\n'):
+                line = line[:-1]
+            story = parser.feed(line)
+            if story is not None:
+                yield story
+    
+    def dedup_stories(self, stories: Iterable[Dict[str, str]]) -> Iterator[Tuple[Dict[str, str], bool]]:
+        """Yield (story, is_duplicate) pairs, dropping duplicates in merge mode"""
+        self.deduplicator = StoryDeduplicator(self.dedup_threshold) if self.dedup else None
+        for story in stories:
+            duplicate = self.deduplicator is not None and self.deduplicator.add(story) is not None
+            if duplicate and self.dedup == 'merge':
+                continue
+            yield story, duplicate
+    
+    def flag_duplicate(self, tasks: List[Task]) -> List[Task]:
+        for task in tasks:
+            task.labels = task.labels + (DUPLICATE_LABEL,)
+        return tasks
+    
     def parse_prd_content(self, prd_text: str) -> Dict[str, Any]:
         """Extract structured data from PRD text"""
-        sections = {}
-        
-        # Extract user stories
-        user_stories = re.findall(r'As a (.+?)\nI want (.+?)\nSo that (.+?)(?:\n\n|\nAcceptance)', prd_text, re.MULTILINE | re.DOTALL)
-        sections['user_stories'] = [
-            {'persona': story[0].strip(), 'want': story[1].strip(), 'value': story[2].strip()}
-            for story in user_stories
-        ]
-        
-        # Extract acceptance criteria
-        criteria_blocks = re.findall(r'Acceptance Criteria:(.*?)(?=\n\n|\n#|\Z)', prd_text, re.MULTILINE | re.DOTALL)
-        sections['acceptance_criteria'] = []
-        for block in criteria_blocks:
-            criteria = re.findall(r'✅ (.+)', block)
-            sections['acceptance_criteria'].extend(criteria)
-        
-        # Extract technical requirements
-        tech_section = re.search(r'Technical Requirements(.*?)(?=\n## |\Z)', prd_text, re.MULTILINE | re.DOTALL)
-        if tech_section:
-            sections['technical_requirements'] = tech_section.group(1).strip()
-        
-        return sections
+        # Parsing creates no reference cycles; pausing the collector
+        # avoids full collections that grow with the number of stories
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return PRDParser.parse(prd_text)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
     
     def estimate_complexity(self, task_description: str, task_type: str) -> int:
         """Estimate story points based on description and type"""
-        complexity_keywords = {
-            'simple': 1,
-            'basic': 1,
-            'create': 2,
-            'implement': 3,
-            'complex': 5,
-            'integration': 5,
-            'authentication': 5,
-            'real-time': 8,
-            'optimization': 8,
-            'migration': 8
-        }
-        
-        base_points = 2
-        description_lower = task_description.lower()
-        
-        for keyword, points in complexity_keywords.items():
-            if keyword in description_lower:
-                base_points = max(base_points, points)
+        keyword_points, _ = self.keyword_matcher.match(task_description)
+        base_points = max(2, keyword_points)
         
         # Apply type multiplier
         multiplier = self.task_templates['feature'].get(task_type, 1.0)
@@ -74,144 +601,68 @@ class TaskGenerator:
         fibonacci_points = [1, 2, 3, 5, 8, 13]
         return min(fibonacci_points, key=lambda x: abs(x - final_points))
     
-    def generate_tasks_from_story(self, story: Dict[str, str], story_index: int) -> List[Dict[str, Any]]:
+    def generate_tasks_from_story(self, story: Dict[str, str], story_index: int) -> List['Task']:
         """Generate development tasks from a user story"""
         tasks = []
-        story_id = f"story-{story_index + 1}"
+        story_id = sys.intern(f"story-{story_index + 1}")
+        want = story['want']
         
         # Frontend tasks
-        frontend_task = {
-            'title': f"Implement UI for {story['want']}",
-            'description': f"Create user interface components to support: {story['want']}",
-            'type': 'frontend',
-            'story_points': self.estimate_complexity(story['want'], 'frontend'),
-            'labels': ['frontend', 'feature'],
-            'story_id': story_id,
-            'acceptance_criteria': [
-                f"User can {story['want']} through the UI",
-                "UI is responsive and accessible",
-                "Error states are handled gracefully"
-            ]
-        }
+        frontend_task = Task(
+            title=f"Implement UI for {want}",
+            description=f"Create user interface components to support: {want}",
+            type='frontend',
+            story_points=self.estimate_complexity(want, 'frontend'),
+            labels=TASK_LABELS['frontend'],
+            story_id=story_id,
+            acceptance_criteria=(f"User can {want} through the UI",) + TASK_CRITERIA['frontend']
+        )
         tasks.append(frontend_task)
         
         # Backend tasks
-        backend_task = {
-            'title': f"Implement API for {story['want']}",
-            'description': f"Create backend endpoints and business logic for: {story['want']}",
-            'type': 'backend',
-            'story_points': self.estimate_complexity(story['want'], 'backend'),
-            'labels': ['backend', 'api'],
-            'story_id': story_id,
-            'acceptance_criteria': [
-                "API endpoints are created and documented",
-                "Business logic is implemented correctly",
-                "Input validation is in place",
-                "Error responses are standardized"
-            ]
-        }
+        backend_task = Task(
+            title=f"Implement API for {want}",
+            description=f"Create backend endpoints and business logic for: {want}",
+            type='backend',
+            story_points=self.estimate_complexity(want, 'backend'),
+            labels=TASK_LABELS['backend'],
+            story_id=story_id,
+            acceptance_criteria=TASK_CRITERIA['backend']
+        )
         tasks.append(backend_task)
         
         # Database tasks (if needed)
-        if any(keyword in story['want'].lower() for keyword in ['save', 'store', 'create', 'update', 'delete']):
-            db_task = {
-                'title': f"Database schema for {story['want']}",
-                'description': f"Create or modify database schema to support: {story['want']}",
-                'type': 'database',
-                'story_points': self.estimate_complexity(story['want'], 'database'),
-                'labels': ['database', 'schema'],
-                'story_id': story_id,
-                'acceptance_criteria': [
-                    "Database schema supports required data",
-                    "Proper indexes are created",
-                    "Migration script is provided"
-                ]
-            }
+        _, needs_database = self.keyword_matcher.match(want)
+        if needs_database:
+            db_task = Task(
+                title=f"Database schema for {want}",
+                description=f"Create or modify database schema to support: {want}",
+                type='database',
+                story_points=self.estimate_complexity(want, 'database'),
+                labels=TASK_LABELS['database'],
+                story_id=story_id,
+                acceptance_criteria=TASK_CRITERIA['database']
+            )
             tasks.append(db_task)
         
         # Testing tasks
-        test_task = {
-            'title': f"Tests for {story['want']}",
-            'description': f"Create comprehensive tests for: {story['want']}",
-            'type': 'testing',
-            'story_points': max(1, sum(t['story_points'] for t in tasks) // 3),
-            'labels': ['testing', 'quality'],
-            'story_id': story_id,
-            'dependencies': [t['title'] for t in tasks],
-            'acceptance_criteria': [
-                "Unit tests cover business logic",
-                "Integration tests verify API endpoints",
-                "E2E tests cover user workflows"
-            ]
-        }
+        test_task = Task(
+            title=f"Tests for {want}",
+            description=f"Create comprehensive tests for: {want}",
+            type='testing',
+            story_points=max(1, sum(t.story_points for t in tasks) // 3),
+            labels=TASK_LABELS['testing'],
+            story_id=story_id,
+            dependencies=tuple(t.title for t in tasks),
+            acceptance_criteria=TASK_CRITERIA['testing']
+        )
         tasks.append(test_task)
         
         return tasks
     
-    def generate_supporting_tasks(self, all_tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def generate_supporting_tasks(self, all_tasks: List[Dict[str, Any]]) -> List['Task']:
         """Generate supporting tasks for the project"""
-        supporting_tasks = []
-        
-        # DevOps tasks
-        devops_tasks = [
-            {
-                'title': 'Setup CI/CD pipeline',
-                'description': 'Configure automated testing and deployment pipeline',
-                'type': 'devops',
-                'story_points': 5,
-                'labels': ['devops', 'infrastructure'],
-                'acceptance_criteria': [
-                    'Automated tests run on every PR',
-                    'Automated deployment to staging',
-                    'Production deployment workflow defined'
-                ]
-            },
-            {
-                'title': 'Configure monitoring and alerts',
-                'description': 'Setup application monitoring, logging, and alerting',
-                'type': 'devops',
-                'story_points': 3,
-                'labels': ['devops', 'monitoring'],
-                'acceptance_criteria': [
-                    'Application metrics are collected',
-                    'Error tracking is configured',
-                    'Performance monitoring is active'
-                ]
-            }
-        ]
-        
-        # Documentation tasks
-        doc_tasks = [
-            {
-                'title': 'API documentation',
-                'description': 'Create comprehensive API documentation',
-                'type': 'documentation',
-                'story_points': 2,
-                'labels': ['documentation', 'api'],
-                'acceptance_criteria': [
-                    'All endpoints are documented',
-                    'Request/response examples provided',
-                    'Authentication requirements specified'
-                ]
-            },
-            {
-                'title': 'User guide documentation',
-                'description': 'Create user-facing documentation and guides',
-                'type': 'documentation',
-                'story_points': 3,
-                'labels': ['documentation', 'user-guide'],
-                'acceptance_criteria': [
-                    'User workflows are documented',
-                    'Screenshots and examples included',
-                    'Troubleshooting guide provided'
-                ]
-            }
-        ]
-        
-        supporting_tasks.extend(devops_tasks)
-        supporting_tasks.extend(doc_tasks)
-        
-        return supporting_tasks
+        return [Task.from_dict(task) for task in SUPPORTING_TASKS]
     
     def assign_priorities(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Assign priorities to tasks based on dependencies and type"""
@@ -233,83 +684,605 @@ class TaskGenerator:
         
         return tasks
     
-    def organize_into_sprints(self, tasks: List[Dict[str, Any]], sprint_capacity: int = 20) -> Dict[str, List[Dict[str, Any]]]:
-        """Organize tasks into sprints based on dependencies and capacity"""
-        sprints = {}
-        current_sprint = 1
-        current_capacity = 0
+    @staticmethod
+    def sprint_sort_key(task: Dict[str, Any]) -> tuple:
+        """Order tasks high priority first, larger tasks first within a priority"""
+        return (
+            task['priority'] == 'low',
+            task['priority'] == 'medium',
+            task['priority'] == 'high',
+            -task['story_points']
+        )
+    
+    def organize_into_sprints(self, tasks: List[Dict[str, Any]], sprint_capacity: int = 20,
+                              strategy: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Organize tasks into sprints based on priority and capacity"""
+        packer = SprintPacker(sprint_capacity, strategy or self.packing_strategy)
+        return name_sprints(packer.pack(tasks, self.sprint_sort_key))
+    
+    def iter_tasks(self, fileobj: TextIO) -> Iterator[Dict[str, Any]]:
+        """Yield prioritized tasks story by story while reading the PRD file"""
+        ids = TaskIdAssigner() if self.output_format >= 2 else None
+        
+        for i, (story, duplicate) in enumerate(self.dedup_stories(self.iter_stories(fileobj))):
+            story_tasks = self.generate_tasks_from_story(story, i)
+            if duplicate:
+                self.flag_duplicate(story_tasks)
+            if ids:
+                ids.assign_story(story['want'], story_tasks)
+            yield from self.assign_priorities(story_tasks)
         
-        # Sort by priority and dependencies
-        sorted_tasks = sorted(tasks, key=lambda x: (
-            x['priority'] == 'low',
-            x['priority'] == 'medium',
-            x['priority'] == 'high',
-            -x['story_points']
-        ))
-        
-        for task in sorted_tasks:
-            task_points = task['story_points']
-            
-            # Check if task fits in current sprint
-            if current_capacity + task_points > sprint_capacity:
-                current_sprint += 1
-                current_capacity = 0
-            
-            sprint_key = f"Sprint {current_sprint}"
-            if sprint_key not in sprints:
-                sprints[sprint_key] = []
-            
-            sprints[sprint_key].append(task)
-            current_capacity += task_points
-        
-        return sprints
-    
-    def generate_all_tasks(self, prd_content: str, sprint_capacity: int = 20) -> Dict[str, Any]:
-        """Generate complete task breakdown from PRD"""
+        supporting_tasks = self.generate_supporting_tasks([])
+        if ids:
+            for task in supporting_tasks:
+                ids.assign(task)
+        yield from self.assign_priorities(supporting_tasks)
+    
+    def summarize(self, all_tasks: List[Task], sprints: Dict[str, List[Task]],
+                  sprint_capacity: int = 20) -> Dict[str, Any]:
+        """Calculate summary statistics for a planned backlog"""
+        total_points = 0
+        task_count_by_type: Dict[str, int] = {}
+        for task in all_tasks:
+            total_points += task.story_points
+            task_count_by_type[task.type] = task_count_by_type.get(task.type, 0) + 1
+        
+        summary = {
+            'total_tasks': len(all_tasks),
+            'total_story_points': total_points,
+            'task_breakdown': task_count_by_type,
+            'estimated_duration': f"{len(sprints)} sprints"
+        }
+        if self.deduplicator is not None:
+            summary['duplicate_stories'] = self.deduplicator.report(self.dedup)
+        if self.analytics:
+            summary['analytics'] = task_analytics(all_tasks, sprints)
+        if self.packing_strategy == 'dependency-aware':
+            summary['critical_path'] = DependencyPlanner(sprint_capacity).analyze(all_tasks)
+        return summary
+    
+    def generate_all_tasks(self, prd_content: str, sprint_capacity: int = 20,
+                           cache: Optional['TaskCache'] = None, source: Optional[str] = None) -> Dict[str, Any]:
+        """Generate complete task breakdown from PRD
+        
+        source names the PRD; it leads the output so issue creation can tell
+        apart the issues of different PRDs. Tasks come back as plain dicts
+        (Task.to_dict()), so the result can be passed to json.dump as is;
+        build_tasks gives the compact Task records.
+        """
+        all_tasks = self.build_tasks(prd_content, cache)
+        
+        # Organize into sprints
+        sprints = self.organize_into_sprints(all_tasks, sprint_capacity)
+        summary = self.summarize(all_tasks, sprints, sprint_capacity)
+        result = {'source': source} if source else {}
+        
+        # Callers get dicts and lists, not Task records and shared tuples
+        plain = {id(task): task.to_dict() for task in all_tasks}
+        all_tasks = list(plain.values())
+        
+        if self.output_format == 1:
+            result.update({
+                'tasks': all_tasks,
+                'sprints': {name: [plain[id(task)] for task in tasks] for name, tasks in sprints.items()},
+                'summary': summary
+            })
+            return result
+        
+        # Sprints are only IDs in format 2, so they go ahead of the tasks: a reader
+        # streaming the file knows each task's sprint when the task arrives
+        result.update({
+            'format_version': self.output_format,
+            'sprints': sprint_references(sprints),
+            'tasks': all_tasks,
+            'summary': summary
+        })
+        return result
+    
+    def build_tasks(self, prd_content: str, cache: Optional['TaskCache'] = None) -> List[Task]:
+        """Generate the prioritized task list for a PRD, before sprint planning"""
         parsed_prd = self.parse_prd_content(prd_content)
         all_tasks = []
+        ids = TaskIdAssigner() if self.output_format >= 2 else None
         
-        # Generate tasks from user stories
-        for i, story in enumerate(parsed_prd['user_stories']):
-            story_tasks = self.generate_tasks_from_story(story, i)
+        # Generate tasks from user stories, reusing cached tasks for unchanged stories
+        for i, (story, duplicate) in enumerate(self.dedup_stories(parsed_prd['user_stories'])):
+            story_tasks = cache.get(story, i) if cache else None
+            if story_tasks is None:
+                story_tasks = self.generate_tasks_from_story(story, i)
+                if cache:
+                    cache.put(story, story_tasks)
+            if duplicate:
+                self.flag_duplicate(story_tasks)
+            if ids:
+                ids.assign_story(story['want'], story_tasks)
             all_tasks.extend(story_tasks)
         
         # Add supporting tasks
         supporting_tasks = self.generate_supporting_tasks(all_tasks)
+        if ids:
+            for task in supporting_tasks:
+                ids.assign(task)
         all_tasks.extend(supporting_tasks)
         
         # Assign priorities
-        all_tasks = self.assign_priorities(all_tasks)
+        return self.assign_priorities(all_tasks)
+
+class TaskCache:
+    """Persistent cache of generated tasks keyed by a hash of each story.
+
+    Keys cover the story text and the estimator configuration, but not the
+    story's position, so inserting or reordering stories still hits; the
+    story_id is re-stamped on the way out. Entries not used during a run
+    belong to stories that were removed and are dropped on save.
+    """
+    VERSION = 1
+    
+    def __init__(self, path: str, generator: 'TaskGenerator'):
+        self.path = path
+        self.config_fingerprint = json.dumps(generator.estimator_config(), sort_keys=True)
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.used: Dict[str, List[Dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+    
+    def load(self) -> None:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('entries', {})
+    
+    def key(self, story: Dict[str, str]) -> str:
+        payload = '\0'.join((story['persona'], story['want'], story['value'], self.config_fingerprint))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, story: Dict[str, str], story_index: int) -> Optional[List[Dict[str, Any]]]:
+        """Return fresh copies of cached tasks for the story, or None on a miss"""
+        key = self.key(story)
+        cached = self.used.get(key)
+        if cached is None:
+            cached = self.entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
         
-        # Organize into sprints
-        sprints = self.organize_into_sprints(all_tasks, sprint_capacity)
+        self.hits += 1
+        self.used[key] = cached
+        story_id = f"story-{story_index + 1}"
+        tasks = [Task.from_dict(task) for task in cached]
+        for task in tasks:
+            task.story_id = story_id
+        return tasks
+    
+    def put(self, story: Dict[str, str], tasks: List[Dict[str, Any]]) -> None:
+        # Store before priorities are assigned; story_id is re-stamped by get()
+        self.used[self.key(story)] = [task.to_dict() for task in tasks]
+    
+    @property
+    def evicted(self) -> int:
+        return len(set(self.entries) - set(self.used))
+    
+    def save(self) -> None:
+        """Atomically write the entries used in this run"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': self.VERSION, 'entries': self.used}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def report(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total) * 100 if total else 0
+        return (f"Cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), "
+                f"{self.evicted} stale entries dropped")
+
+def task_analytics(tasks: List[Task], sprints: Dict[str, List[Task]]) -> Dict[str, Any]:
+    """Story points per type, priority, story, and sprint and type
+
+    One pass over the tasks and one over the sprints. Dicts list keys in
+    first-seen order; each sprint lists its types in backlog order and
+    leaves out types with no points.
+    """
+    by_type: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    by_story: Dict[str, int] = {}
+    for task in tasks:
+        points = task.story_points
+        by_type[task.type] = by_type.get(task.type, 0) + points
+        priority = task.priority or 'medium'
+        by_priority[priority] = by_priority.get(priority, 0) + points
+        if task.story_id:
+            by_story[task.story_id] = by_story.get(task.story_id, 0) + points
+    
+    by_sprint = {}
+    for sprint_name, sprint_tasks in sprints.items():
+        row: Dict[str, int] = {}
+        for task in sprint_tasks:
+            row[task.type] = row.get(task.type, 0) + task.story_points
+        by_sprint[sprint_name] = {task_type: row[task_type] for task_type in by_type if row.get(task_type)}
+    
+    return {
+        'points_by_type': by_type,
+        'points_by_priority': by_priority,
+        'points_by_story': by_story,
+        'points_by_sprint_and_type': by_sprint
+    }
+
+class StreamingSummary:
+    """Accumulate summary statistics for tasks without keeping the tasks.
+
+    Sprint count under organize_into_sprints depends only on the sequence of
+    sorted (priority, points) keys, so a histogram of those keys is enough
+    to reproduce estimated_duration in constant memory.
+    """
+    def __init__(self, sprint_capacity: int = 20):
+        self.sprint_capacity = sprint_capacity
+        self.total_tasks = 0
+        self.total_points = 0
+        self.task_breakdown: Dict[str, int] = {}
+        self._sort_key_counts: Dict[tuple, int] = {}
+    
+    def add(self, task: Dict[str, Any]) -> None:
+        self.total_tasks += 1
+        self.total_points += task['story_points']
+        task_type = task['type']
+        self.task_breakdown[task_type] = self.task_breakdown.get(task_type, 0) + 1
+        key = TaskGenerator.sprint_sort_key(task)
+        self._sort_key_counts[key] = self._sort_key_counts.get(key, 0) + 1
+    
+    def sprint_count(self) -> int:
+        """Number of sprints organize_into_sprints would produce"""
+        used_sprints = 0
+        current_sprint = 1
+        last_used = 0
+        current_capacity = 0
         
-        # Calculate summary statistics
-        total_points = sum(task['story_points'] for task in all_tasks)
-        task_count_by_type = {}
-        for task in all_tasks:
-            task_type = task['type']
-            task_count_by_type[task_type] = task_count_by_type.get(task_type, 0) + 1
+        for key in sorted(self._sort_key_counts):
+            task_points = -key[-1]
+            for _ in range(self._sort_key_counts[key]):
+                if current_capacity + task_points > self.sprint_capacity:
+                    current_sprint += 1
+                    current_capacity = 0
+                if current_sprint != last_used:
+                    used_sprints += 1
+                    last_used = current_sprint
+                current_capacity += task_points
         
+        return used_sprints
+    
+    def to_dict(self) -> Dict[str, Any]:
         return {
-            'tasks': all_tasks,
-            'sprints': sprints,
-            'summary': {
-                'total_tasks': len(all_tasks),
-                'total_story_points': total_points,
-                'task_breakdown': task_count_by_type,
-                'estimated_duration': f"{len(sprints)} sprints"
-            }
+            'total_tasks': self.total_tasks,
+            'total_story_points': self.total_points,
+            'task_breakdown': self.task_breakdown,
+            'estimated_duration': f"{self.sprint_count()} sprints"
         }
 
+def write_task_stream(tasks: Iterator[Dict[str, Any]], output: TextIO, sprint_capacity: int = 20,
+                      format_version: int = 1, source: Optional[str] = None) -> Dict[str, Any]:
+    """Write tasks as they are produced, followed by the summary.
+
+    The output has the same shape as generate_all_tasks minus 'sprints',
+    since assigning sprints needs the whole backlog in memory.
+    """
+    summary = StreamingSummary(sprint_capacity)
+    
+    output.write('{\n')
+    if source:
+        output.write(f'  "source": {json.dumps(source)},\n')
+    if format_version >= 2:
+        output.write(f'  "format_version": {format_version},\n')
+    output.write('  "tasks": [')
+    separator = '\n'
+    for task in tasks:
+        summary.add(task)
+        output.write(separator)
+        output.write(textwrap.indent(json.dumps(task, indent=2, default=task_json_default), '    '))
+        separator = ',\n'
+    output.write('\n  ],\n  "summary": ')
+    
+    result = summary.to_dict()
+    output.write(json.dumps(result, indent=2).replace('\n', '\n  '))
+    output.write('\n}')
+    return result
+
+def write_task_ndjson(generator: TaskGenerator, tasks: Iterator[Task], output: TextIO,
+                      sprint_capacity: int = 20, source: Optional[str] = None) -> Dict[str, Any]:
+    """Write one task per line as it is produced, then a trailer record.
+
+    Each line is flushed so a consumer reading the other end of a pipe can
+    start on the first task. Sprint assignments need the whole backlog, so
+    they arrive last in {"trailer": {"format_version", "sprints", "summary"}}.
+    Tasks must carry IDs (output format 2) for the trailer to reference them.
+    A source is written first, as {"header": {"source"}}.
+    """
+    if source:
+        output.write(json.dumps({'header': {'source': source}}))
+        output.write('\n')
+    all_tasks = []
+    for task in tasks:
+        all_tasks.append(task)
+        output.write(json.dumps(task, default=task_json_default))
+        output.write('\n')
+        output.flush()
+    
+    sprints = generator.organize_into_sprints(all_tasks, sprint_capacity)
+    summary = generator.summarize(all_tasks, sprints, sprint_capacity)
+    trailer = {
+        'format_version': generator.output_format,
+        'sprints': sprint_references(sprints),
+        'summary': summary
+    }
+    output.write(json.dumps({'trailer': trailer}))
+    output.write('\n')
+    output.flush()
+    return summary
+
+def find_prd_files(path: str) -> List[str]:
+    """Resolve a directory or glob pattern to a sorted list of PRD files"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, 'PRD-*.md')))
+    return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+
+def is_batch_path(path: str) -> bool:
+    return os.path.isdir(path) or any(c in path for c in '*?[')
+
+def cache_path_for(output_path: str) -> str:
+    return f"{os.path.splitext(output_path)[0]}.cache.json"
+
+def batch_sources(prd_files: List[str]) -> Dict[str, str]:
+    """Name each PRD by its path below the PRDs' common directory, e.g. 'billing/PRD.md'
+
+    The name is the PRD's source in its output and sets its output path, so
+    PRDs with the same file name in different directories stay apart.
+    Raises ValueError if two PRDs would still write the same output file.
+    """
+    paths = [os.path.abspath(prd_path) for prd_path in prd_files]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ''
+    sources = {}
+    outputs: Dict[str, str] = {}
+    for prd_path, path in zip(prd_files, paths):
+        source = os.path.relpath(path, root).replace(os.sep, '/')
+        output = os.path.splitext(source)[0].lower()
+        if output in outputs:
+            raise ValueError(f"'{outputs[output]}' and '{prd_path}' would write the same output file")
+        outputs[output] = prd_path
+        sources[prd_path] = source
+    return sources
+
+def generate_tasks_for_file(prd_path: str, output_path: str, sprint_capacity: int = 20,
+                            use_cache: bool = False,
+                            generator_options: Optional[Dict[str, Any]] = None,
+                            source: Optional[str] = None) -> Dict[str, Any]:
+    """Generate tasks for one PRD file and write them; returns the summary.
+
+    source names the PRD in the output; it defaults to the file name.
+    Runs in a worker process, so only the small summary travels back.
+    """
+    with open(prd_path, 'r') as f:
+        prd_content = f.read()
+    
+    generator = TaskGenerator(**(generator_options or {}))
+    cache = TaskCache(cache_path_for(output_path), generator) if use_cache else None
+    result = generator.generate_all_tasks(prd_content, sprint_capacity, cache, source or os.path.basename(prd_path))
+    with open(output_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    
+    summary = result['summary']
+    if cache:
+        cache.save()
+        summary = dict(summary, cache={'hits': cache.hits, 'misses': cache.misses, 'evicted': cache.evicted})
+    return summary
+
+def generate_batch(prd_files: List[str], output_dir: str, sprint_capacity: int = 20,
+                   workers: Optional[int] = None, use_cache: bool = False,
+                   generator_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate tasks for many PRDs across a process pool and merge summaries
+
+    Outputs keep the PRDs' layout below their common directory, so
+    'c/a/PRD.md' and 'c/b/PRD.md' write a/PRD.json and b/PRD.json.
+    """
+    sources = batch_sources(prd_files)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    
+    summaries = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(prd_files)) or 1) as executor:
+        futures = {}
+        for prd_path in prd_files:
+            source = sources[prd_path]
+            output_path = os.path.join(output_dir, *f"{os.path.splitext(source)[0]}.json".split('/'))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            future = executor.submit(generate_tasks_for_file, prd_path, output_path, sprint_capacity,
+                                     use_cache, generator_options, source)
+            futures[future] = (prd_path, output_path)
+        
+        for future in as_completed(futures):
+            prd_path, output_path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                errors[prd_path] = str(e)
+                print(f"Error processing '{prd_path}': {e}")
+                continue
+            summary = dict(summary, output=output_path)
+            summaries[prd_path] = summary
+            print(f"{prd_path}: {summary['total_tasks']} tasks, {summary['estimated_duration']}")
+    
+    task_breakdown = {}
+    for summary in summaries.values():
+        for task_type, count in summary['task_breakdown'].items():
+            task_breakdown[task_type] = task_breakdown.get(task_type, 0) + count
+    
+    merged = {
+        'prds': {path: summaries[path] for path in sorted(summaries)},
+        'errors': errors,
+        'summary': {
+            'total_prds': len(summaries),
+            'total_tasks': sum(s['total_tasks'] for s in summaries.values()),
+            'total_story_points': sum(s['total_story_points'] for s in summaries.values()),
+            'task_breakdown': task_breakdown
+        }
+    }
+    
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(merged, f, indent=2)
+    
+    return merged
+
+def load_keyword_config(path: str) -> Dict[str, Any]:
+    """Load TaskGenerator keyword tables from a JSON file.
+
+    Expected shape: {"complexity": {"keyword": points, ...}, "database": ["keyword", ...]}.
+    Either key may be omitted to keep the built-in table.
+    """
+    with open(path, 'r') as f:
+        config = json.load(f)
+    
+    options = {}
+    if 'complexity' in config:
+        options['complexity_keywords'] = {k: int(v) for k, v in config['complexity'].items()}
+    if 'database' in config:
+        options['database_keywords'] = list(config['database'])
+    return options
+
 def main():
     parser = argparse.ArgumentParser(description='Generate development tasks from PRD')
-    parser.add_argument('prd_file', help='Path to PRD file')
+    parser.add_argument('prd_file', help='Path to PRD file, or a directory / glob of PRD files for batch mode')
     parser.add_argument('--output', '-o', default='generated_tasks.json', help='Output JSON file')
     parser.add_argument('--sprint-capacity', '-c', type=int, default=20, help='Sprint capacity in story points')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the PRD incrementally and write tasks as they are generated (omits sprint assignments); '
+                             'memory still grows by a small ID key (~70 bytes) per story in format 2, and with --dedup')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Write one task per line as generated, then a trailer with summary and sprints '
+                             '(use -o - to pipe into create_github_issues.py)')
+    parser.add_argument('--analytics', action='store_true',
+                        help='Add points per type, priority, story and sprint/type to the summary')
+    parser.add_argument('--dedup', choices=['flag', 'merge'],
+                        help="Detect near-duplicate user stories: 'flag' labels their tasks, 'merge' keeps only the first")
+    parser.add_argument('--dedup-threshold', type=float, default=0.8,
+                        help='Jaccard similarity at which two stories count as duplicates (default: 0.8)')
+    parser.add_argument('--capacity-sweep', metavar='MIN:MAX:STEP',
+                        help='Print sprint count and fill ratio for each capacity in the range instead of writing tasks')
+    parser.add_argument('--output-dir', default='generated_tasks',
+                        help='Batch mode: directory for per-PRD outputs and the merged summary.json')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Batch mode: worker processes (default: number of CPUs)')
+    parser.add_argument('--packing', choices=PACKING_STRATEGIES, default='next-fit',
+                        help='Sprint packing strategy (streaming mode always estimates with next-fit)')
+    parser.add_argument('--format', type=int, choices=[1, 2], default=OUTPUT_FORMAT_VERSION,
+                        help='Output format: 2 lists task IDs in sprints, 1 embeds full task copies')
+    parser.add_argument('--keywords', help='JSON file with custom complexity/database keyword tables')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse tasks for unchanged stories from <output>.cache.json and update it')
     
     args = parser.parse_args()
     
+    generator_options = {'packing_strategy': args.packing, 'output_format': args.format,
+                         'analytics': args.analytics, 'dedup': args.dedup,
+                         'dedup_threshold': args.dedup_threshold}
+    if args.keywords:
+        try:
+            generator_options.update(load_keyword_config(args.keywords))
+        except (OSError, ValueError) as e:
+            print(f"Error loading keyword tables from '{args.keywords}': {e}")
+            return 1
+    
+    # Written into the output, so issues from different PRDs are told apart
+    source = os.path.basename(args.prd_file)
+    
+    if is_batch_path(args.prd_file):
+        prd_files = find_prd_files(args.prd_file)
+        if not prd_files:
+            print(f"Error: no PRD files found for '{args.prd_file}'")
+            return 1
+        
+        try:
+            merged = generate_batch(prd_files, args.output_dir, args.sprint_capacity, args.workers, args.cache,
+                                    generator_options)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        summary = merged['summary']
+        print(f"Generated {summary['total_tasks']} tasks ({summary['total_story_points']} story points) "
+              f"from {summary['total_prds']} PRDs")
+        print(f"Task breakdown: {summary['task_breakdown']}")
+        print(f"Output saved to: {args.output_dir}")
+        return 1 if merged['errors'] else 0
+    
+    if args.capacity_sweep:
+        try:
+            capacities = parse_capacity_range(args.capacity_sweep)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        try:
+            with open(args.prd_file, 'r') as f:
+                prd_content = f.read()
+        except FileNotFoundError:
+            print(f"Error: PRD file '{args.prd_file}' not found")
+            return 1
+        
+        generator = TaskGenerator(**generator_options)
+        tasks = generator.build_tasks(prd_content)
+        rows = sweep_capacities(tasks, generator.sprint_sort_key, capacities, generator.packing_strategy)
+        print(f"{len(tasks)} tasks, {rows[0]['total_story_points']} story points, {generator.packing_strategy} packing")
+        print(format_sweep_table(rows))
+        return 0
+    
+    if args.ndjson:
+        if args.format < 2:
+            print("Error: --ndjson needs task IDs; use --format 2")
+            return 1
+        # Keep stdout clean for the task stream when piping
+        log = sys.stderr if args.output == '-' else sys.stdout
+        generator = TaskGenerator(**generator_options)
+        try:
+            with open(args.prd_file, 'r') as prd_file:
+                if args.output == '-':
+                    summary = write_task_ndjson(generator, generator.iter_tasks(prd_file), sys.stdout,
+                                                args.sprint_capacity, source)
+                else:
+                    with open(args.output, 'w') as output:
+                        summary = write_task_ndjson(generator, generator.iter_tasks(prd_file), output,
+                                                    args.sprint_capacity, source)
+        except FileNotFoundError:
+            print(f"Error: PRD file '{args.prd_file}' not found", file=log)
+            return 1
+        
+        print(f"Generated {summary['total_tasks']} tasks ({summary['total_story_points']} story points)", file=log)
+        print(f"Estimated duration: {summary['estimated_duration']}", file=log)
+        print(f"Task breakdown: {summary['task_breakdown']}", file=log)
+        if args.output != '-':
+            print(f"Output saved to: {args.output}")
+        return 0
+    
+    if args.stream:
+        generator = TaskGenerator(**generator_options)
+        try:
+            with open(args.prd_file, 'r') as prd_file, open(args.output, 'w') as output:
+                summary = write_task_stream(generator.iter_tasks(prd_file), output, args.sprint_capacity,
+                                            generator.output_format, source)
+        except FileNotFoundError:
+            print(f"Error: PRD file '{args.prd_file}' not found")
+            return 1
+        
+        print(f"Generated {summary['total_tasks']} tasks ({summary['total_story_points']} story points)")
+        print(f"Estimated duration: {summary['estimated_duration']}")
+        print(f"Task breakdown: {summary['task_breakdown']}")
+        print(f"Output saved to: {args.output}")
+        return 0
+    
     # Read PRD content
     try:
         with open(args.prd_file, 'r') as f:
@@ -319,18 +1292,32 @@ def main():
         return 1
     
     # Generate tasks
-    generator = TaskGenerator()
-    result = generator.generate_all_tasks(prd_content, args.sprint_capacity)
+    generator = TaskGenerator(**generator_options)
+    cache = TaskCache(cache_path_for(args.output), generator) if args.cache else None
+    result = generator.generate_all_tasks(prd_content, args.sprint_capacity, cache, source)
     
     # Save to output file
     with open(args.output, 'w') as f:
         json.dump(result, f, indent=2)
     
+    if cache:
+        cache.save()
+        print(cache.report())
+    
     # Print summary
     summary = result['summary']
     print(f"Generated {summary['total_tasks']} tasks ({summary['total_story_points']} story points)")
     print(f"Estimated duration: {summary['estimated_duration']}")
     print(f"Task breakdown: {summary['task_breakdown']}")
+    if 'critical_path' in summary:
+        critical_path = summary['critical_path']
+        print(f"Critical path: {critical_path['critical_path_points']} story points, "
+              f"theoretical minimum {critical_path['minimum_sprints']} sprints")
+    if 'duplicate_stories' in summary:
+        duplicates = summary['duplicate_stories']
+        action = 'merged' if duplicates['mode'] == 'merge' else 'flagged'
+        print(f"Near-duplicate stories: {duplicates['duplicate_stories']} {action} "
+              f"in {len(duplicates['clusters'])} clusters")
     print(f"Output saved to: {args.output}")
     
     return 0
@@ -0,0 +1,676 @@
+#!/usr/bin/env python3
+"""
+Backends that talk to GitHub for the issue creator
+"""
+import email.utils
+import http.client
+import json
+import os
+import re
+import select
+import subprocess
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from request_scheduler import RequestScheduler
+
+DEFAULT_API_URL = 'https://api.github.com'
+BACKENDS = ['gh', 'rest', 'graphql']
+# GraphQL error types for a request too large or complex to run; GitHub rejects these before running anything
+GRAPHQL_LIMIT_ERRORS = {'MAX_NODE_LIMIT_EXCEEDED', 'RESOURCE_LIMITS_EXCEEDED'}
+# GraphQL error types that fail the same way however often a mutation is sent
+GRAPHQL_FINAL_ERRORS = {'NOT_FOUND', 'FORBIDDEN', 'UNPROCESSABLE', 'INSUFFICIENT_SCOPES'}
+# Issues GitHub may have created for a failed request are looked for from this many seconds before it
+# was sent by GitHub's clock, as the Date header gave it; without that, from CLOCK_SKEW seconds before
+# by the local clock
+CLOCK_MARGIN = 1
+CLOCK_SKEW = 300
+# Tries at each page of the issues a failed request may have created; pages are only read, so they are safe to repeat
+LOOKUP_ATTEMPTS = 3
+# Times a lone issue is sent again after a failed request the lookup showed had not created it
+RESEND_ATTEMPTS = 2
+# Methods that change nothing, so a request lost with its connection may be sent again
+SAFE_METHODS = {'GET', 'HEAD'}
+
+class GitHubError(Exception):
+    """A GitHub call failed; status is the HTTP status when there is one"""
+    def __init__(self, message: str, status: Optional[int] = None, response: Any = None):
+        super().__init__(message)
+        self.status = status
+        # Decoded error body, e.g. {'message': ..., 'errors': [...]}
+        self.response = response
+
+def already_exists(error: GitHubError) -> bool:
+    """Whether a REST error is the 422 GitHub returns for a duplicate name"""
+    errors = error.response.get('errors', []) if isinstance(error.response, dict) else []
+    return error.status == 422 and any(item.get('code') == 'already_exists' for item in errors)
+
+def graphql_failure(error: GitHubError) -> str:
+    """How a whole GraphQL request failed: 'limit', 'unknown' or 'final'
+
+    'limit' means the request was too big and nothing ran, so smaller ones
+    may pass. 'unknown' covers timeouts, 5xx answers and dropped
+    connections: GitHub may have applied some of the mutations, and is how
+    it reports a batch too heavy to finish in time. Anything else, such as
+    a 401 or 422 or an invalid query, is 'final': it would fail again.
+    """
+    if error.status == 413:
+        return 'limit'
+    errors = error.response.get('errors') if isinstance(error.response, dict) else None
+    if errors:
+        if any(item.get('type') in GRAPHQL_LIMIT_ERRORS for item in errors):
+            return 'limit'
+        if any('timeout' in item.get('message', '').lower() for item in errors):
+            return 'unknown'
+    if (error.status is None and error.response is None) or (error.status or 0) >= 500:
+        return 'unknown'
+    return 'final'
+
+def read_token() -> Optional[str]:
+    """GitHub token from the environment, falling back to the gh CLI's stored login"""
+    token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN')
+    if token:
+        return token
+    try:
+        result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+def detect_repo() -> Optional[str]:
+    """owner/name of the origin remote, the same repository gh would resolve"""
+    try:
+        result = subprocess.run(['git', 'remote', 'get-url', 'origin'], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    match = re.search(r'[:/]([^/:]+/[^/]+?)(?:\.git)?/?$', result.stdout.strip())
+    return match.group(1) if result.returncode == 0 and match else None
+
+class GhCliBackend:
+    """Runs one gh process per call"""
+    name = 'gh'
+
+    def __init__(self, executable: Optional[List[str]] = None, scheduler: Optional[RequestScheduler] = None):
+        # The command prefix, so a stand-in for gh can be used against a stub server
+        self.executable = list(executable or ['gh'])
+        self.scheduler = scheduler or RequestScheduler()
+
+    def _run(self, args: List[str], input: Optional[str] = None) -> subprocess.CompletedProcess:
+        attempt = 0
+        while True:
+            self.scheduler.acquire()
+            try:
+                result = subprocess.run(self.executable + args, capture_output=True, text=True, input=input)
+            except FileNotFoundError:
+                self.scheduler.release()
+                raise GitHubError("GitHub CLI not found. Install from https://cli.github.com/")
+            # gh exposes no response headers; a rate limit shows up as "HTTP 403/429" and a message on stderr
+            match = re.search(r'HTTP (\d{3})', result.stderr) if result.returncode != 0 else None
+            status = int(match.group(1)) if match else (200 if result.returncode == 0 else 400)
+            delay = self.scheduler.release(status, message=result.stderr, attempt=attempt)
+            if not self.scheduler.should_retry(delay, attempt):
+                return result
+            attempt += 1
+
+    def probe(self) -> None:
+        """Raise GitHubError unless gh is installed and authenticated"""
+        if self._run(['auth', 'status']).returncode != 0:
+            raise GitHubError("GitHub CLI not authenticated. Run 'gh auth login' first.")
+
+    def create_milestone(self, title: str, description: str, due_date: Optional[str] = None) -> bool:
+        """Create a milestone; False if it already exists"""
+        args = ['api', 'repos/:owner/:repo/milestones', '--method', 'POST',
+                '--field', f'title={title}',
+                '--field', f'description={description}']
+        if due_date:
+            args.extend(['--field', f'due_on={due_date}'])
+
+        result = self._run(args)
+        if result.returncode == 0:
+            return True
+        if "already_exists" in result.stderr:
+            return False
+        raise GitHubError(result.stderr)
+
+    def list_milestones(self) -> List[Dict[str, Any]]:
+        """Every milestone, open or closed"""
+        result = self._run(['api', 'repos/:owner/:repo/milestones?state=all', '--paginate',
+                            '--jq', '.[] | {number, title}'])
+        if result.returncode != 0:
+            raise GitHubError(result.stderr)
+        return [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+
+    def list_labels(self) -> List[Dict[str, Any]]:
+        result = self._run(['label', 'list', '--limit', '1000000', '--json', 'name'])
+        if result.returncode != 0:
+            raise GitHubError(result.stderr)
+        return json.loads(result.stdout or '[]')
+
+    def create_label(self, name: str, color: str = 'ededed') -> bool:
+        """Create a label; False if it already exists"""
+        result = self._run(['label', 'create', name, '--color', color])
+        if result.returncode == 0:
+            return True
+        if "already exists" in result.stderr:
+            return False
+        raise GitHubError(result.stderr)
+
+    def create_issue(self, title: str, body: str, labels: List[str], milestone: Optional[str] = None) -> str:
+        """Create an issue and return its number"""
+        args = ['issue', 'create', '--title', title, '--body', body, '--label', ','.join(labels)]
+        if milestone:
+            args.extend(['--milestone', milestone])
+
+        result = self._run(args)
+        if result.returncode != 0:
+            raise GitHubError(result.stderr)
+        return result.stdout.strip().split('/')[-1]
+
+    def set_issue_milestone(self, issue_number: str, milestone: str) -> None:
+        result = self._run(['issue', 'edit', str(issue_number), '--milestone', milestone])
+        if result.returncode != 0:
+            raise GitHubError(result.stderr)
+
+    def list_issues(self) -> List[Dict[str, Any]]:
+        """Every issue in the repository, open or closed, shaped like REST issues"""
+        result = self._run(['issue', 'list', '--state', 'all', '--limit', '1000000',
+                            '--json', 'number,title,body,labels,milestone,state'])
+        if result.returncode != 0:
+            raise GitHubError(result.stderr)
+        issues = json.loads(result.stdout or '[]')
+        for issue in issues:
+            issue['state'] = issue['state'].lower()
+        return issues
+
+    def update_issue(self, issue_number: str, changes: Dict[str, Any]) -> None:
+        """Change an issue's title, body, labels, state or milestone (by title)"""
+        changes = dict(changes)
+        milestone = changes.pop('milestone', None)
+        if changes:
+            result = self._run(['api', f'repos/:owner/:repo/issues/{issue_number}', '--method', 'PATCH',
+                                '--input', '-'], input=json.dumps(changes))
+            if result.returncode != 0:
+                raise GitHubError(result.stderr)
+        if milestone:
+            self.set_issue_milestone(issue_number, milestone)
+
+class RestBackend:
+    """Calls the GitHub REST API over persistent keep-alive connections.
+
+    The token is read once. Each thread keeps its own connection, so the
+    issue creator's worker pool reuses one TLS session per worker instead
+    of one per call. Milestones and labels are remembered as they are
+    listed or created, so milestone titles resolve to the numbers the API
+    expects without a call.
+    """
+    name = 'rest'
+
+    def __init__(self, repo: str, token: Optional[str] = None, base_url: str = DEFAULT_API_URL,
+                 timeout: float = 30, scheduler: Optional[RequestScheduler] = None, mirror: Any = None):
+        parsed = urllib.parse.urlsplit(base_url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f"Invalid API base URL '{base_url}'")
+        self.repo = repo
+        self.base_url = base_url
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path_prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.token = token if token is not None else read_token()
+        self.scheduler = scheduler or RequestScheduler()
+        # Optional IssueMirror; listings then go through its ETag cache
+        self.mirror = mirror
+        self.milestones: Dict[str, Dict[str, Any]] = {}
+        self._milestones_lock = threading.RLock()
+        self.labels: Dict[str, Dict[str, Any]] = {}
+        self._labels_lock = threading.RLock()
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """This thread's connection, and whether it was reused"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            # An idle connection the server has closed reads as ready; drop it instead of sending on it
+            if connection.sock is None or not select.select([connection.sock], [], [], 0)[0]:
+                return connection, True
+            self._reset_connection()
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.timeout)
+        self._local.connection = connection
+        return connection, False
+
+    def _reset_connection(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+        self._local.connection = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'cast-generate-tasks',
+            'X-GitHub-Api-Version': '2022-11-28'
+        }
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return headers
+
+    def request(self, method: str, path: str, payload: Any = None) -> Any:
+        """Send one REST request and return the decoded JSON response"""
+        return self.send(method, self.path_prefix + path, payload)
+    
+    def send(self, method: str, path: str, payload: Any = None) -> Any:
+        """Send a request to an absolute path on the API host
+
+        Calls are paced by the scheduler; rate-limited ones are retried.
+        """
+        return self._send(method, path, payload)[0]
+
+    def get_conditional(self, path: str, etag: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """GET with If-None-Match; (data, etag), with data None when the resource is unchanged (304)"""
+        extra_headers = {'If-None-Match': etag} if etag else None
+        data, headers = self._send('GET', self.path_prefix + path, extra_headers=extra_headers)
+        return data, headers.get('etag') or etag
+
+    def _send(self, method: str, path: str, payload: Any = None,
+              extra_headers: Optional[Dict[str, str]] = None) -> Tuple[Any, Dict[str, str]]:
+        headers = self.headers()
+        headers.update(extra_headers or {})
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        attempt = 0
+        while True:
+            self.scheduler.acquire()
+            try:
+                response, data = self._exchange(method, path, body, headers)
+            except GitHubError:
+                self.scheduler.release()
+                raise
+            try:
+                decoded = json.loads(data) if data else None
+            except ValueError:
+                decoded = None
+            message = decoded.get('message', '') if isinstance(decoded, dict) else data.decode('utf-8', 'replace')
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            delay = self.scheduler.release(response.status, response_headers, message, attempt)
+            if not self.scheduler.should_retry(delay, attempt):
+                break
+            attempt += 1
+
+        # Redirects are not followed; GitHub answers 301 for an issue transferred to another repository
+        if response.status >= 400 or (response.status >= 300 and response.status != 304):
+            raise GitHubError(f"{method} {path}: {response.status} {message}", response.status, decoded)
+        return decoded, response_headers
+
+    def _exchange(self, method: str, path: str, body: Optional[bytes],
+                  headers: Dict[str, str]) -> Tuple[http.client.HTTPResponse, bytes]:
+        """One request and its response body over this thread's connection
+
+        A reused connection the server dropped is retried once on a fresh
+        one, but only if the request failed while being sent, or is a GET:
+        a POST whose answer was lost may already have been handled. Other
+        failures raise GitHubError with no status, as an unknown outcome.
+        """
+        while True:
+            connection, reused = self._connection()
+            sent = False
+            try:
+                connection.request(method, path, body, headers)
+                sent = True
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._reset_connection()
+                if not reused or (sent and method not in SAFE_METHODS):
+                    raise GitHubError(f"{method} {path}: {e}")
+            except (OSError, http.client.HTTPException) as e:
+                self._reset_connection()
+                raise GitHubError(f"{method} {path}: {e}")
+
+        if response.getheader('Connection', '').lower() == 'close':
+            self._reset_connection()
+        return response, data
+
+    def probe(self) -> None:
+        """Raise GitHubError unless the repository is reachable with the configured token"""
+        self.request('GET', f'/repos/{self.repo}')
+
+    def create_milestone(self, title: str, description: str, due_date: Optional[str] = None) -> bool:
+        """Create a milestone; False if it already exists"""
+        payload = {'title': title, 'description': description}
+        if due_date:
+            payload['due_on'] = due_date
+        try:
+            milestone = self.request('POST', f'/repos/{self.repo}/milestones', payload)
+        except GitHubError as e:
+            if already_exists(e):
+                return False
+            raise
+        with self._milestones_lock:
+            self.milestones[title] = milestone
+        return True
+
+    def list_all(self, path: str) -> List[Dict[str, Any]]:
+        """Every item of a paginated REST collection"""
+        items = []
+        page = 1
+        separator = '&' if '?' in path else '?'
+        while True:
+            batch = self.request('GET', f'{path}{separator}per_page=100&page={page}')
+            items.extend(batch)
+            if len(batch) < 100:
+                return items
+            page += 1
+
+    def list_milestones(self) -> List[Dict[str, Any]]:
+        """Every milestone, open or closed; also remembered for title lookups"""
+        with self._milestones_lock:
+            if self.mirror is not None:
+                milestones = self.mirror.refresh_milestones(self)
+            else:
+                milestones = self.list_all(f'/repos/{self.repo}/milestones?state=all')
+            for milestone in milestones:
+                self.milestones.setdefault(milestone['title'], milestone)
+            return milestones
+
+    def milestone(self, title: str) -> Dict[str, Any]:
+        with self._milestones_lock:
+            if title not in self.milestones:
+                self.list_milestones()
+            if title not in self.milestones:
+                raise GitHubError(f"Milestone '{title}' not found")
+            return self.milestones[title]
+
+    def milestone_number(self, title: str) -> int:
+        return self.milestone(title)['number']
+
+    def list_labels(self) -> List[Dict[str, Any]]:
+        """Every label; also remembered"""
+        with self._labels_lock:
+            if self.mirror is not None:
+                labels = self.mirror.refresh_labels(self)
+            else:
+                labels = self.list_all(f'/repos/{self.repo}/labels')
+            for label in labels:
+                self.labels[label['name']] = label
+            return labels
+
+    def create_label(self, name: str, color: str = 'ededed') -> bool:
+        """Create a label; False if it already exists"""
+        created = True
+        try:
+            label = self.request('POST', f'/repos/{self.repo}/labels', {'name': name, 'color': color})
+        except GitHubError as e:
+            if not already_exists(e):
+                raise
+            # Created by someone else since the labels were listed
+            label = self.request('GET', f'/repos/{self.repo}/labels/{urllib.parse.quote(name, safe="")}')
+            created = False
+        with self._labels_lock:
+            self.labels[name] = label
+        return created
+
+    def create_issue(self, title: str, body: str, labels: List[str], milestone: Optional[str] = None) -> str:
+        """Create an issue and return its number"""
+        payload = {'title': title, 'body': body, 'labels': labels}
+        if milestone:
+            payload['milestone'] = self.milestone_number(milestone)
+        issue = self.request('POST', f'/repos/{self.repo}/issues', payload)
+        return str(issue['number'])
+
+    def set_issue_milestone(self, issue_number: str, milestone: str) -> None:
+        self.request('PATCH', f'/repos/{self.repo}/issues/{issue_number}',
+                     {'milestone': self.milestone_number(milestone)})
+
+    def list_issues(self) -> List[Dict[str, Any]]:
+        """Every issue in the repository, open or closed"""
+        if self.mirror is not None:
+            return self.mirror.refresh_issues(self)
+        # The issues endpoint also returns pull requests
+        return [issue for issue in self.list_all(f'/repos/{self.repo}/issues?state=all')
+                if 'pull_request' not in issue]
+
+    def update_issue(self, issue_number: str, changes: Dict[str, Any]) -> None:
+        """Change an issue's title, body, labels, state or milestone (by title)"""
+        payload = dict(changes)
+        if payload.get('milestone'):
+            payload['milestone'] = self.milestone_number(payload['milestone'])
+        self.request('PATCH', f'/repos/{self.repo}/issues/{issue_number}', payload)
+
+class GraphQLBackend(RestBackend):
+    """Creates issues in batches of aliased createIssue mutations.
+
+    One GraphQL request carries up to batch_size issues. Milestones and
+    single calls still go through REST. GraphQL takes node IDs, so the
+    repository, milestone and label IDs are looked up over REST once and
+    remembered; missing labels are created first, as REST would.
+    A batch rejected as too large is split in half and each half retried.
+    After a timeout, 5xx or dropped connection GitHub may have created
+    some of the issues, so those are looked up by title and body first and
+    only the rest are sent again, split the same way. Other failures, such
+    as bad credentials or invalid input, are returned without retrying.
+    Issues whose own mutation failed are retried once together unless
+    their error is one that would repeat.
+    """
+    name = 'graphql'
+
+    def __init__(self, repo: str, token: Optional[str] = None, base_url: str = DEFAULT_API_URL,
+                 timeout: float = 30, batch_size: int = 50, scheduler: Optional[RequestScheduler] = None,
+                 mirror: Any = None):
+        super().__init__(repo, token, base_url, timeout, scheduler, mirror)
+        self.batch_size = max(1, batch_size)
+        # api.github.com serves GraphQL at /graphql, GitHub Enterprise at /api/graphql next to /api/v3
+        prefix = self.path_prefix
+        self.graphql_path = (prefix[:-len('/v3')] if prefix.endswith('/v3') else prefix) + '/graphql'
+        self._repository_id: Optional[str] = None
+        self._repository_lock = threading.Lock()
+        self.batch_requests = 0
+        # Numbers of the issues this backend created, so a lookup after a failed batch
+        # does not claim another batch's issue with the same title and body
+        self._created: Set[str] = set()
+        # Batches run on several threads; guards batch_requests and _created
+        self._batch_lock = threading.Lock()
+        # GitHub's clock minus the local one, from the Date header of the repository lookup
+        self.clock_offset: Optional[float] = None
+
+    def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL request; returns the full response with data and errors"""
+        with self._batch_lock:
+            self.batch_requests += 1
+        response = self.send('POST', self.graphql_path, {'query': query, 'variables': variables})
+        if not isinstance(response, dict) or (response.get('data') is None and response.get('errors')):
+            errors = response.get('errors', []) if isinstance(response, dict) else []
+            message = '; '.join(error.get('message', '') for error in errors) or 'empty GraphQL response'
+            raise GitHubError(f"GraphQL request failed: {message}", response=response)
+        return response
+
+    def probe(self) -> None:
+        # The same lookup yields the node ID mutations need
+        self._repository_id = self._fetch_repository_id()
+
+    def repository_id(self) -> str:
+        # Held while fetching, so the first concurrent batches do not all look it up
+        with self._repository_lock:
+            if self._repository_id is None:
+                self._repository_id = self._fetch_repository_id()
+            return self._repository_id
+
+    def _fetch_repository_id(self) -> str:
+        repository, headers = self._send('GET', f'{self.path_prefix}/repos/{self.repo}')
+        try:
+            self.clock_offset = email.utils.parsedate_to_datetime(headers['date']).timestamp() - time.time()
+        except (KeyError, TypeError, ValueError):
+            pass
+        return repository['node_id']
+
+    def resolve_label_ids(self, names: List[str]) -> List[str]:
+        with self._labels_lock:
+            missing = [name for name in dict.fromkeys(names) if name not in self.labels]
+            if missing and not self.labels:
+                self.list_labels()
+            for name in missing:
+                if name not in self.labels:
+                    self.create_label(name)
+            return [self.labels[name]['node_id'] for name in names]
+
+    def issue_input(self, title: str, body: str, labels: List[str], milestone: Optional[str] = None) -> Dict[str, Any]:
+        issue_input = {
+            'repositoryId': self.repository_id(),
+            'title': title,
+            'body': body,
+            'labelIds': self.resolve_label_ids(labels)
+        }
+        if milestone:
+            issue_input['milestoneId'] = self.milestone(milestone)['node_id']
+        return issue_input
+
+    def create_issues(self, issues: List[Dict[str, Any]]) -> List[Any]:
+        """Create issues given as dicts of create_issue arguments, batch_size per request
+
+        Returns one entry per issue, in order: its number, or the GitHubError
+        that stopped it.
+        """
+        inputs: List[Any] = []
+        for issue in issues:
+            try:
+                inputs.append(self.issue_input(**issue))
+            except GitHubError as e:
+                inputs.append(e)
+
+        results: List[Any] = list(inputs)
+        pending = [i for i, item in enumerate(inputs) if not isinstance(item, GitHubError)]
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            for index, result in zip(batch, self._create_batch([inputs[i] for i in batch])):
+                results[index] = result
+        return results
+
+    def _create_batch(self, inputs: List[Dict[str, Any]], retry_failed: bool = True, attempt: int = 0) -> List[Any]:
+        aliases = [f'i{i}' for i in range(len(inputs))]
+        query = (
+            'mutation CreateIssues(' + ', '.join(f'${alias}: CreateIssueInput!' for alias in aliases) + ') {\n'
+            + ''.join(f'  {alias}: createIssue(input: ${alias}) {{ issue {{ number }} }}\n' for alias in aliases)
+            + '}'
+        )
+        started = time.time()
+        try:
+            response = self.graphql(query, dict(zip(aliases, inputs)))
+        except GitHubError as e:
+            return self._recover_batch(inputs, e, started, attempt)
+
+        data = response.get('data') or {}
+        field_errors = {}
+        for error in response.get('errors', []):
+            path = error.get('path') or [None]
+            field_errors.setdefault(path[0], error)
+
+        results: List[Any] = []
+        retry = []
+        for i, alias in enumerate(aliases):
+            created = data.get(alias)
+            if created and created.get('issue'):
+                results.append(str(created['issue']['number']))
+                continue
+            error = field_errors.get(alias, {})
+            results.append(GitHubError(error.get('message', 'issue was not created')))
+            if error.get('type') not in GRAPHQL_FINAL_ERRORS:
+                retry.append(i)
+        self._claim(result for result in results if not isinstance(result, GitHubError))
+
+        # A failed mutation created nothing, so retrying it cannot duplicate an issue
+        if retry and retry_failed:
+            for i, result in zip(retry, self._create_batch([inputs[i] for i in retry], retry_failed=False)):
+                results[i] = result
+        return results
+
+    def _recover_batch(self, inputs: List[Dict[str, Any]], error: GitHubError, started: float,
+                       attempt: int = 0) -> List[Any]:
+        """Results for a batch whose whole request failed, resending what is safe to resend"""
+        failure = graphql_failure(error)
+        results: List[Any] = [error] * len(inputs)
+        if failure == 'final':
+            return results
+        if failure == 'unknown':
+            try:
+                found = self.find_created(inputs, started)
+            except GitHubError:
+                # Without knowing what was created, sending the batch again could duplicate issues
+                return results
+            for i, issue_number in enumerate(found):
+                if issue_number:
+                    results[i] = issue_number
+        pending = [i for i, result in enumerate(results) if result is error]
+        if not pending:
+            return results
+        if len(inputs) == 1:
+            if failure == 'unknown' and attempt < RESEND_ATTEMPTS:
+                return self._create_batch(inputs, attempt=attempt + 1)
+            return results
+        middle = (len(pending) + 1) // 2
+        for part in (pending[:middle], pending[middle:]):
+            if part:
+                for i, result in zip(part, self._create_batch([inputs[i] for i in part])):
+                    results[i] = result
+        return results
+
+    def _claim(self, issue_numbers: Iterable[str]) -> None:
+        with self._batch_lock:
+            self._created.update(issue_numbers)
+
+    def find_created(self, inputs: List[Dict[str, Any]], since: float) -> List[Optional[str]]:
+        """Number of the issue created for each input since a failed request was sent, or None
+
+        Issues are listed newest first back to the time the request was
+        sent; each is matched on its exact title and body and claimed by
+        one input at most.
+        """
+        if self.clock_offset is not None:
+            since += self.clock_offset - CLOCK_MARGIN
+        else:
+            since -= CLOCK_SKEW
+        since_text = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(since))
+        candidates: Dict[Tuple[str, str], List[str]] = {}
+        for issue in sorted(self._list_created_since(since_text), key=lambda issue: issue['number']):
+            candidates.setdefault((issue['title'], issue.get('body') or ''), []).append(str(issue['number']))
+
+        found: List[Optional[str]] = []
+        with self._batch_lock:
+            for issue_input in inputs:
+                numbers = candidates.get((issue_input['title'], issue_input.get('body') or ''), [])
+                issue_number = next((number for number in numbers if number not in self._created), None)
+                if issue_number:
+                    self._created.add(issue_number)
+                found.append(issue_number)
+        return found
+
+    def _list_created_since(self, since_text: str) -> List[Dict[str, Any]]:
+        """Issues created at or after since_text, read newest first until older ones start"""
+        issues = []
+        page = 1
+        while True:
+            path = (f'/repos/{self.repo}/issues?state=all&sort=created&direction=desc'
+                    f'&since={since_text}&per_page=100&page={page}')
+            for attempt in range(LOOKUP_ATTEMPTS):
+                try:
+                    batch = self.request('GET', path)
+                    break
+                except GitHubError as e:
+                    if attempt + 1 == LOOKUP_ATTEMPTS or graphql_failure(e) != 'unknown':
+                        raise
+            for issue in batch:
+                if issue.get('created_at', '') < since_text:
+                    return issues
+                if 'pull_request' not in issue:
+                    issues.append(issue)
+            if len(batch) < 100:
+                return issues
+            page += 1
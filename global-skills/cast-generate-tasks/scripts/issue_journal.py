@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local journal of created GitHub issues, so interrupted syncs can resume
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    repo TEXT NOT NULL,
+    source TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    number TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (repo, source, task_key)
+)
+"""
+# Columns kept when a journal from before keys were per source is rebuilt
+OLD_COLUMNS = 'repo, task_key, number, title, content_hash, created_at'
+# Hex digits of the type-and-title hash in a task key, as in generate_tasks.py's IDs
+KEY_DIGEST_LENGTH = 16
+# Keys and IDs used to keep only this many digits of the same hash
+LEGACY_DIGEST_LENGTH = 10
+KEY_PATTERN = re.compile(rf'(.+-)([0-9a-f]{{{KEY_DIGEST_LENGTH}}})(-\d+)?')
+
+def task_key(task_type: str, title: str) -> str:
+    """Stable key for a task without an ID, in the same form generate_tasks.py gives IDs"""
+    digest = hashlib.sha1(f"{task_type}\0{title}".encode('utf-8')).hexdigest()[:KEY_DIGEST_LENGTH]
+    return f"{task_type}-{digest}"
+
+def legacy_task_key(key: str) -> Optional[str]:
+    """The key a task key or ID had with a LEGACY_DIGEST_LENGTH-digit hash, or None for other keys"""
+    match = KEY_PATTERN.fullmatch(key)
+    if match is None:
+        return None
+    return f"{match.group(1)}{match.group(2)[:LEGACY_DIGEST_LENGTH]}{match.group(3) or ''}"
+
+def content_hash(title: str, body: str, labels: List[str], milestone: Optional[str] = None) -> str:
+    """Hash of everything an issue is created with"""
+    content = '\0'.join([title, body, '\n'.join(sorted(labels)), milestone or ''])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+class IssueJournal:
+    """Which tasks already have an issue in a repository, and its number.
+
+    Backed by SQLite. Every record is committed as its own transaction as
+    soon as the issue exists, so a crash or rate limit loses at most the
+    calls in flight. The repository's entries are read into a dict when the
+    journal opens, so checking a task costs no query.
+
+    Task keys are per source, the PRD a task file was generated from:
+    supporting tasks and sprint epics have the same key in every PRD.
+    Entries journaled before keys had a source have source '', and are
+    taken over by the first source that adopt()s their key. Entries under
+    a legacy_task_key() are adopted into the full key the same way.
+    """
+    def __init__(self, path: str, repo: str):
+        self.path = path
+        self.repo = repo
+        self.lock = threading.Lock()
+        # Autocommit; worker threads share the connection under the lock
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(SCHEMA)
+        # (column name, part of the primary key) for the table as found
+        key_columns = {row[1]: row[5] for row in self.connection.execute('PRAGMA table_info(issues)')}
+        if not key_columns.get('source'):
+            self._rekey_by_source('source' in key_columns)
+        # (source, task key) to issue number, and issue number to the source that journaled it
+        self.numbers: Dict[Tuple[str, str], str] = {}
+        self.owners: Dict[str, str] = {}
+        for source, key, number in self.connection.execute(
+                'SELECT source, task_key, number FROM issues WHERE repo = ?', (repo,)):
+            self.numbers[(source, key)] = number
+            self.owners[number] = source
+
+    def _rekey_by_source(self, has_source: bool) -> None:
+        """Rebuild a journal keyed by repository and task key alone into the current table"""
+        source = 'source' if has_source else "''"
+        self.connection.execute('BEGIN')
+        self.connection.execute('ALTER TABLE issues RENAME TO issues_unsourced')
+        self.connection.execute(SCHEMA)
+        self.connection.execute(f'INSERT INTO issues (source, {OLD_COLUMNS}) '
+                                f'SELECT {source}, {OLD_COLUMNS} FROM issues_unsourced')
+        self.connection.execute('DROP TABLE issues_unsourced')
+        self.connection.execute('COMMIT')
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def get(self, key: str, source: str = '') -> Optional[str]:
+        """Issue number recorded for a task key from source, if any"""
+        return self.numbers.get((source, key))
+
+    def owner(self, number: str) -> Optional[str]:
+        """Source whose task an issue number was journaled for, if any"""
+        return self.owners.get(str(number).lstrip('#'))
+
+    def keys_from(self, source: str) -> List[str]:
+        """Keys of the entries recorded from one source"""
+        return [key for key_source, key in self.numbers if key_source == source]
+
+    def adopt(self, key: str, source: str, old_key: Optional[str] = None, old_source: str = '') -> Optional[str]:
+        """Move old_source's entry for old_key (by default key) to key in source; its issue number, if there was one"""
+        old_key = old_key or key
+        with self.lock:
+            number = self.numbers.pop((old_source, old_key), None)
+            if number is None:
+                return None
+            self.connection.execute(
+                'UPDATE issues SET source = ?, task_key = ? WHERE repo = ? AND source = ? AND task_key = ?',
+                (source, key, self.repo, old_source, old_key))
+            self.numbers[(source, key)] = number
+            self.owners[number] = source
+        return number
+
+    def record(self, key: str, number: str, title: str, issue_hash: str, source: str = '') -> None:
+        """Remember that key's issue exists; durable once this returns"""
+        number = str(number).lstrip('#')
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO issues (repo, source, task_key, number, title, content_hash, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.repo, source, key, number, title, issue_hash, time.time()))
+            self.numbers[(source, key)] = number
+            self.owners[number] = source
+
+    def forget(self, key: str, source: str = '') -> None:
+        """Drop key's entry, e.g. when its issue was deleted"""
+        with self.lock:
+            self.connection.execute('DELETE FROM issues WHERE repo = ? AND source = ? AND task_key = ?',
+                                    (self.repo, source, key))
+            number = self.numbers.pop((source, key), None)
+            if self.owners.get(number) == source:
+                del self.owners[number]
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
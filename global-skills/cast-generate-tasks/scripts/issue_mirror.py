@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of a repository's issues, milestones and labels
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_issues (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repo, number)
+);
+CREATE INDEX IF NOT EXISTS mirror_issues_title ON mirror_issues (repo, title);
+CREATE INDEX IF NOT EXISTS mirror_issues_body_hash ON mirror_issues (repo, body_hash);
+CREATE TABLE IF NOT EXISTS mirror_milestones (
+    repo TEXT NOT NULL,
+    title TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repo, title)
+);
+CREATE TABLE IF NOT EXISTS mirror_labels (
+    repo TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repo, name)
+);
+CREATE TABLE IF NOT EXISTS http_cache (
+    repo TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (repo, url)
+);
+CREATE TABLE IF NOT EXISTS mirror_state (
+    repo TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (repo, key)
+);
+"""
+
+PAGE_SIZE = 100
+
+def body_hash(body: Optional[str]) -> str:
+    return hashlib.sha1((body or '').encode('utf-8')).hexdigest()
+
+class IssueMirror:
+    """A repository's issues, milestones and labels, kept in SQLite between runs.
+
+    Pages are fetched with If-None-Match and the ETag GitHub sent last time;
+    a 304 answer costs no rate limit and the stored page is used instead.
+    Issues are refreshed incrementally: only those updated since the newest
+    mirrored issue are listed, so an unchanged repository takes one 304.
+    Issues are indexed by title and body hash for lookups without the API.
+    """
+    def __init__(self, path: str, repo: str):
+        self.repo = repo
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+        self.requests = 0
+        self.not_modified = 0
+
+    def get(self, backend: Any, path: str) -> Any:
+        """GET path through the ETag cache"""
+        with self.lock:
+            row = self.connection.execute('SELECT etag, body FROM http_cache WHERE repo = ? AND url = ?',
+                                          (self.repo, path)).fetchone()
+        data, etag = backend.get_conditional(path, row[0] if row else None)
+        self.requests += 1
+        if data is None and row:
+            self.not_modified += 1
+            return json.loads(row[1])
+        if etag:
+            with self.lock:
+                self.connection.execute('INSERT OR REPLACE INTO http_cache (repo, url, etag, body) VALUES (?, ?, ?, ?)',
+                                        (self.repo, path, etag, json.dumps(data)))
+        return data
+
+    def list_pages(self, backend: Any, path: str) -> List[Dict[str, Any]]:
+        items = []
+        page = 1
+        separator = '&' if '?' in path else '?'
+        while True:
+            batch = self.get(backend, f'{path}{separator}per_page={PAGE_SIZE}&page={page}')
+            items.extend(batch)
+            if len(batch) < PAGE_SIZE:
+                return items
+            page += 1
+
+    def _replace(self, table: str, key: str, items: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.connection.execute('BEGIN')
+            self.connection.execute(f'DELETE FROM {table} WHERE repo = ?', (self.repo,))
+            self.connection.executemany(f'INSERT OR REPLACE INTO {table} (repo, {key}, data) VALUES (?, ?, ?)',
+                                        [(self.repo, item[key], json.dumps(item)) for item in items])
+            self.connection.execute('COMMIT')
+
+    def refresh_milestones(self, backend: Any) -> List[Dict[str, Any]]:
+        milestones = self.list_pages(backend, f'/repos/{self.repo}/milestones?state=all')
+        self._replace('mirror_milestones', 'title', milestones)
+        return milestones
+
+    def refresh_labels(self, backend: Any) -> List[Dict[str, Any]]:
+        labels = self.list_pages(backend, f'/repos/{self.repo}/labels')
+        self._replace('mirror_labels', 'name', labels)
+        return labels
+
+    def refresh_issues(self, backend: Any) -> List[Dict[str, Any]]:
+        """Bring the issue mirror up to date and return every mirrored issue"""
+        since = self._issues_since()
+        path = f'/repos/{self.repo}/issues?state=all&sort=updated&direction=asc'
+        if since:
+            path += f'&since={since}'
+
+        # The issues endpoint also returns pull requests
+        issues = [issue for issue in self.list_pages(backend, path) if 'pull_request' not in issue]
+        self._store_issues(issues, since)
+        return self.issues()
+
+    def reconcile_issues(self, backend: Any) -> List[Dict[str, Any]]:
+        """List every issue and drop mirrored issues GitHub no longer has; return every mirrored issue
+
+        Incremental refreshes never see an issue that was deleted or
+        transferred. This lists the whole repository through the ETag
+        cache instead, so pages that did not change cost a 304 each.
+        """
+        path = f'/repos/{self.repo}/issues?state=all&sort=created&direction=asc'
+        issues = [issue for issue in self.list_pages(backend, path) if 'pull_request' not in issue]
+        self._store_issues(issues, self._issues_since(), replace=True)
+        return self.issues()
+
+    def _issues_since(self) -> Optional[str]:
+        """updated_at of the newest mirrored issue, as the next incremental listing's since"""
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM mirror_state WHERE repo = ? AND key = 'issues_since'",
+                                          (self.repo,)).fetchone()
+        return row[0] if row else None
+
+    def _store_issues(self, issues: List[Dict[str, Any]], since: Optional[str], replace: bool = False) -> None:
+        """Write listed issues, replacing every mirrored issue with them if replace is set"""
+        with self.lock:
+            self.connection.execute('BEGIN')
+            if replace:
+                self.connection.execute('DELETE FROM mirror_issues WHERE repo = ?', (self.repo,))
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO mirror_issues (repo, number, title, body_hash, state, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(self.repo, issue['number'], issue['title'], body_hash(issue.get('body')), issue['state'],
+                  issue['updated_at'], json.dumps(issue)) for issue in issues])
+            newest = max([issue['updated_at'] for issue in issues] + ([since] if since else []), default=None)
+            if newest and newest != since:
+                self.connection.execute("INSERT OR REPLACE INTO mirror_state (repo, key, value) "
+                                        "VALUES (?, 'issues_since', ?)", (self.repo, newest))
+                # Incremental listings from older since values will not be requested again
+                self.connection.execute("DELETE FROM http_cache WHERE repo = ? AND url LIKE ? AND url NOT LIKE ?",
+                                        (self.repo, f'/repos/{self.repo}/issues?%sort=updated%',
+                                         f'%since={newest}%'))
+            self.connection.execute('COMMIT')
+
+    def issues(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.connection.execute('SELECT data FROM mirror_issues WHERE repo = ? ORDER BY number',
+                                           (self.repo,)).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def find_issues(self, title: str, body: str) -> List[str]:
+        """Numbers of the open mirrored issues with exactly this title and body, lowest first"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT number FROM mirror_issues WHERE repo = ? AND title = ? AND body_hash = ? AND state = 'open' "
+                "ORDER BY number", (self.repo, title, body_hash(body))).fetchall()
+        return [str(row[0]) for row in rows]
+
+    def forget_issue(self, number: str) -> None:
+        """Drop an issue GitHub no longer has; incremental refreshes never report deletions"""
+        with self.lock:
+            self.connection.execute('DELETE FROM mirror_issues WHERE repo = ? AND number = ?',
+                                    (self.repo, int(str(number).lstrip('#'))))
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
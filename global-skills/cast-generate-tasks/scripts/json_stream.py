@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for JSON documents too large to decode in one go
+"""
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters a number can continue with
+NUMBER = re.compile(r'[-+.eE0-9]*')
+
+class JsonStreamReader:
+    """Decodes one JSON document from a file a value at a time.
+
+    members() and items() walk an object or array without decoding it whole;
+    value() decodes the next value completely. Only the unread part of the
+    current chunk and the value being decoded are held in memory.
+    """
+    def __init__(self, f: TextIO, prefix: str = '', chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        # Text already read from f, e.g. a first line checked for another format
+        self.buffer = prefix
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        # Where the buffer starts in the document, for error positions
+        self.offset = 0
+        self.line = 1
+        self.column = 1
+
+    def _read(self, size: int) -> bool:
+        """Append up to size more characters, dropping those consumed; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        consumed = self.buffer[:self.pos]
+        self.offset += len(consumed)
+        newlines = consumed.count('\n')
+        self.line += newlines
+        self.column = len(consumed) - consumed.rfind('\n') if newlines else self.column + len(consumed)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next character that is not whitespace, or '' at the end of the document"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read(self.chunk_size):
+                return ''
+
+    def _error(self, error: json.JSONDecodeError) -> json.JSONDecodeError:
+        """error with its position moved from the buffer to the whole document"""
+        column = error.colno + self.column - 1 if error.lineno == 1 else error.colno
+        line = error.lineno + self.line - 1
+        position = error.pos + self.offset
+        moved = json.JSONDecodeError(error.msg, error.doc, error.pos)
+        moved.args = (f"{error.msg}: line {line} column {column} (char {position})",)
+        moved.pos, moved.lineno, moved.colno = position, line, column
+        return moved
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos))
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value whole"""
+        first = self.peek()
+        if first and first in '-0123456789':
+            # A prefix of a number cut off by the chunk end would decode as a different number
+            while NUMBER.match(self.buffer, self.pos).end() == len(self.buffer) and self._read(self.chunk_size):
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Probably cut off at the end of the buffer; double it, so long values stay linear
+                if self._read(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    continue
+                raise self._error(e) from None
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the object that comes next
+
+        The caller reads each key's value, with value(), members() or
+        items(), before asking for the next key.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error(json.JSONDecodeError('Expecting property name', self.buffer, self.pos))
+            self.expect(':')
+            yield key
+            if self.peek() != ',':
+                self.expect('}')
+                return
+            self.pos += 1
+
+    def items(self) -> Iterator[Any]:
+        """Yield the decoded elements of the array that comes next"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() != ',':
+                self.expect(']')
+                return
+            self.pos += 1
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Pack prioritized tasks into sprints
+"""
+import argparse
+import bisect
+import heapq
+import json
+from typing import Any, Callable, Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # the capacity sweep falls back to bisect
+    np = None
+
+STRATEGIES = ['next-fit', 'first-fit-decreasing', 'best-fit', 'dependency-aware']
+
+class MaxSegmentTree:
+    """Fixed-size max segment tree with leftmost-at-least queries"""
+    def __init__(self, size: int, initial: int = 0):
+        self.size = 1
+        while self.size < max(size, 1):
+            self.size *= 2
+        self.tree = [initial] * (2 * self.size)
+
+    def update(self, index: int, value: int) -> None:
+        i = index + self.size
+        self.tree[i] = value
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def find_first(self, threshold: int, start: int = 0) -> int:
+        """Leftmost index >= start whose value is >= threshold, or -1"""
+        return self._find(1, 0, self.size, threshold, start)
+
+    def _find(self, node: int, low: int, high: int, threshold: int, start: int) -> int:
+        if high <= start or self.tree[node] < threshold:
+            return -1
+        if node >= self.size:
+            return low
+        middle = (low + high) // 2
+        found = self._find(2 * node, low, middle, threshold, start)
+        if found == -1:
+            found = self._find(2 * node + 1, middle, high, threshold, start)
+        return found
+
+class SprintPacker:
+    """Assign tasks to fixed-capacity sprints.
+
+    Tasks are grouped into priority tiers by the sort key. Tiers never
+    interleave: a task is never scheduled in an earlier sprint than any
+    task of a higher tier, though a tier may share its first sprint with
+    the end of the previous one.
+
+    - next-fit: the original greedy pass; a new sprint opens as soon as a
+      task does not fit and earlier sprints are never revisited.
+    - first-fit-decreasing: within a tier, largest tasks first, each into
+      the earliest sprint with room (segment tree over sprint capacity).
+    - best-fit: within a tier, largest tasks first, each into the sprint
+      whose remaining capacity is the tightest fit (buckets by remaining
+      capacity plus a segment tree over occupied buckets).
+
+    - dependency-aware: ignores tiers and schedules every task at least one
+      sprint after its dependencies (see DependencyPlanner).
+
+    Both packing strategies run in O(n log n).
+    """
+    def __init__(self, sprint_capacity: int = 20, strategy: str = 'next-fit'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown packing strategy '{strategy}', expected one of {', '.join(STRATEGIES)}")
+        self.sprint_capacity = sprint_capacity
+        self.strategy = strategy
+
+    def pack(self, tasks: List[Dict[str, Any]], sort_key: Callable[[Dict[str, Any]], tuple],
+             size_key: str = 'story_points') -> List[List[Dict[str, Any]]]:
+        """Return a list of sprints, each a list of tasks.
+
+        sort_key orders tasks; everything but its last element is the tier.
+        """
+        if self.strategy == 'dependency-aware':
+            return DependencyPlanner(self.sprint_capacity).plan(tasks, sort_key, size_key)
+
+        sorted_tasks = sorted(tasks, key=sort_key)
+        if self.strategy == 'next-fit':
+            return self._next_fit(sorted_tasks, size_key)
+
+        tiers: List[List[Dict[str, Any]]] = []
+        last_tier = None
+        for task in sorted_tasks:
+            tier = sort_key(task)[:-1]
+            if tier != last_tier:
+                tiers.append([])
+                last_tier = tier
+            tiers[-1].append(task)
+
+        if self.strategy == 'first-fit-decreasing':
+            return self._first_fit(tiers, size_key, len(sorted_tasks))
+        return self._best_fit(tiers, size_key)
+
+    def _next_fit(self, sorted_tasks: List[Dict[str, Any]], size_key: str) -> List[List[Dict[str, Any]]]:
+        sprints: Dict[int, List[Dict[str, Any]]] = {}
+        current_sprint = 1
+        current_capacity = 0
+
+        for task in sorted_tasks:
+            task_points = task[size_key]
+            if current_capacity + task_points > self.sprint_capacity:
+                current_sprint += 1
+                current_capacity = 0
+            sprints.setdefault(current_sprint, []).append(task)
+            current_capacity += task_points
+
+        return list(sprints.values())
+
+    def _first_fit(self, tiers: List[List[Dict[str, Any]]], size_key: str,
+                   task_count: int) -> List[List[Dict[str, Any]]]:
+        capacity = self.sprint_capacity
+        # Every slot starts as an empty sprint, so "no open sprint fits"
+        # naturally resolves to the next unused slot on the right
+        remaining = MaxSegmentTree(task_count + 1, initial=capacity)
+        sprints: List[List[Dict[str, Any]]] = []
+        closed_upto = 0
+
+        for tier in tiers:
+            # Close every sprint before the last one used by earlier tiers
+            for index in range(closed_upto, len(sprints) - 1):
+                remaining.update(index, -1)
+            closed_upto = max(closed_upto, len(sprints) - 1)
+
+            for task in tier:
+                points = task[size_key]
+                if points > capacity:
+                    index = remaining.find_first(capacity, start=len(sprints))
+                else:
+                    index = remaining.find_first(points)
+                if index == len(sprints):
+                    sprints.append([])
+                sprints[index].append(task)
+                left = remaining.tree[index + remaining.size] - points
+                remaining.update(index, max(left, 0))
+
+        return sprints
+
+    def _best_fit(self, tiers: List[List[Dict[str, Any]]], size_key: str) -> List[List[Dict[str, Any]]]:
+        capacity = self.sprint_capacity
+        # buckets[r] is a heap of sprint indexes with r points left; entries
+        # go stale when a sprint's remaining capacity changes and are
+        # skipped lazily. counts[r] is exact and mirrored in the tree.
+        buckets: List[List[int]] = [[] for _ in range(capacity + 1)]
+        counts = [0] * (capacity + 1)
+        occupied = MaxSegmentTree(capacity + 1)
+        sprint_remaining: List[int] = []
+        sprints: List[List[Dict[str, Any]]] = []
+        closed_upto = 0
+
+        def move(index: int, value: int) -> None:
+            old = sprint_remaining[index]
+            if old >= 0:
+                counts[old] -= 1
+                occupied.update(old, counts[old])
+            sprint_remaining[index] = value
+            if value >= 0:
+                counts[value] += 1
+                occupied.update(value, counts[value])
+                heapq.heappush(buckets[value], index)
+
+        for tier in tiers:
+            # Close every sprint before the last one used by earlier tiers
+            for index in range(closed_upto, len(sprints) - 1):
+                move(index, -1)
+            closed_upto = max(closed_upto, len(sprints) - 1)
+
+            for task in tier:
+                points = task[size_key]
+                value = occupied.find_first(1, start=points) if points <= capacity else -1
+                if value == -1:
+                    index = len(sprints)
+                    sprints.append([])
+                    sprint_remaining.append(-1)
+                    move(index, capacity)
+                else:
+                    bucket = buckets[value]
+                    while sprint_remaining[bucket[0]] != value:
+                        heapq.heappop(bucket)
+                    index = bucket[0]
+                sprints[index].append(task)
+                move(index, max(sprint_remaining[index] - points, 0))
+
+        return sprints
+
+class DependencyPlanner:
+    """Schedule tasks along their dependency DAG.
+
+    Task dependencies are task titles, resolved within the same story first
+    and then across the backlog. Kahn's algorithm releases a task once all
+    its dependencies are placed; among released tasks the sort key decides
+    who goes first, and each task takes the earliest sprint with room that
+    is strictly after every dependency's sprint. Building the graph and the
+    traversal are linear in tasks plus edges, with a log factor for the
+    ready heap and the capacity index. Tasks caught in a dependency cycle
+    are scheduled last, ignoring the cyclic edges.
+    """
+    def __init__(self, sprint_capacity: int = 20):
+        self.sprint_capacity = sprint_capacity
+
+    def build_graph(self, tasks: List[Dict[str, Any]]) -> List[List[int]]:
+        """Return dependency index lists, one per task"""
+        by_story_title: Dict[tuple, int] = {}
+        by_title: Dict[str, int] = {}
+        for index, task in enumerate(tasks):
+            title = task.get('title')
+            by_story_title.setdefault((task.get('story_id'), title), index)
+            by_title.setdefault(title, index)
+
+        graph = []
+        for index, task in enumerate(tasks):
+            dependencies = []
+            for title in task.get('dependencies', []):
+                dependency = by_story_title.get((task.get('story_id'), title))
+                if dependency is None:
+                    dependency = by_title.get(title)
+                if dependency is not None and dependency != index:
+                    dependencies.append(dependency)
+            graph.append(dependencies)
+        return graph
+
+    def _topological_order(self, tasks: List[Dict[str, Any]], graph: List[List[int]],
+                           sort_key: Callable[[Dict[str, Any]], tuple]) -> List[int]:
+        indegree = [len(dependencies) for dependencies in graph]
+        dependents: List[List[int]] = [[] for _ in tasks]
+        for index, dependencies in enumerate(graph):
+            for dependency in dependencies:
+                dependents[dependency].append(index)
+
+        ready = [(sort_key(tasks[i]), i) for i, degree in enumerate(indegree) if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, index = heapq.heappop(ready)
+            order.append(index)
+            for dependent in dependents[index]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(ready, (sort_key(tasks[dependent]), dependent))
+
+        if len(order) < len(tasks):
+            placed = set(order)
+            order.extend(sorted((i for i in range(len(tasks)) if i not in placed),
+                                key=lambda i: (sort_key(tasks[i]), i)))
+        return order
+
+    def plan(self, tasks: List[Dict[str, Any]], sort_key: Callable[[Dict[str, Any]], tuple],
+             size_key: str = 'story_points') -> List[List[Dict[str, Any]]]:
+        capacity = self.sprint_capacity
+        graph = self.build_graph(tasks)
+        order = self._topological_order(tasks, graph, sort_key)
+
+        remaining = MaxSegmentTree(len(tasks) + 1, initial=capacity)
+        sprint_of = [-1] * len(tasks)
+        sprints: List[List[Dict[str, Any]]] = []
+
+        for index in order:
+            points = tasks[index][size_key]
+            earliest = 0
+            for dependency in graph[index]:
+                if sprint_of[dependency] >= earliest:
+                    earliest = sprint_of[dependency] + 1
+            # Oversized tasks need an otherwise empty sprint
+            sprint = remaining.find_first(min(points, capacity), start=earliest)
+            if sprint == len(sprints):
+                sprints.append([])
+            sprints[sprint].append(tasks[index])
+            sprint_of[index] = sprint
+            left = remaining.tree[sprint + remaining.size] - points
+            remaining.update(sprint, max(left, 0))
+
+        return sprints
+
+    def analyze(self, tasks: List[Dict[str, Any]], size_key: str = 'story_points') -> Dict[str, Any]:
+        """Critical path in story points and a lower bound on sprint count"""
+        graph = self.build_graph(tasks)
+        order = self._topological_order(tasks, graph, lambda task: ())
+
+        path_points = [0] * len(tasks)
+        depth = [0] * len(tasks)
+        previous = [-1] * len(tasks)
+        for index in order:
+            best_points, best_depth, best_previous = 0, 0, -1
+            for dependency in graph[index]:
+                if path_points[dependency] > best_points:
+                    best_points, best_previous = path_points[dependency], dependency
+                best_depth = max(best_depth, depth[dependency])
+            path_points[index] = best_points + tasks[index][size_key]
+            depth[index] = best_depth + 1
+            previous[index] = best_previous
+
+        if not tasks:
+            return {'critical_path_points': 0, 'critical_path': [], 'dependency_depth': 0, 'minimum_sprints': 0}
+
+        end = max(range(len(tasks)), key=lambda i: path_points[i])
+        path = []
+        while end != -1:
+            path.append(tasks[end].get('title'))
+            end = previous[end]
+        path.reverse()
+
+        total_points = sum(task[size_key] for task in tasks)
+        capacity_bound = -(-total_points // self.sprint_capacity)
+        longest_chain = max(depth)
+        return {
+            'critical_path_points': max(path_points),
+            'critical_path': path,
+            'dependency_depth': longest_chain,
+            'minimum_sprints': max(capacity_bound, longest_chain)
+        }
+
+def sprint_statistics(sprints: List[List[Dict[str, Any]]], sprint_capacity: int,
+                      size_key: str = 'story_points') -> Dict[str, Any]:
+    """Sprint count and how full the sprints are on average"""
+    total_points = sum(task[size_key] for sprint in sprints for task in sprint)
+    available = len(sprints) * sprint_capacity
+    return {
+        'sprint_count': len(sprints),
+        'total_story_points': total_points,
+        'fill_ratio': total_points / available if available else 0.0
+    }
+
+def parse_capacity_range(spec: str) -> List[int]:
+    """Parse MIN:MAX:STEP (MAX inclusive) into a list of sprint capacities"""
+    try:
+        low, high, step = (int(part) for part in spec.split(':'))
+    except ValueError:
+        raise ValueError(f"Expected MIN:MAX:STEP, got '{spec}'")
+    if low < 1 or high < low or step < 1:
+        raise ValueError(f"Invalid capacity range '{spec}'")
+    return list(range(low, high + 1, step))
+
+def capacity_sweep(points: List[int], capacities: List[int]) -> List[Dict[str, Any]]:
+    """Next-fit sprint count and fill ratio for every capacity at once.
+
+    points must already be in sprint order. A next-fit sprint starting at
+    task i ends before the first task whose prefix sum exceeds
+    prefix[i] + capacity, so each step is one searchsorted across all
+    capacities; the loop runs once per sprint at the smallest capacity
+    rather than once per task per capacity.
+    """
+    total_points = int(sum(points))
+    if np is None:
+        counts = [_next_fit_count(points, capacity) for capacity in capacities]
+    else:
+        task_count = len(points)
+        prefix = np.concatenate(([0], np.cumsum(points, dtype=np.int64)))
+        caps = np.asarray(capacities, dtype=np.int64)
+        starts = np.zeros(len(caps), dtype=np.int64)
+        sprint_counts = np.zeros(len(caps), dtype=np.int64)
+        active = np.flatnonzero(starts < task_count)
+        while active.size:
+            begin = starts[active]
+            end = np.searchsorted(prefix, prefix[begin] + caps[active], side='right') - 1
+            # A task larger than the capacity still gets a sprint of its own
+            end = np.maximum(end, begin + 1)
+            starts[active] = end
+            sprint_counts[active] += 1
+            active = active[end < task_count]
+        counts = sprint_counts.tolist()
+
+    return [
+        {
+            'capacity': capacity,
+            'sprint_count': count,
+            'total_story_points': total_points,
+            'fill_ratio': total_points / (count * capacity) if count else 0.0
+        }
+        for capacity, count in zip(capacities, counts)
+    ]
+
+def _next_fit_count(points: List[int], capacity: int) -> int:
+    prefix = [0]
+    for task_points in points:
+        prefix.append(prefix[-1] + task_points)
+    count = 0
+    start = 0
+    while start < len(points):
+        start = max(bisect.bisect_right(prefix, prefix[start] + capacity) - 1, start + 1)
+        count += 1
+    return count
+
+def sweep_capacities(tasks: List[Dict[str, Any]], sort_key: Callable[[Dict[str, Any]], tuple],
+                     capacities: List[int], strategy: str = 'next-fit',
+                     size_key: str = 'story_points') -> List[Dict[str, Any]]:
+    """Sprint statistics for each capacity; next-fit is computed in one vectorized pass"""
+    if strategy == 'next-fit':
+        points = [task[size_key] for task in sorted(tasks, key=sort_key)]
+        return capacity_sweep(points, capacities)
+
+    rows = []
+    for capacity in capacities:
+        sprints = SprintPacker(capacity, strategy).pack(tasks, sort_key, size_key)
+        rows.append(dict(capacity=capacity, **sprint_statistics(sprints, capacity, size_key)))
+    return rows
+
+def format_sweep_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'Capacity':>8} {'Sprints':>8} {'Fill':>7}"]
+    for row in rows:
+        lines.append(f"{row['capacity']:>8} {row['sprint_count']:>8} {row['fill_ratio'] * 100:>6.1f}%")
+    return '\n'.join(lines)
+
+def name_sprints(sprints: List[List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    return {f"Sprint {i + 1}": sprint for i, sprint in enumerate(sprints)}
+
+def sprint_references(sprints: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[str]]:
+    """Replace each sprint's tasks with their IDs (output format 2)"""
+    return {name: [task['id'] for task in tasks] for name, tasks in sprints.items()}
+
+def main():
+    # Imported here so the packer stays usable without the generator module
+    from generate_tasks import TaskGenerator
+
+    parser = argparse.ArgumentParser(description='Re-plan sprints for a generated tasks file')
+    parser.add_argument('task_file', help='Path to generated tasks JSON file')
+    parser.add_argument('--output', '-o', help='Output JSON file (default: overwrite task_file)')
+    parser.add_argument('--sprint-capacity', '-c', type=int, default=20, help='Sprint capacity in story points')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='best-fit', help='Packing strategy')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.task_file, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Task file '{args.task_file}' not found")
+        return 1
+    except json.JSONDecodeError as e:
+        print(f"Error parsing task file: {e}")
+        return 1
+
+    tasks = data.get('tasks', [])
+    packer = SprintPacker(args.sprint_capacity, args.strategy)
+    sprints = packer.pack(tasks, TaskGenerator.sprint_sort_key)
+    stats = sprint_statistics(sprints, args.sprint_capacity)
+
+    data['sprints'] = name_sprints(sprints)
+    if data.get('format_version', 1) >= 2:
+        data['sprints'] = sprint_references(data['sprints'])
+    summary = data.setdefault('summary', {})
+    summary['estimated_duration'] = f"{stats['sprint_count']} sprints"
+    if args.strategy == 'dependency-aware':
+        summary['critical_path'] = DependencyPlanner(args.sprint_capacity).analyze(tasks)
+
+    output = args.output or args.task_file
+    with open(output, 'w') as f:
+        json.dump(data, f, indent=2)
+
+    print(f"Planned {len(tasks)} tasks into {stats['sprint_count']} sprints "
+          f"({stats['fill_ratio'] * 100:.1f}% full) using {args.strategy}")
+    if 'critical_path' in summary:
+        critical_path = summary['critical_path']
+        print(f"Critical path: {critical_path['critical_path_points']} story points, "
+              f"theoretical minimum {critical_path['minimum_sprints']} sprints")
+    print(f"Output saved to: {output}")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware pacing and retries for GitHub API calls
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+# Below this share of the hourly budget, calls are spread evenly until the reset
+LOW_WATER = 0.1
+
+class RequestScheduler:
+    """Paces calls to GitHub and decides when throttled ones are retried.
+
+    Every call goes through acquire() and release(). Three mechanisms act
+    together:
+
+    - A token bucket caps the request rate. It starts unlimited (or at
+      max_rate) and is re-paced from X-RateLimit-Remaining/Reset once
+      less than LOW_WATER of the budget is left.
+    - An in-flight limit adapts like TCP congestion control: it is halved
+      on every throttled response and grows back by one after a window of
+      successes, up to max_concurrency.
+    - Throttled responses (429, or 403 from a primary or secondary rate
+      limit) pause all calls until Retry-After or the reset time, falling
+      back to jittered exponential backoff when GitHub gives neither.
+
+    Throughput, retries and the time spent waiting are kept for report().
+    """
+    def __init__(self, max_concurrency: Optional[int] = None, max_rate: Optional[float] = None,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+
+        # None means unlimited until a throttled response sets a limit
+        self.concurrency_limit = max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+
+        self.rate = max_rate
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.throttle_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            # Burst of at most one second's worth, and never less than one call
+            self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a rate token is free and no pause is in force"""
+        wait = self.paused_until - now
+        if self.rate is not None and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def acquire(self) -> None:
+        """Block until a call may start"""
+        with self.condition:
+            if self.started is None:
+                self.started = time.monotonic()
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now)
+                if wait <= 0 and (self.concurrency_limit is None or self.in_flight < self.concurrency_limit):
+                    if self.rate is not None:
+                        self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                if wait > 0:
+                    self.condition.wait(wait)
+                    self.throttle_seconds += time.monotonic() - now
+                else:
+                    # Waiting for an in-flight call to finish
+                    self.condition.wait()
+
+    def release(self, status: Optional[int] = None, headers: Optional[Mapping[str, str]] = None,
+                message: str = '', attempt: int = 0) -> Optional[float]:
+        """Record a finished call; return the retry delay if it was throttled, else None
+
+        headers must have lower-case names. A call that never got a response
+        is released with status None.
+        """
+        headers = headers or {}
+        with self.condition:
+            self.in_flight -= 1
+            self.finished = time.monotonic()
+            if status is not None:
+                self.requests += 1
+            delay = self._retry_delay(status, headers, message, attempt)
+            if delay is None:
+                self._on_success(headers)
+            else:
+                self.throttled += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                # Back off: halve the number of calls in flight
+                self.concurrency_limit = max(1, (self.in_flight + 1) // 2)
+                self.successes = 0
+                if attempt < self.max_retries:
+                    self.retries += 1
+            self.condition.notify_all()
+            return delay
+
+    def _retry_delay(self, status: Optional[int], headers: Mapping[str, str], message: str,
+                     attempt: int) -> Optional[float]:
+        remaining = headers.get('x-ratelimit-remaining')
+        retry_after = headers.get('retry-after')
+        rate_limited = status == 429 or (status == 403 and (
+            remaining == '0' or retry_after is not None or 'rate limit' in message.lower()))
+        if not rate_limited:
+            return None
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        if remaining == '0' and headers.get('x-ratelimit-reset'):
+            return max(0.0, float(headers['x-ratelimit-reset']) - time.time()) + random.uniform(0, 1)
+        # Full jitter, so throttled workers do not all retry at the same moment
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _on_success(self, headers: Mapping[str, str]) -> None:
+        # Additive increase: one more call in flight after a window of successes
+        if self.concurrency_limit is not None:
+            self.successes += 1
+            if self.successes >= self.concurrency_limit:
+                self.successes = 0
+                if self.max_concurrency is None or self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+
+        remaining, limit, reset = (headers.get(name) for name in
+                                   ('x-ratelimit-remaining', 'x-ratelimit-limit', 'x-ratelimit-reset'))
+        if remaining is None or limit is None or reset is None:
+            return
+        remaining, limit = int(remaining), int(limit)
+        if remaining < limit * LOW_WATER:
+            # Spread what is left of the budget over the time until it resets
+            pace = max(remaining, 1) / max(float(reset) - time.time(), 1.0)
+            self.rate = min(pace, self.max_rate) if self.max_rate else pace
+        else:
+            self.rate = self.max_rate
+
+    def should_retry(self, delay: Optional[float], attempt: int) -> bool:
+        return delay is not None and attempt < self.max_retries
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = (self.finished or 0) - (self.started or 0)
+        return {
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'retries': self.retries,
+            'throttle_seconds': round(self.throttle_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(self.requests / elapsed, 1) if elapsed > 0 else 0.0,
+            'concurrency_limit': self.concurrency_limit
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        return (f"{report['requests']} API calls in {report['elapsed_seconds']:.1f}s "
+                f"({report['requests_per_second']:.1f}/s); {report['throttled']} throttled, "
+                f"{report['retries']} retried, {report['throttle_seconds']:.1f}s spent waiting on rate limits")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate user story detection with MinHash and locality-sensitive hashing
+"""
+import random
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # signatures fall back to a pure Python loop
+    np = None
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Filler words that differ between rewordings of the same story
+STOP_WORDS = frozenset(
+    'a an the to my our their your his her its i we be able as by via for of in on at with and or '
+    'can so that from into all any it is are this these those some'.split()
+)
+
+def shingles(text: str) -> Set[int]:
+    """32-bit hashes of the content words of a story's "I want" text
+
+    Word sets rather than character n-grams, so "record 0" and "record 1"
+    stay apart while "via email" and "by email" match.
+    """
+    words = {word for word in re.findall(r'\w+', text.lower()) if word not in STOP_WORDS}
+    return {zlib.crc32(word.encode('utf-8')) for word in words or {text.lower()}}
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def lsh_parameters(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows <= num_perm whose S-curve midpoint is nearest threshold"""
+    best = (num_perm, 1)
+    best_error = float('inf')
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+class StoryDeduplicator:
+    """Incrementally cluster near-duplicate stories.
+
+    Each story gets a MinHash signature over the words of its want. The
+    signature is cut into bands and only stories sharing a band bucket are
+    compared, so work grows with the number of stories rather than pairs.
+    Candidates are confirmed with the exact Jaccard similarity of their
+    shingle sets. Only the first story of each cluster (its canonical story)
+    is indexed, so later duplicates join that cluster instead of chaining.
+    """
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Similarity threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.bands, self.rows = lsh_parameters(num_perm, threshold)
+        rng = random.Random(seed)
+        size = self.bands * self.rows
+        self._a = [rng.randrange(1, 1 << 31) for _ in range(size)]
+        self._b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(size)]
+        if np is not None:
+            self._a_array = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_array = np.array(self._b, dtype=np.uint64)[:, None]
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._canonical: List[Tuple[Dict[str, Any], Set[int]]] = []
+        self.clusters: List[Dict[str, Any]] = []
+        self._cluster_of: Dict[int, Dict[str, Any]] = {}
+
+    def signature(self, story_shingles: Set[int]) -> List[int]:
+        if np is not None:
+            values = np.fromiter(story_shingles, dtype=np.uint64, count=len(story_shingles))
+            hashed = (self._a_array * values + self._b_array) % np.uint64(MERSENNE_PRIME)
+            return (hashed.min(axis=1) & np.uint64(MAX_HASH)).tolist()
+        return [min((a * value + b) % MERSENNE_PRIME for value in story_shingles) & MAX_HASH
+                for a, b in zip(self._a, self._b)]
+
+    def _band_keys(self, signature: List[int]) -> List[bytes]:
+        rows = self.rows
+        return [b''.join(value.to_bytes(4, 'little') for value in signature[band * rows:(band + 1) * rows])
+                for band in range(self.bands)]
+
+    def add(self, story: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Index a story; return the canonical story it duplicates, or None if it is new"""
+        story_shingles = shingles(story['want'])
+        keys = self._band_keys(self.signature(story_shingles))
+
+        checked = set()
+        for band, key in enumerate(keys):
+            for index in self._buckets[band].get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                canonical, canonical_shingles = self._canonical[index]
+                similarity = jaccard(story_shingles, canonical_shingles)
+                if similarity >= self.threshold:
+                    self._record(index, canonical, story, similarity)
+                    return canonical
+
+        index = len(self._canonical)
+        self._canonical.append((story, story_shingles))
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
+
+    def _record(self, index: int, canonical: Dict[str, Any], story: Dict[str, Any], similarity: float) -> None:
+        cluster = self._cluster_of.get(index)
+        if cluster is None:
+            cluster = self._cluster_of[index] = {'kept': canonical['want'], 'duplicates': []}
+            self.clusters.append(cluster)
+        cluster['duplicates'].append({'want': story['want'], 'similarity': round(similarity, 3)})
+
+    def report(self, mode: str) -> Dict[str, Any]:
+        return {
+            'mode': mode,
+            'threshold': self.threshold,
+            'duplicate_stories': sum(len(cluster['duplicates']) for cluster in self.clusters),
+            'clusters': self.clusters
+        }
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Checks of create_github_issues.py against the fake GitHub in fake_github.py
+
+Run with: python -m unittest test_issue_creation
+"""
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from typing import Any, Optional
+
+from benchmark_issue_creation import write_task_file
+from create_github_issues import GitHubIssueCreator
+from fake_github import FakeGitHub, start_server
+from github_backends import GraphQLBackend, RestBackend
+from issue_journal import IssueJournal, legacy_task_key
+from request_scheduler import RequestScheduler
+
+class IssueCreationTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.task_file = os.path.join(self.directory, 'tasks.json')
+        self.task_count = write_task_file(self.task_file, 40, 20)
+
+    def serve(self, github: FakeGitHub) -> Any:
+        server = start_server(github)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def run_creator(self, backend: Any, journal_path: Optional[str] = None) -> bool:
+        """process_task_file as the CLI runs it, with the journal at journal_path (by default none)"""
+        journal = IssueJournal(journal_path, backend.repo) if journal_path else None
+        creator = GitHubIssueCreator(concurrency=4, backend=backend, journal=journal)
+        try:
+            with redirect_stdout(io.StringIO()):
+                return creator.process_task_file(self.task_file)
+        finally:
+            if journal is not None:
+                journal.close()
+
+    def assert_created_once(self, github: FakeGitHub) -> None:
+        titles = Counter(issue['title'] for issue in github.issues.values())
+        self.assertEqual([title for title, count in titles.items() if count > 1], [])
+        tasks = sum(not title.startswith('Epic: ') for title in titles)
+        self.assertEqual(tasks, self.task_count)
+
+    def test_throttled_requests_are_retried(self):
+        github = FakeGitHub(throttle_every=4, retry_after=0.01)
+        server = self.serve(github)
+        scheduler = RequestScheduler(max_concurrency=4, base_delay=0.01)
+        backend = RestBackend(github.repo, token='', base_url=server.url, scheduler=scheduler)
+        self.assertTrue(self.run_creator(backend))
+        self.assertGreater(github.throttled_count, 0)
+        self.assertGreater(scheduler.report()['throttled'], 0)
+        self.assert_created_once(github)
+
+    def test_graphql_timeout_partway_through_batch(self):
+        # Batches of 10 time out after 3 issues are created
+        github = FakeGitHub(graphql_max_mutations=3)
+        server = self.serve(github)
+        backend = GraphQLBackend(github.repo, token='', base_url=server.url, batch_size=10,
+                                 scheduler=RequestScheduler(max_concurrency=4))
+        self.assertTrue(self.run_creator(backend))
+        self.assert_created_once(github)
+
+    def test_rerun_with_journal_creates_nothing(self):
+        github = FakeGitHub()
+        server = self.serve(github)
+        backend = RestBackend(github.repo, token='', base_url=server.url)
+        journal_path = os.path.join(self.directory, 'journal.db')
+        self.assertTrue(self.run_creator(backend, journal_path))
+        issues = len(github.issues)
+        self.assertTrue(self.run_creator(backend, journal_path))
+        self.assertEqual(len(github.issues), issues)
+
+    def rerun_with_old_journal(self, has_source: bool) -> None:
+        """Create the issues, rewrite the journal in an old schema with legacy keys, and run again"""
+        github = FakeGitHub()
+        server = self.serve(github)
+        backend = RestBackend(github.repo, token='', base_url=server.url)
+        journal_path = os.path.join(self.directory, 'journal.db')
+        self.assertTrue(self.run_creator(backend, journal_path))
+        issues = len(github.issues)
+        with sqlite3.connect(journal_path) as connection:
+            rows = connection.execute(
+                'SELECT repo, source, task_key, number, title, content_hash, created_at FROM issues').fetchall()
+        source = rows[0][1]
+
+        old_path = os.path.join(self.directory, 'old-journal.db')
+        with sqlite3.connect(old_path) as connection:
+            connection.execute(f"""
+                CREATE TABLE issues (
+                    repo TEXT NOT NULL,
+                    {'source TEXT NOT NULL,' if has_source else ''}
+                    task_key TEXT NOT NULL,
+                    number TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (repo, task_key)
+                )""")
+            for repo, row_source, key, number, title, issue_hash, created_at in rows:
+                key = legacy_task_key(key) or key
+                if has_source:
+                    connection.execute('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                       (repo, row_source, key, number, title, issue_hash, created_at))
+                else:
+                    connection.execute('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?)',
+                                       (repo, key, number, title, issue_hash, created_at))
+
+        self.assertTrue(self.run_creator(backend, old_path))
+        self.assertEqual(len(github.issues), issues)
+        journal = IssueJournal(old_path, github.repo)
+        self.addCleanup(journal.close)
+        self.assertEqual(sorted(journal.numbers), sorted((row[1], row[2]) for row in rows))
+        self.assertEqual(len(journal.keys_from(source)), len(rows))
+
+    def test_unsourced_journal_is_rekeyed(self):
+        self.rerun_with_old_journal(has_source=False)
+
+    def test_journal_keyed_without_source_is_rekeyed(self):
+        self.rerun_with_old_journal(has_source=True)
+
+if __name__ == '__main__':
+    unittest.main()
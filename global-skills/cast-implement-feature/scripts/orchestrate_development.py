@@ -6,9 +6,11 @@ import asyncio
 import json
 import subprocess
 import argparse
+import itertools
 import os
+import sys
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 
@@ -20,6 +22,7 @@ class DevelopmentTask:
     description: str
     dependencies: List[str]
     estimated_hours: int
+    sprint: Optional[str] = None
     status: str = 'pending'  # 'pending', 'in_progress', 'completed', 'blocked'
     assigned_agent: Optional[str] = None
     start_time: Optional[float] = None
@@ -39,6 +42,12 @@ class DevelopmentOrchestrator:
     def __init__(self, dry_run: bool = False):
         self.dry_run = dry_run
         self.tasks: Dict[str, DevelopmentTask] = {}
+        # Task and completion counts per type, kept current by add_task and
+        # complete_task so a progress update does not rescan every task
+        self.type_totals: Dict[str, int] = {}
+        self.type_completed: Dict[str, int] = {}
+        self.completed_count = 0
+        self.sprint_names: List[str] = []
         self.integration_points: List[IntegrationPoint] = []
         self.agents: Dict[str, dict] = {}
         self.development_state = {
@@ -49,24 +58,89 @@ class DevelopmentOrchestrator:
             'overall_progress': 0
         }
         
+    def map_task_sprints(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """Map task ID (format 2) or title (format 1) to its sprint name"""
+        sprint_by_task = {}
+        for sprint_name, sprint_tasks in data.get('sprints', {}).items():
+            for entry in sprint_tasks:
+                # Format 2 sprints hold task IDs, format 1 sprints hold task copies
+                key = entry if isinstance(entry, str) else entry.get('title', '')
+                sprint_by_task[key] = sprint_name
+        return sprint_by_task
+    
+    def add_task(self, task_data: Dict[str, Any], sprint: Optional[str] = None) -> DevelopmentTask:
+        """Register a development task built from a generated task dict"""
+        task = DevelopmentTask(
+            id=task_data.get('title', '').lower().replace(' ', '-'),
+            title=task_data.get('title', ''),
+            type=task_data.get('type', 'backend'),
+            description=task_data.get('description', ''),
+            dependencies=task_data.get('dependencies', []),
+            estimated_hours=task_data.get('story_points', 1) * 2,  # Convert story points to hours
+            sprint=sprint
+        )
+        replaced = self.tasks.get(task.id)
+        if replaced is not None:
+            self.type_totals[replaced.type] -= 1
+            if replaced.status == 'completed':
+                self.type_completed[replaced.type] -= 1
+                self.completed_count -= 1
+        self.tasks[task.id] = task
+        self.type_totals[task.type] = self.type_totals.get(task.type, 0) + 1
+        return task
+    
+    def complete_task(self, task: DevelopmentTask) -> None:
+        """Mark a task completed and update the progress counts"""
+        if task.status != 'completed':
+            self.type_completed[task.type] = self.type_completed.get(task.type, 0) + 1
+            self.completed_count += 1
+        task.status = 'completed'
+        task.completion_time = time.time()
+    
+    def load_task_stream(self, lines: Iterable[str]) -> None:
+        """Register the tasks of an NDJSON task stream, then their sprints from its trailer
+        
+        Orchestration plans over the whole backlog (dependencies, integration
+        points, database work first), so it starts once the stream has ended.
+        """
+        tasks_by_stream_id = {}
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'header' in record:
+                continue
+            if 'trailer' in record:
+                self.sprint_names = list(record['trailer'].get('sprints', {}))
+                for stream_id, sprint in self.map_task_sprints(record['trailer']).items():
+                    if stream_id in tasks_by_stream_id:
+                        tasks_by_stream_id[stream_id].sprint = sprint
+                return
+            task = self.add_task(record)
+            tasks_by_stream_id[record.get('id') or task.title] = task
+        print("Warning: task stream ended without a trailer record; sprints unknown")
+    
     def load_tasks_from_file(self, task_file: str) -> bool:
-        """Load development tasks from generated tasks file"""
+        """Load development tasks from a generated JSON or NDJSON tasks file ('-' reads stdin)"""
         try:
-            with open(task_file, 'r') as f:
-                data = json.load(f)
-            
-            tasks = data.get('tasks', [])
-            
-            for task_data in tasks:
-                task = DevelopmentTask(
-                    id=task_data.get('title', '').lower().replace(' ', '-'),
-                    title=task_data.get('title', ''),
-                    type=task_data.get('type', 'backend'),
-                    description=task_data.get('description', ''),
-                    dependencies=task_data.get('dependencies', []),
-                    estimated_hours=task_data.get('story_points', 1) * 2  # Convert story points to hours
-                )
-                self.tasks[task.id] = task
+            f = sys.stdin if task_file == '-' else open(task_file, 'r')
+            with f:
+                first_line = f.readline()
+                try:
+                    first_record = json.loads(first_line)
+                except json.JSONDecodeError:
+                    first_record = None
+                
+                # A stream starts with a task record; a JSON file starts with '{' or holds 'tasks'
+                if isinstance(first_record, dict) and 'tasks' not in first_record:
+                    self.load_task_stream(itertools.chain([first_line], f))
+                else:
+                    data = json.loads(first_line + f.read())
+                    sprint_by_task = self.map_task_sprints(data)
+                    self.sprint_names = list(data.get('sprints', {}))
+                    for task_data in data.get('tasks', []):
+                        key = task_data.get('id') or task_data.get('title', '')
+                        self.add_task(task_data, sprint_by_task.get(key))
             
             print(f"Loaded {len(self.tasks)} tasks for development")
             return True
@@ -180,27 +254,32 @@ class DevelopmentOrchestrator:
                 # Simulate development time (scaled down for demo)
                 await asyncio.sleep(task.estimated_hours * 0.1)  # 0.1 seconds per estimated hour
                 
-                task.status = 'completed'
-                task.completion_time = time.time()
+                self.complete_task(task)
                 print(f"Agent {agent_id} completed task: {task.title}")
                 
                 # Update progress
                 self.update_progress()
     
+    def count_tasks(self, group: str, groups: List[str]) -> Dict[str, Dict[str, int]]:
+        """Total and completed task counts per value of a task attribute, in one pass over the tasks"""
+        counts = {value: {'total': 0, 'completed': 0} for value in groups}
+        for task in self.tasks.values():
+            group_counts = counts.get(getattr(task, group))
+            if group_counts is not None:
+                group_counts['total'] += 1
+                group_counts['completed'] += task.status == 'completed'
+        return counts
+    
     def update_progress(self) -> None:
         """Update development progress metrics"""
-        backend_tasks = [t for t in self.tasks.values() if t.type == 'backend']
-        frontend_tasks = [t for t in self.tasks.values() if t.type == 'frontend']
-        all_tasks = list(self.tasks.values())
-        
-        backend_completed = len([t for t in backend_tasks if t.status == 'completed'])
-        frontend_completed = len([t for t in frontend_tasks if t.status == 'completed'])
-        total_completed = len([t for t in all_tasks if t.status == 'completed'])
+        def percent(task_type: str) -> float:
+            total = self.type_totals.get(task_type, 0)
+            return (self.type_completed.get(task_type, 0) / total) * 100 if total else 0
         
         self.development_state.update({
-            'backend_progress': (backend_completed / len(backend_tasks)) * 100 if backend_tasks else 0,
-            'frontend_progress': (frontend_completed / len(frontend_tasks)) * 100 if frontend_tasks else 0,
-            'overall_progress': (total_completed / len(all_tasks)) * 100 if all_tasks else 0
+            'backend_progress': percent('backend'),
+            'frontend_progress': percent('frontend'),
+            'overall_progress': (self.completed_count / len(self.tasks)) * 100 if self.tasks else 0
         })
     
     async def coordinate_parallel_development(self) -> bool:
@@ -365,16 +444,12 @@ class DevelopmentOrchestrator:
         """Generate comprehensive development report"""
         total_time = time.time() - self.development_state['start_time'] if self.development_state['start_time'] else 0
         
-        task_summary = {}
-        for task_type in ['backend', 'frontend', 'database', 'integration']:
-            tasks = [t for t in self.tasks.values() if t.type == task_type]
-            completed = [t for t in tasks if t.status == 'completed']
-            
-            task_summary[task_type] = {
-                'total': len(tasks),
-                'completed': len(completed),
-                'completion_rate': (len(completed) / len(tasks)) * 100 if tasks else 0
-            }
+        task_summary = self.count_tasks('type', ['backend', 'frontend', 'database', 'integration'])
+        for counts in task_summary.values():
+            counts['completion_rate'] = (counts['completed'] / counts['total']) * 100 if counts['total'] else 0
+        
+        sprint_summary = self.count_tasks('sprint', self.sprint_names)
+        completed_tasks = self.completed_count
         
         integration_summary = {
             'total_integration_points': len(self.integration_points),
@@ -386,10 +461,11 @@ class DevelopmentOrchestrator:
             'development_summary': {
                 'total_time_seconds': total_time,
                 'total_tasks': len(self.tasks),
-                'completed_tasks': len([t for t in self.tasks.values() if t.status == 'completed']),
+                'completed_tasks': completed_tasks,
                 'overall_progress': self.development_state['overall_progress']
             },
             'task_breakdown': task_summary,
+            'sprint_breakdown': sprint_summary,
             'integration_summary': integration_summary,
             'agents_used': list(self.agents.keys())
         }
@@ -398,7 +474,7 @@ class DevelopmentOrchestrator:
 
 async def main():
     parser = argparse.ArgumentParser(description='Orchestrate parallel development')
-    parser.add_argument('task_file', help='Path to generated tasks JSON file')
+    parser.add_argument('task_file', help='Path to generated tasks JSON or NDJSON file, or - for stdin')
     parser.add_argument('--strategy', choices=['parallel', 'sequential'], 
                        default='parallel', help='Development strategy')
     parser.add_argument('--dry-run', action='store_true',
@@ -6,14 +6,28 @@ import subprocess
 import os
 import argparse
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from git_refs import GitRefError, GitRefReader
 
 class BranchCreator:
     def __init__(self, dry_run: bool = False):
         self.dry_run = dry_run
+        self._refs = None
         
+    def ref_reader(self) -> Optional[GitRefReader]:
+        """In-process reader for the repository's refs, or None when git has to be asked"""
+        if self._refs is None:
+            try:
+                self._refs = GitRefReader.discover()
+            except (GitRefError, OSError):
+                return None
+        return self._refs
+    
     def check_git_repo(self) -> bool:
         """Check if current directory is a Git repository"""
+        if self.ref_reader() is not None:
+            return True
+        
         try:
             result = subprocess.run(['git', 'rev-parse', '--git-dir'], 
                                   capture_output=True, text=True)
@@ -24,6 +38,13 @@ class BranchCreator:
     
     def get_current_branch(self) -> str:
         """Get the current Git branch name"""
+        refs = self.ref_reader()
+        if refs is not None:
+            try:
+                return refs.current_branch()
+            except (GitRefError, OSError):
+                pass
+        
         try:
             result = subprocess.run(['git', 'branch', '--show-current'], 
                                   capture_output=True, text=True)
@@ -49,11 +70,24 @@ class BranchCreator:
         if not base_branch:
             base_branch = self.get_current_branch()
         
+        on_base_branch = False
+        refs = self.ref_reader()
+        if refs is not None:
+            try:
+                # Fail before switching branches and pulling, not at the last step
+                if refs.branch_exists(branch_name):
+                    print(f"Error: Branch '{branch_name}' already exists")
+                    return False
+                on_base_branch = refs.current_branch() == base_branch
+            except (GitRefError, OSError):
+                pass
+        
         commands = [
-            ['git', 'checkout', base_branch],
             ['git', 'pull', 'origin', base_branch],
             ['git', 'checkout', '-b', branch_name]
         ]
+        if not on_base_branch:
+            commands.insert(0, ['git', 'checkout', base_branch])
         
         for cmd in commands:
             if self.dry_run:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Read Git's HEAD and branch refs in-process, without running git
+"""
+import os
+from typing import Dict, List, Optional
+
+HEADS = 'refs/heads/'
+# Symbolic refs are followed at most this deep, as in git itself
+MAX_SYMREF_DEPTH = 5
+
+class GitRefError(Exception):
+    """The repository uses something this reader does not understand"""
+    pass
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+
+def _common_dir(git_dir: str) -> str:
+    """Where a git directory's shared refs and objects are; a linked worktree's names it in commondir"""
+    common = _read_text(os.path.join(git_dir, 'commondir'))
+    return os.path.normpath(os.path.join(git_dir, common)) if common else git_dir
+
+def _is_git_dir(path: str) -> bool:
+    """Whether path looks like a git directory, as git checks before using one"""
+    common_dir = _common_dir(path)
+    return (os.path.isfile(os.path.join(path, 'HEAD')) and
+            os.path.isdir(os.path.join(common_dir, 'objects')) and
+            os.path.isdir(os.path.join(common_dir, 'refs')))
+
+class GitRefReader:
+    """HEAD, loose refs and packed-refs of one repository or worktree.
+
+    git_dir holds the worktree's own HEAD; common_dir holds the refs shared
+    by all worktrees (they are the same directory outside linked worktrees).
+    Only the files refs are stored in are read; anything unusual, such as
+    the reftable ref format, raises GitRefError so callers can run git
+    instead.
+    """
+    def __init__(self, git_dir: str, common_dir: Optional[str] = None):
+        self.git_dir = git_dir
+        self.common_dir = common_dir or git_dir
+        if os.path.isdir(os.path.join(self.common_dir, 'reftable')):
+            raise GitRefError(f"{self.common_dir} uses the reftable ref format")
+        self._packed: Optional[Dict[str, str]] = None
+        self._packed_stat: Optional[tuple] = None
+
+    @classmethod
+    def discover(cls, path: str = '.') -> Optional['GitRefReader']:
+        """The repository containing path, or None outside of one
+
+        Follows GIT_DIR, ".git" files with a "gitdir:" line (linked worktrees
+        and submodules) and the commondir file of worktree git directories.
+        """
+        if os.environ.get('GIT_DIR'):
+            git_dir = os.path.abspath(os.environ['GIT_DIR'])
+            return cls._open(git_dir) if _is_git_dir(git_dir) else None
+        if os.environ.get('GIT_CEILING_DIRECTORIES'):
+            raise GitRefError("Repository discovery is limited by GIT_CEILING_DIRECTORIES")
+
+        directory = os.path.abspath(path)
+        device = os.stat(directory).st_dev
+        while True:
+            dot_git = os.path.join(directory, '.git')
+            if os.path.isdir(dot_git):
+                if _is_git_dir(dot_git):
+                    return cls._open(dot_git)
+            elif os.path.isfile(dot_git):
+                return cls._open(cls._follow_gitdir_file(dot_git))
+            elif _is_git_dir(directory):
+                # A bare repository
+                return cls._open(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return None
+            if os.stat(parent).st_dev != device and not os.environ.get('GIT_DISCOVERY_ACROSS_FILESYSTEM'):
+                # git stops at the mount point; let it report that itself
+                raise GitRefError(f"Repository discovery stopped at the filesystem boundary {directory}")
+            directory = parent
+
+    @staticmethod
+    def _follow_gitdir_file(dot_git: str) -> str:
+        content = _read_text(dot_git)
+        if content is None or not content.startswith('gitdir:'):
+            raise GitRefError(f"Invalid gitfile format: {dot_git}")
+        git_dir = os.path.join(os.path.dirname(dot_git), content[len('gitdir:'):].strip())
+        git_dir = os.path.normpath(git_dir)
+        if not _is_git_dir(git_dir):
+            raise GitRefError(f"Not a git repository: {git_dir}")
+        return git_dir
+
+    @classmethod
+    def _open(cls, git_dir: str) -> 'GitRefReader':
+        return cls(git_dir, _common_dir(git_dir))
+
+    def _ref_dir(self, ref: str) -> str:
+        """Directory a ref is stored under: HEAD-like and per-worktree refs stay with the worktree"""
+        if '/' not in ref or ref.startswith(('refs/worktree/', 'refs/bisect/', 'refs/rewritten/')):
+            return self.git_dir
+        return self.common_dir
+
+    def packed_refs(self) -> Dict[str, str]:
+        """Ref name to object name for every entry in packed-refs"""
+        path = os.path.join(self.common_dir, 'packed-refs')
+        try:
+            stat = os.stat(path)
+            stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            stat = None
+        # git rewrites packed-refs whole, so the parse is reused until the file changes
+        if self._packed is None or stat != self._packed_stat:
+            packed = {}
+            for line in (_read_text(path) or '').splitlines():
+                # Header lines start with '#', peeled tags with '^'
+                if not line or line[0] in '#^':
+                    continue
+                sha, _, name = line.partition(' ')
+                packed[name] = sha
+            self._packed = packed
+            self._packed_stat = stat
+        return self._packed
+
+    def read_ref(self, ref: str) -> Optional[str]:
+        """Raw content of a ref: an object name, 'ref: <target>', or None if it does not exist"""
+        path = os.path.join(self._ref_dir(ref), *ref.split('/'))
+        if os.path.isdir(path):
+            return None
+        content = _read_text(path)
+        if content is not None:
+            return content
+        return self.packed_refs().get(ref)
+
+    def symbolic_ref(self, ref: str = 'HEAD') -> Optional[str]:
+        """The ref that ref points at, or None if it holds an object name"""
+        content = self.read_ref(ref)
+        if content is not None and content.startswith('ref:'):
+            return content[len('ref:'):].strip()
+        return None
+
+    def resolve(self, ref: str = 'HEAD') -> Optional[str]:
+        """Object name ref points at, following symbolic refs; None if unborn or missing"""
+        for _ in range(MAX_SYMREF_DEPTH):
+            content = self.read_ref(ref)
+            if content is None:
+                return None
+            if not content.startswith('ref:'):
+                return content
+            ref = content[len('ref:'):].strip()
+        raise GitRefError(f"Symbolic ref loop at {ref}")
+
+    def current_branch(self) -> str:
+        """Name of the checked-out branch, or '' with a detached HEAD, like git branch --show-current"""
+        target = self.symbolic_ref('HEAD')
+        if target is None:
+            if self.read_ref('HEAD') is None:
+                raise GitRefError(f"No HEAD in {self.git_dir}")
+            return ''
+        return target[len(HEADS):] if target.startswith(HEADS) else ''
+
+    def branches(self) -> List[str]:
+        """Names of all local branches, sorted like git branch lists them"""
+        names = {name[len(HEADS):] for name in self.packed_refs() if name.startswith(HEADS)}
+        heads = os.path.join(self.common_dir, 'refs', 'heads')
+        for root, _, files in os.walk(heads):
+            for file_name in files:
+                if file_name.endswith('.lock'):
+                    continue
+                path = os.path.join(root, file_name)
+                names.add(os.path.relpath(path, heads).replace(os.sep, '/'))
+        return sorted(names)
+
+    def branch_exists(self, branch: str) -> bool:
+        return self.read_ref(HEADS + branch) is not None